@@ -0,0 +1,42 @@
+"""
+各保活动作单次执行的本地调用次数、注入的事件数 (COST，auto 据此排序) 与耗时 (见 core.keepalive)。
+
+使用默认注入后端 (不可用时使用 null 后端，只反映 Python 侧开销)；
+会真实注入输入 / 获取休眠抑制，请在不介意光标与按键事件的环境中运行。
+
+用法: python benchmarks/bench_actions.py [iterations]
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import keepalive, mouse_engine
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    try:
+        backend = mouse_engine.create_backend()
+    except ValueError:
+        backend = mouse_engine.create_backend("null")
+
+    print(f"backend: {backend.name}, auto picks: {keepalive.create_action('auto', backend).name}")
+    print(f"{'action':<16} {'resets idle':>11} {'cost':>5} {'calls/op':>9} {'p50 (us)':>9} {'p99 (us)':>9} {'max (us)':>9}")
+    for name in keepalive.available_actions(backend):
+        action = keepalive.create_action(name, backend)
+        setup_calls = action.calls
+        try:
+            for _ in range(iterations):
+                action.perform(1, 0)
+        finally:
+            action.close()
+        calls = (action.calls - setup_calls) / iterations
+        lat = action.latency
+        print(f"{name:<16} {str(action.resets_idle):>11} {action.COST:>5} {calls:>9g} "
+              f"{lat.quantile(0.5) * 1e6:>9.1f} {lat.quantile(0.99) * 1e6:>9.1f} {lat.max * 1e6:>9.1f}")
+    backend.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+无界面入口 (core.cli) 与图形界面 (ui.main_window) 的冷启动导入开销：导入耗时与常驻内存。
+每项在独立的子进程中测量；core.cli 导入失败或导入链中出现 PySide6 时以退出码 1 结束。
+实际运行引擎一个节拍的检查见 tests/test_cli_headless.py。
+
+用法: python benchmarks/bench_cli.py [repeat]
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = r"""
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+try:
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+except ImportError:
+    rss = float("nan")
+qt = sorted(m for m in sys.modules if m.split(".")[0] == "PySide6")
+print(elapsed, rss, len(qt), qt[:1])
+"""
+
+
+def probe(module):
+    out = subprocess.run([sys.executable, "-c", PROBE.format(module=module)],
+                         cwd=ROOT, capture_output=True, text=True)
+    if out.returncode:
+        return None
+    elapsed, rss, qt, first = out.stdout.split(" ", 3)
+    return float(elapsed), float(rss), int(qt), first.strip()
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"{'module':<20} {'import ms':>10} {'max RSS MB':>11} {'Qt modules':>11}")
+    failed = False
+    for module in ("core.cli", "ui.main_window"):
+        runs = [probe(module) for _ in range(repeat)]
+        runs = [r for r in runs if r]
+        if not runs:
+            print(f"{module:<20} {'(import failed)':>10}")
+            # 无界面入口必须能导入；界面在没有 PySide6 的环境中导入失败属于预期
+            failed |= module == "core.cli"
+            continue
+        best = min(runs)
+        print(f"{module:<20} {best[0] * 1000:>10.1f} {best[1]:>11.1f} {best[2]:>11}")
+        if module == "core.cli" and best[2]:
+            print(f"FAIL: core.cli imported {best[3]}")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+界面文本加载与渲染：原实现 (启动时用 configparser 解析 language.ini 的全部语言，
+get(key).format(...)) 与编译目录 (只读取 language.cat 的目录头和当前语言，预转换的 printf 模板) 对比。
+
+- 加载: 独立子进程中从导入 (core.config_mgr 已导入) 到可用的耗时、tracemalloc 统计的分配量、进程峰值 RSS
+- 渲染: 日志常用条目的 get / format 吞吐
+
+用法: python benchmarks/bench_i18n.py [repeat]
+"""
+import os
+import subprocess
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.i18n import I18n
+from tools.compile_i18n import build
+
+ASSETS = os.path.join(ROOT, "assets")
+
+# 原实现 (所有语言一次性解析为 {语言: {键: 文本}})
+LEGACY = r"""
+import configparser
+
+class LegacyI18n:
+    def __init__(self, path, language):
+        self.languages = {{}}
+        self.current_language = language
+        config = configparser.ConfigParser()
+        config.read(path, encoding="utf-8")
+        for section in config.sections():
+            self.languages[section] = dict(config[section])
+
+    def get(self, key):
+        if self.current_language in self.languages:
+            return self.languages[self.current_language].get(key, key)
+        return key
+
+i18n = LegacyI18n({path!r}, "English")
+"""
+
+CATALOG = r"""
+from core.i18n import I18n
+i18n = I18n({assets!r}, "English")
+"""
+
+# core.config_mgr (及 configparser) 在创建 I18n 之前总是已经导入，不计入
+PROBE = r"""
+import sys, time, tracemalloc
+import core.config_mgr
+tracemalloc.start()
+start = time.perf_counter()
+exec(compile({code!r}, "<load>", "exec"))
+elapsed = time.perf_counter() - start
+allocated = tracemalloc.get_traced_memory()[0]
+try:
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+except ImportError:
+    rss = float("nan")
+print(elapsed, allocated, rss)
+"""
+
+
+def probe(code, repeat):
+    best = None
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", PROBE.format(code=code)],
+                             cwd=ROOT, capture_output=True, text=True)
+        if out.returncode:
+            raise RuntimeError(out.stderr.strip())
+        result = tuple(float(x) for x in out.stdout.split())
+        best = result if best is None or result[0] < best[0] else best
+    return best
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    problems = build()
+    if problems:
+        print("\n".join(problems))
+        return 1
+
+    print(f"{'load':<10} {'ms':>8} {'alloc KB':>10} {'max RSS MB':>11}")
+    for name, code in (("configparser", LEGACY.format(path=os.path.join(ASSETS, "language.ini"))),
+                       ("catalog", CATALOG.format(assets=ASSETS))):
+        elapsed, allocated, rss = probe(code, repeat)
+        print(f"{name:<10} {elapsed * 1000:>8.2f} {allocated / 1024:>10.1f} {rss:>11.1f}")
+
+    scope = {}
+    exec(LEGACY.format(path=os.path.join(ASSETS, "language.ini")), scope)
+    get = scope["i18n"].get
+    i18n = I18n(ASSETS, "English")
+    number = 200000
+    cases = (
+        ("get", lambda: get("log_ready"), lambda: i18n.get("log_ready")),
+        ("format 1", lambda: get("log_moved").format("12:00:00"),
+         lambda: i18n.format("log_moved", "12:00:00")),
+        ("format 2", lambda: get("status_aligning_first_move").format(30, 5),
+         lambda: i18n.format("status_aligning_first_move", 30, 5)),
+    )
+    print(f"\n{'render':<10} {'str.format ns':>14} {'catalog ns':>11}")
+    for name, legacy, compiled in cases:
+        assert legacy() == compiled(), name
+        legacy_ns = min(timeit.repeat(legacy, number=number, repeat=repeat)) / number * 1e9
+        compiled_ns = min(timeit.repeat(compiled, number=number, repeat=repeat)) / number * 1e9
+        print(f"{name:<10} {legacy_ns:>14.1f} {compiled_ns:>11.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
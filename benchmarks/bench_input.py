@@ -0,0 +1,57 @@
+"""
+一次 jiggle (移动 + 返回) 的开销对比：
+- legacy: 旧路径，两次 move_relative，每次 GetCursorPos + SetCursorPos，中间阻塞 sleep(0.1)
+- batch:  InputBackend.jiggle，一次本地调用提交两条相对移动
+
+Windows 上测量真实的 user32 调用；其他平台 legacy 路径不可用，仅测量 batch
+(默认后端不可用时使用 null 后端，只反映 Python 侧开销)。
+
+用法: python benchmarks/bench_input.py [iterations]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import mouse_engine
+
+
+def legacy_jiggle(dx, dy, pause):
+    x, y = mouse_engine.get_mouse_position()
+    mouse_engine.set_mouse_position(x + dx, y + dy)
+    time.sleep(pause)
+    x, y = mouse_engine.get_mouse_position()
+    mouse_engine.set_mouse_position(x - dx, y - dy)
+
+
+def measure(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    try:
+        backend = mouse_engine.create_backend()
+    except ValueError:
+        backend = mouse_engine.create_backend("null")
+
+    print(f"{'path':<22} {'native calls':>12} {'per jiggle (us)':>16}")
+    if sys.platform == "win32":
+        t = measure(lambda: legacy_jiggle(1, 0, 0.1), 10)
+        print(f"{'legacy (sleep 0.1s)':<22} {4:>12} {t * 1e6:>16.1f}")
+        t = measure(lambda: legacy_jiggle(1, 0, 0), iterations)
+        print(f"{'legacy (no sleep)':<22} {4:>12} {t * 1e6:>16.1f}")
+
+    calls_before = backend.calls
+    t = measure(lambda: backend.jiggle(1, 0), iterations)
+    calls = (backend.calls - calls_before) / iterations
+    print(f"{'batch (' + backend.name + ')':<22} {calls:>12g} {t * 1e6:>16.1f}")
+    backend.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+单实例握手与控制命令的耗时：
+
+- 没有运行中的实例时 notify_running() (只检查实例锁，不尝试连接)
+- 实例运行中时 notify_running() (第二次启动：发送 wakeup 并等待响应)
+- 同一连接之外逐次 send("ping") / send("status") 的往返
+
+实例在子进程中运行 (QCoreApplication + start_server)，使用独立的 app_key，不影响正在运行的程序。
+
+用法: python benchmarks/bench_instance.py [repeat]
+"""
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+APP_KEY = f"ever_pulse_bench_{os.getpid()}"
+
+SERVER = r"""
+import sys
+from PySide6.QtCore import QCoreApplication
+from core.single_instance import SingleInstance
+app = QCoreApplication(sys.argv)
+instance = SingleInstance({key!r})
+instance.register("status", lambda: {{"running": False}})
+if instance.notify_running() or not instance.start_server():
+    sys.exit(1)
+print("ready", flush=True)
+sys.exit(app.exec())
+"""
+
+
+def best_ms(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    try:
+        from core.single_instance import SingleInstance
+    except ImportError as e:
+        print(f"unavailable ({e})")
+        return 0
+
+    def first_launch():
+        instance = SingleInstance(APP_KEY)
+        assert not instance.notify_running()
+        instance.close()
+
+    print(f"{'no instance: notify_running':<32} {best_ms(first_launch, repeat):>8.2f} ms")
+
+    server = subprocess.Popen([sys.executable, "-c", SERVER.format(key=APP_KEY)],
+                              cwd=ROOT, stdout=subprocess.PIPE, text=True)
+    try:
+        if server.stdout.readline().strip() != "ready":
+            print("instance failed to start")
+            return 1
+        client = SingleInstance(APP_KEY)
+        print(f"{'running: notify_running':<32} {best_ms(client.notify_running, repeat):>8.2f} ms")
+        for command in ("ping", "status"):
+            response = client.send(command)
+            assert response and response["ok"], response
+            print(f"{'running: send ' + command:<32} {best_ms(lambda: client.send(command), repeat):>8.2f} ms")
+    finally:
+        server.terminate()
+        server.wait()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""
+本地调用的单次开销：调用前的写法 (每次新建结构体与 byref、各后端自行加载本地库并经 argtypes 转换参数)
+对比后端实际使用的路径 (后端方法 -> core.native：函数解析一次、按线程预分配结构体与 byref、
+热路径不做 argtypes 转换)。"after" 一列调用的是引擎使用的后端对象本身，而不是 core.native 的函数。
+
+- Windows: WindowsDisplay.pointer (GetCursorPos)、WindowsIdleBackend.idle_duration (GetLastInputInfo)、
+  WindowsInputBackend.jiggle (SendInput)
+- Linux (有 DISPLAY): XrandrDisplay.pointer (XQueryPointer)、X11IdleBackend.idle_duration (XScreenSaverQueryInfo)、
+  XTestInputBackend.jiggle (XTestFakeRelativeMotionEvent + XFlush)
+- 任意平台: libc clock_gettime，只反映 ctypes 侧的开销差异 (无显示环境时也可运行)
+
+jiggle 会真实移动光标一个像素并立即移回。
+
+用法: python benchmarks/bench_native.py [iterations]
+"""
+import ctypes
+import ctypes.util
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import idle_detector, mouse_engine, native
+
+
+def measure(fn, iterations, repeat=5):
+    """多轮取最小值，减少调度噪声"""
+    fn()
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return best / iterations * 1e9
+
+
+def report(name, before, after, iterations):
+    b, a = measure(before, iterations), measure(after, iterations)
+    print(f"{name:<28} {b:>12.0f} {a:>12.0f} {b / a:>8.2f}x")
+
+
+# --- 调用前的写法 ---
+
+def legacy_cursor_pos_win():
+    pt = native.POINT()
+    ctypes.windll.user32.GetCursorPos(ctypes.byref(pt))
+    return pt.x, pt.y
+
+
+def legacy_idle_ms_win():
+    lii = native.LASTINPUTINFO()
+    lii.cbSize = ctypes.sizeof(native.LASTINPUTINFO)
+    ctypes.windll.user32.GetLastInputInfo(ctypes.byref(lii))
+    ctypes.windll.kernel32.GetTickCount64.restype = ctypes.c_ulonglong
+    return (ctypes.windll.kernel32.GetTickCount64() - lii.dwTime) & 0xFFFFFFFF
+
+
+def legacy_inject_win(motions):
+    inputs = (native.INPUT * len(motions))()
+    for rec, (dx, dy) in zip(inputs, motions):
+        rec.type = native.INPUT_MOUSE
+        rec.mi.dx, rec.mi.dy, rec.mi.dwFlags = dx, dy, native.MOUSEEVENTF_MOVE
+    ctypes.windll.user32.SendInput(len(motions), inputs, ctypes.sizeof(native.INPUT))
+
+
+class LegacyX11:
+    """调用前 xtest / x11 / xrandr 后端各自的绑定 (独立的 CDLL，声明 argtypes，传入 Python int)"""
+
+    def __init__(self):
+        xlib = self.xlib = ctypes.CDLL(ctypes.util.find_library("X11"))
+        xlib.XOpenDisplay.restype = ctypes.c_void_p
+        xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        xlib.XDefaultRootWindow.restype = ctypes.c_ulong
+        xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        xlib.XFlush.argtypes = [ctypes.c_void_p]
+        xlib.XQueryPointer.argtypes = [ctypes.c_void_p, ctypes.c_ulong] + [ctypes.c_void_p] * 7
+        self.display = xlib.XOpenDisplay(None)
+        self.root = xlib.XDefaultRootWindow(self.display)
+        self.xtst = self.xss = None
+        if ctypes.util.find_library("Xtst"):
+            self.xtst = ctypes.CDLL(ctypes.util.find_library("Xtst"))
+            self.xtst.XTestFakeRelativeMotionEvent.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_ulong]
+        if ctypes.util.find_library("Xss"):
+            self.xss = ctypes.CDLL(ctypes.util.find_library("Xss"))
+            self.xss.XScreenSaverAllocInfo.restype = ctypes.POINTER(native.XScreenSaverInfo)
+            self.xss.XScreenSaverQueryInfo.argtypes = [ctypes.c_void_p, ctypes.c_ulong,
+                                                      ctypes.POINTER(native.XScreenSaverInfo)]
+            self.info = self.xss.XScreenSaverAllocInfo()
+
+    def pointer(self):
+        win, x, y, i, mask = ctypes.c_ulong(), ctypes.c_int(), ctypes.c_int(), ctypes.c_int(), ctypes.c_uint()
+        self.xlib.XQueryPointer(self.display, self.root, ctypes.byref(win), ctypes.byref(win),
+                                ctypes.byref(x), ctypes.byref(y), ctypes.byref(i), ctypes.byref(i), ctypes.byref(mask))
+        return x.value, y.value
+
+    def idle_duration(self):
+        if not self.xss.XScreenSaverQueryInfo(self.display, self.root, self.info):
+            return 0.0
+        return self.info.contents.idle / 1000.0
+
+    def jiggle(self):
+        for dx, dy in JIGGLE:
+            self.xtst.XTestFakeRelativeMotionEvent(self.display, dx, dy, 0)
+        self.xlib.XFlush(self.display)
+
+
+class timespec(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+
+def libc_pair():
+    libc = ctypes.CDLL(ctypes.util.find_library("c"))
+    legacy_lib = ctypes.CDLL(ctypes.util.find_library("c"))
+
+    def before():
+        ts = timespec()
+        legacy_lib.clock_gettime(1, ctypes.byref(ts))
+        return ts.tv_nsec
+
+    clock_gettime = libc.clock_gettime
+    clock_gettime.restype = ctypes.c_int
+    ts = timespec()
+    ts_ref = ctypes.byref(ts)
+
+    def after():
+        clock_gettime(1, ts_ref)
+        return ts.tv_nsec
+    return before, after
+
+
+JIGGLE = ((1, 0), (-1, 0))
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(f"{'call':<28} {'before (ns)':>12} {'after (ns)':>12} {'speedup':>9}")
+    if sys.platform == "win32":
+        display = mouse_engine.WindowsDisplay()
+        idle = idle_detector.WindowsIdleBackend()
+        backend = mouse_engine.WindowsInputBackend()
+        report("pointer (GetCursorPos)", legacy_cursor_pos_win, display.pointer, iterations)
+        report("idle (GetLastInputInfo)", legacy_idle_ms_win, idle.idle_duration, iterations)
+        report("jiggle (SendInput)", lambda: legacy_inject_win(JIGGLE), lambda: backend.jiggle(1, 0), iterations // 10)
+    elif os.environ.get("DISPLAY") and ctypes.util.find_library("X11"):
+        legacy = LegacyX11()
+        if mouse_engine.XrandrDisplay.available():
+            report("pointer (XQueryPointer)", legacy.pointer, mouse_engine.XrandrDisplay().pointer, iterations)
+        if idle_detector.X11IdleBackend.available():
+            report("idle (XScreenSaverQuery)", legacy.idle_duration, idle_detector.X11IdleBackend().idle_duration,
+                   iterations)
+        if mouse_engine.XTestInputBackend.available():
+            backend = mouse_engine.XTestInputBackend()
+            report("jiggle (XTest + XFlush)", legacy.jiggle, lambda: backend.jiggle(1, 0), iterations // 10)
+    if sys.platform != "win32":
+        report("clock_gettime (ctypes only)", *libc_pair(), iterations)
+
+
+if __name__ == "__main__":
+    main()
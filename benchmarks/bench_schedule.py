@@ -0,0 +1,44 @@
+"""
+WeeklyCalendar 查找基准：窗口/节假日数量从 10 增长到 10000 时，
+is_active 与 next_transition 的单次耗时应基本保持不变 (O(log n))。
+
+用法: python benchmarks/bench_schedule.py
+"""
+import datetime
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.schedule import WeeklyCalendar, SECONDS_PER_WEEK, _merge
+
+SIZES = [10, 100, 1000, 10000]
+LOOKUPS = 2000
+
+
+def build_calendar(n, rng):
+    # n 个互不重叠的窗口均匀分布在一周内，再加 n 个分散的节假日
+    slot = SECONDS_PER_WEEK // n
+    windows = [(i * slot, i * slot + max(1, slot // 2)) for i in range(n)]
+    base = datetime.date(2026, 1, 1).toordinal()
+    holidays = _merge([(d, d) for d in rng.sample(range(base, base + 20 * n), n)])
+    return WeeklyCalendar(windows, holidays)
+
+
+def main():
+    rng = random.Random(42)
+    origin = datetime.datetime(2026, 1, 5)
+    print(f"{'entries':>8} {'is_active (us)':>15} {'next_transition (us)':>21}")
+    for n in SIZES:
+        calendar = build_calendar(n, rng)
+        times = [origin + datetime.timedelta(seconds=rng.randrange(365 * 86400)) for _ in range(LOOKUPS)]
+
+        t_active = timeit.timeit(lambda: [calendar.is_active(t) for t in times], number=5) / (5 * LOOKUPS)
+        t_next = timeit.timeit(lambda: [calendar.next_transition(t) for t in times], number=5) / (5 * LOOKUPS)
+        print(f"{n:>8} {t_active * 1e6:>15.2f} {t_next * 1e6:>21.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+启动开销回归检查：每项在独立的子进程中测量 (取多次中的最小值)。
+
+- 导入结构: 导入 main 不得加载 QtWidgets / ui.* / 引擎；单实例握手 (core.single_instance) 只需 QtCore + QtNetwork
+- -X importtime: ui.main_window 的累计导入耗时，以及自身耗时最高的模块
+- 首次绘制: QT_QPA_PLATFORM=offscreen 下从进程启动到主窗口第一次 Paint 事件的耗时
+
+结构检查失败时以退出码 1 结束。指定 --save 时把计时写入基线文件；
+基线文件存在时，任一计时超过 基线 * (1 + tolerance) + slack 视为回归，同样以退出码 1 结束。
+基线与机器相关，不提交到仓库。
+
+用法: python benchmarks/bench_startup.py [--repeat N] [--save] [--baseline FILE] [--tolerance 0.25]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "startup_baseline.json")
+SLACK_MS = 20.0 # 绝对容差，吸收子进程调度噪声
+
+# (导入的模块, 不得出现在 sys.modules 中的模块前缀)
+STRUCTURE = (
+    ("main", ("PySide6.QtWidgets", "ui.", "core.engine", "core.native")),
+    ("core.single_instance", ("PySide6.QtWidgets", "PySide6.QtGui", "ui.")),
+    ("ui.main_window", ("core.engine", "core.native", "core.mouse_engine", "PySide6.QtNetwork")),
+)
+
+STRUCTURE_PROBE = r"""
+import sys
+import {module}
+print("\n".join(sys.modules))
+"""
+
+PAINT_PROBE = r"""
+import time
+start = time.perf_counter()
+import sys
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QObject, QEvent, QTimer
+app = QApplication(sys.argv)
+app.setStyle("Fusion")
+from ui.main_window import MainWindow
+window = MainWindow()
+
+class FirstPaint(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint:
+            print(f"{(time.perf_counter() - start) * 1000:.3f}", flush=True)
+            app.quit()
+        return False
+
+first_paint = FirstPaint()
+window.installEventFilter(first_paint)
+QTimer.singleShot(10000, app.quit)
+window.show()
+app.exec()
+window.close()
+"""
+
+
+def run(args, env=None):
+    return subprocess.run([sys.executable] + args, cwd=ROOT, capture_output=True, text=True, env=env)
+
+
+def check_structure():
+    ok = True
+    for module, forbidden in STRUCTURE:
+        out = run(["-c", STRUCTURE_PROBE.format(module=module)])
+        if out.returncode:
+            print(f"{module:<24} skipped (import failed: {out.stderr.strip().splitlines()[-1]})")
+            continue
+        loaded = [m for m in out.stdout.split() if m.startswith(forbidden)]
+        if loaded:
+            print(f"{module:<24} FAIL: loads {', '.join(sorted(loaded)[:5])}")
+            ok = False
+        else:
+            print(f"{module:<24} ok")
+    return ok
+
+
+def import_time(module, repeat):
+    """-X importtime 的累计耗时 (ms) 与自身耗时最高的模块；导入失败时返回 None"""
+    best, top = None, []
+    for _ in range(repeat):
+        out = run(["-X", "importtime", "-c", f"import {module}"])
+        if out.returncode:
+            return None, []
+        rows = []
+        for line in out.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            rows.append((int(self_us), int(cumulative_us), name.strip()))
+        total = next(cum for _, cum, name in reversed(rows) if name == module) / 1000
+        if best is None or total < best:
+            best, top = total, sorted(rows, reverse=True)[:8]
+    return best, top
+
+
+def first_paint(repeat):
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    best = None
+    for _ in range(repeat):
+        out = run(["-c", PAINT_PROBE], env=env)
+        if out.returncode or not out.stdout.strip():
+            return None
+        ms = float(out.stdout.split()[0])
+        best = ms if best is None else min(best, ms)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", action="store_true", help="write the measured timings as the new baseline")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    print("== import structure ==")
+    ok = check_structure()
+
+    timings = {}
+    print("\n== -X importtime ==")
+    for module in ("main", "core.single_instance", "ui.main_window"):
+        total, top = import_time(module, args.repeat)
+        if total is None:
+            print(f"{module:<24} (import failed)")
+            continue
+        timings[f"import {module}"] = total
+        print(f"{module:<24} {total:>8.1f} ms")
+        if module == "ui.main_window":
+            for self_us, _, name in top:
+                print(f"    {self_us / 1000:>8.1f} ms  {name}")
+
+    print("\n== first paint (offscreen) ==")
+    paint = first_paint(args.repeat)
+    if paint is None:
+        print("unavailable (PySide6 or the offscreen platform is missing)")
+    else:
+        timings["first paint"] = paint
+        print(f"{'MainWindow':<24} {paint:>8.1f} ms")
+
+    if args.save:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(timings, f, indent=2)
+        print(f"\nbaseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print("\n== against baseline ==")
+        for name, ms in timings.items():
+            if name not in baseline:
+                continue
+            limit = baseline[name] * (1 + args.tolerance) + SLACK_MS
+            verdict = "ok" if ms <= limit else "REGRESSED"
+            ok &= ms <= limit
+            print(f"{name:<28} {ms:>8.1f} ms  (baseline {baseline[name]:.1f}, limit {limit:.1f})  {verdict}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+无界面运行 (不导入 PySide6)：python -m core.cli [--daemon] [--config-dir DIR]
+
+直接复用 ConfigManager / 调度 / 空闲检测 / 输入引擎，在 asyncio 上运行 AutomationEngine。
+前台运行时状态逐行输出到 stdout；--daemon (仅 POSIX) 脱离终端在后台运行，
+状态只写入活动日志文件 (config/activity.log)。
+
+信号:
+    SIGINT / SIGTERM  停止并退出
+    SIGHUP            重新读取 config.ini，运行中的引擎只应用变化的字段 (不重新启动)
+    SIGUSR1           把 Prometheus 格式的指标写到 stdout 与活动日志文件
+
+退出码: 0 正常结束 (停止或到达结束时间)，1 运行错误，2 配置错误。
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import signal
+import sys
+
+from core.config_mgr import ConfigManager
+from core.engine import AutomationEngine
+from core.events import Code, StatusEvent
+from core.journal import Journal
+from core.metrics import EngineMetrics, format_prometheus
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_CONFIG = 2
+
+
+def default_config_root():
+    """与界面相同的配置位置：打包后为可执行文件目录，开发时为项目根目录"""
+    if getattr(sys, 'frozen', False):
+        return os.path.dirname(sys.executable)
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class HeadlessRunner:
+    """在 asyncio 上运行引擎并处理信号"""
+
+    def __init__(self, config_mgr, journal=None, quiet=False):
+        self.config_mgr = config_mgr
+        self.journal = journal
+        self.quiet = quiet
+        self.metrics = EngineMetrics() # 跨重启累计
+        self.engine = None
+        self.exit_code = EXIT_OK
+        self._stopping = False
+
+    def _emit(self, event):
+        if self.journal:
+            self.journal.record(event)
+        if not self.quiet:
+            print(f"[{datetime.datetime.now():%H:%M:%S}] {event}", flush=True)
+
+    def _emit_code(self, code, a=None, b=None):
+        self._emit(StatusEvent(code, a, b))
+
+    def _on_error(self, event):
+        self._emit(event)
+        self.exit_code = EXIT_CONFIG if event.code == Code.CONFIG_ERROR else EXIT_ERROR
+
+    # --- 信号 (在事件循环中调用) ---
+    def stop(self):
+        self._stopping = True
+        if self.engine:
+            self.engine.stop()
+
+    def reload(self):
+        result = self.config_mgr.reload()
+        if result is None:
+            return # 文件没有变化
+        status_key, err = result
+        if err:
+            self._emit_code(Code.CONFIG_ERROR, err)
+            return
+        try:
+            config = self.config_mgr.snapshot()
+        except ValueError as e:
+            self._emit_code(Code.CONFIG_ERROR, str(e))
+            return
+        if self.engine:
+            self.engine.apply_config(config)
+
+    def dump_metrics(self):
+        text = format_prometheus(self.metrics.samples())
+        if not self.quiet:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+        if self.journal:
+            self.journal.write(text.rstrip("\n"))
+
+    def _install_signals(self, loop):
+        handlers = {signal.SIGINT: self.stop, signal.SIGTERM: self.stop}
+        if hasattr(signal, "SIGHUP"):
+            handlers[signal.SIGHUP] = self.reload
+        if hasattr(signal, "SIGUSR1"):
+            handlers[signal.SIGUSR1] = self.dump_metrics
+        for sig, handler in handlers.items():
+            try:
+                loop.add_signal_handler(sig, handler)
+            except (NotImplementedError, RuntimeError):
+                # Windows: 事件循环不支持信号处理器，退回 signal.signal 并转交事件循环
+                signal.signal(sig, lambda *_, h=handler: loop.call_soon_threadsafe(h))
+
+    async def run(self):
+        self._install_signals(asyncio.get_running_loop())
+        self._emit_code(Code.STARTED)
+        try:
+            config = self.config_mgr.snapshot()
+        except ValueError as e:
+            self._on_error(StatusEvent(Code.CONFIG_ERROR, str(e)))
+        else:
+            self.engine = AutomationEngine(config, metrics=self.metrics)
+            self.engine.on_status = self._emit
+            self.engine.on_error = self._on_error
+            if self.engine.is_expired():
+                self._emit_code(Code.WORK_PERIOD_ENDED)
+            elif not self._stopping:
+                await self.engine.run()
+        self.engine = None
+        self._emit_code(Code.STOPPED)
+        return self.exit_code
+
+
+def daemonize(pidfile=None):
+    """POSIX 两次 fork 脱离终端；标准输入输出重定向到 /dev/null"""
+    if not hasattr(os, "fork"):
+        raise OSError("--daemon is only supported on POSIX; run in the foreground instead")
+    if os.fork():
+        os._exit(0)
+    os.setsid()
+    if os.fork():
+        os._exit(0)
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    os.close(devnull)
+    if pidfile:
+        with open(pidfile, "w") as f:
+            f.write(f"{os.getpid()}\n")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m core.cli", description="Run Ever Pulse without the GUI.")
+    parser.add_argument("--config-dir", help="directory containing config/config.ini (default: the application directory)")
+    parser.add_argument("--daemon", action="store_true", help="detach and run in the background (POSIX only)")
+    parser.add_argument("--pidfile", help="write the daemon's process id to this file")
+    parser.add_argument("--quiet", action="store_true", help="do not print status lines")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    config_mgr = ConfigManager(os.path.abspath(args.config_dir) if args.config_dir else default_config_root())
+    pidfile = os.path.abspath(args.pidfile) if args.pidfile else None
+    if args.daemon:
+        daemonize(pidfile)
+
+    # 写入线程须在 fork 之后创建
+    try:
+        journal = Journal.from_config(config_mgr.snapshot())
+    except ValueError:
+        journal = None # 配置无效：由 runner 报告并以 EXIT_CONFIG 退出
+
+    runner = HeadlessRunner(config_mgr, journal, quiet=args.quiet or args.daemon)
+    try:
+        return asyncio.run(runner.run())
+    finally:
+        if journal:
+            journal.close()
+        if args.daemon and pidfile:
+            try:
+                os.remove(pidfile)
+            except OSError:
+                pass
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,7 @@
 import configparser
+import importlib
+import io
+import math
 import os
 import sys
 
@@ -11,6 +14,111 @@ def resource_path(relative_path):
 
     return os.path.join(base_path, relative_path)
 
+def _parse_bool(value):
+    if value in ("True", "true", "1", "yes", "on"):
+        return True
+    if value in ("False", "false", "0", "no", "off", ""):
+        return False
+    raise ValueError(value)
+
+def _registered(module, registry, *extra):
+    """注册表中的名称 + extra；校验时才导入，config_mgr 的导入链不加载后端与本地调用层"""
+    def names():
+        return tuple(getattr(importlib.import_module(module), registry)) + extra
+    return names
+
+_DIRECTIONS = ("Up", "Down", "Left", "Right", "上", "下", "左", "右")
+
+# 快照字段: (键, 类型, 约束)；类型 "path" 为相对 config 目录的文件路径
+# 约束: 数值为取值范围 (含两端，None 表示不限)，str 为允许的取值 (元组，或返回元组的函数)，None 为不限
+_SNAPSHOT_FIELDS = (
+    ('start_hour', int, (0, 23)), ('start_minute', int, (0, 59)), ('start_second', int, (0, 59)),
+    ('end_hour', int, (0, 23)), ('end_minute', int, (0, 59)), ('end_second', int, (0, 59)),
+    ('interval', int, (1, None)), ('direction', str, _DIRECTIONS), ('pixels', int, (0, None)),
+    ('activity_threshold', int, (0, None)),
+    ('idle_backend', str, _registered("core.idle_detector", "_BACKENDS", "auto")),
+    ('input_backend', str, _registered("core.mouse_engine", "_BACKENDS", "auto")),
+    ('action', str, _registered("core.keepalive", "_ACTIONS", "auto")),
+    ('display_backend', str, _registered("core.mouse_engine", "_DISPLAYS", "auto", "none")),
+    ('motion', str, _registered("core.trajectory", "EASINGS", "jiggle", "curve", "recorded")),
+    ('motion_duration', float, (0, None)),
+    ('motion_library', "path", None),
+    ('mode', str, ("interval", "jit")), ('idle_timeout', float, (0, None)), ('jit_margin', float, (0, None)),
+    ('auto_close_enabled', bool, None), ('auto_close_delay_seconds', int, (0, None)),
+    ('windows', str, None), ('windows_file', "path", None), ('holidays_file', "path", None),
+    ('journal_enabled', bool, None), ('journal_max_kb', int, (1, None)),
+    ('journal_backups', int, (0, None)), ('journal_compress', bool, None),
+    ('metrics_port', int, (0, 65535)),
+)
+
+class ConfigSnapshot:
+    """
+    引擎使用的只读配置快照：一次性解析并校验，之后只读属性，不再访问 configparser。
+    由 ConfigManager.snapshot() 在界面线程创建，整体替换引用即完成发布 (无部分更新的中间状态)。
+    """
+    __slots__ = tuple(key for key, _, _ in _SNAPSHOT_FIELDS) + ('config_dir',)
+
+    def __init__(self, config_dir, **values):
+        object.__setattr__(self, 'config_dir', config_dir)
+        for key, value in values.items():
+            object.__setattr__(self, key, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ConfigSnapshot is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("ConfigSnapshot is immutable")
+
+    def __eq__(self, other):
+        return type(other) is ConfigSnapshot and all(
+            getattr(self, key) == getattr(other, key) for key in self.__slots__)
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, key) for key in self.__slots__))
+
+    @classmethod
+    def parse(cls, settings, config_dir):
+        """settings 为 键 -> 字符串 的映射；值无效时抛出 ValueError (消息包含键名)"""
+        values = {}
+        for key, kind, allowed in _SNAPSHOT_FIELDS:
+            raw = settings.get(key)
+            if raw is None:
+                raise ValueError(f"{key}: missing")
+            raw = raw.strip()
+            try:
+                if kind == "path":
+                    value = os.path.join(config_dir, raw) if raw else None
+                elif kind is bool:
+                    value = _parse_bool(raw)
+                else:
+                    value = kind(raw)
+            except ValueError:
+                raise ValueError(f"{key}: invalid value {raw!r}") from None
+            if kind is float and not math.isfinite(value):
+                raise ValueError(f"{key}: {raw} is not a finite number")
+            if allowed is not None and kind is str:
+                choices = allowed() if callable(allowed) else allowed
+                if value not in choices:
+                    raise ValueError(f"{key}: invalid value {raw!r} (expected one of: {', '.join(choices)})")
+            elif allowed is not None:
+                low, high = allowed
+                if value < low or (high is not None and value > high):
+                    raise ValueError(f"{key}: {raw} is out of range")
+            values[key] = value
+        return cls(config_dir, **values)
+
+    def changed_fields(self, other):
+        """与另一快照取值不同的键"""
+        return frozenset(key for key in self.__slots__ if getattr(self, key) != getattr(other, key))
+
+    @property
+    def start_seconds(self):
+        return self.start_hour * 3600 + self.start_minute * 60 + self.start_second
+
+    @property
+    def end_seconds(self):
+        return self.end_hour * 3600 + self.end_minute * 60 + self.end_second
+
 class ConfigManager:
     def __init__(self, app_path):
         self.app_path = app_path
@@ -19,7 +127,11 @@ class ConfigManager:
             os.makedirs(self.config_dir)
         self.config_path = os.path.join(self.config_dir, "config.ini")
         self.config = configparser.ConfigParser()
-        self.load_config()
+        self._file_data = None # 最近一次读取 / 写入的文件内容，用于识别没有实际变化的文件事件与保存
+        self.on_change = None # set() 改变了某个值时回调 (界面据此安排延迟保存，见 ui.config_saver)
+        self._pending = {} # set() 修改后尚未写入文件的键 -> 值，重新读取文件时保留
+        # 首次读取的结果，界面据此报告 (不再为取状态重复读取文件)
+        self.load_status, self.load_error = self.load_config()
 
     def load_config(self):
         """
@@ -30,17 +142,21 @@ class ConfigManager:
         status_key = "status_config_loaded"
         error_msg = None
         
+        # 解析到新的对象后整体替换，读取过程中不会出现只更新了一部分的设置
+        config = configparser.ConfigParser()
         if os.path.exists(self.config_path):
             try:
-                self.config.read(self.config_path, encoding='utf-8')
+                with open(self.config_path, 'rb') as f:
+                    self._file_data = f.read()
+                config.read_string(self._file_data.decode('utf-8'), self.config_path)
             except Exception as e:
                 status_key = "status_config_failed"
                 error_msg = str(e)
         else:
              status_key = "status_config_created"
         
-        if 'Settings' not in self.config:
-            self.config['Settings'] = {}
+        if 'Settings' not in config:
+            config['Settings'] = {}
             
         # 设置默认值
         defaults = {
@@ -49,29 +165,126 @@ class ConfigManager:
             'interval': '60', 'direction': 'Left', 'pixels': '1',
             'language': '中文',
             'activity_threshold': '5',
+            'idle_backend': 'auto', # 空闲检测后端: auto / windows / evdev / x11 / logind
+            'input_backend': 'auto', # 输入注入后端: auto / windows / uinput / xtest
+            'action': 'jiggle', # 保活动作: jiggle / nudge / key / execution_state / logind / auto (开销最低)
+            'display_backend': 'auto', # 显示器几何 (防止移出屏幕): auto / windows / xrandr / none
+            'motion': 'jiggle', # 移动方式: jiggle (瞬时) / linear / ease / ease_out / curve / recorded
+            'motion_duration': '0', # 平滑移动总时长 (秒，移出 + 移回)，0 为瞬时
+            'motion_library': '', # recorded 模式的录制路径库文件
+            'mode': 'interval', # interval: 按固定间隔移动; jit: 仅在即将达到系统空闲超时前移动
+            'idle_timeout': '0', # JIT 模式的目标空闲超时 (秒)，0 表示读取系统屏保/锁屏设置
+            'jit_margin': '5', # JIT 模式提前于超时的秒数
             'theme': 'Light', # 新增：主题设置
             'auto_close_enabled': 'False',
             'auto_close_delay_seconds': '10',
-            'window_x': '200', 'window_y': '200'
+            'window_x': '200', 'window_y': '200',
+            # 多窗口周历 (为空时使用上方的开始/结束时间)，例如: Mon-Fri 09:00-12:00,13:00-18:00; Sat 10:00-14:00
+            'windows': '',
+            'windows_file': '', # 周历文件，每行一个窗口条目
+            'holidays_file': '', # 节假日文件，每行一个日期 (YYYY-MM-DD) 或区间 (YYYY-MM-DD..YYYY-MM-DD)
+            'journal_enabled': 'True', # 活动日志文件 config/activity.log
+            'journal_max_kb': '1024', # 超过该大小时轮转
+            'journal_backups': '5', # 保留的轮转文件数
+            'journal_compress': 'False', # 轮转文件以 gzip 压缩
+            'metrics_port': '0' # >0 时在 127.0.0.1:<port> 提供 Prometheus 指标
         }
         
         for key, value in defaults.items():
-            if key not in self.config['Settings']:
-                self.config['Settings'][key] = value
+            if key not in config['Settings']:
+                config['Settings'][key] = value
+        self.config = config
                 
         return status_key, error_msg
 
+    def reload(self):
+        """
+        文件被外部修改后重新读取 (配置热更新)。
+        内容与最近一次读取 / 保存时相同 (例如本程序自己的保存) 时返回 None，否则返回 load_config() 的结果；
+        解析失败时保留当前设置。尚未保存的 set() 修改 (延迟写入还未到期) 覆盖在新读取的设置之上，
+        不会因为重新读取而丢失，随下一次 save() 一起写入。
+        """
+        try:
+            with open(self.config_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        if data == self._file_data:
+            return None
+        previous = self.config, self._file_data
+        result = self.load_config()
+        if result[0] == "status_config_failed":
+            # 文件无法解析 (例如仍在写入)：保留当前设置，并且不把未完成的内容当作已同步，
+            # 否则下一次 save() 会用内存中的旧设置覆盖用户正在编辑的文件
+            self.config, self._file_data = previous
+        else:
+            self.config['Settings'].update(self._pending)
+        return result
+
     def get(self, key, type_func=str):
+        """缺失或无法转换时返回 None"""
         try:
             val = self.config['Settings'].get(key)
             return type_func(val)
-        except:
+        except (TypeError, ValueError):
             return None
 
+    def snapshot(self):
+        """当前设置的只读快照 (ConfigSnapshot)；值无效时抛出 ValueError"""
+        return ConfigSnapshot.parse(self.config['Settings'], self.config_dir)
+
     def set(self, key, value):
-        self.config['Settings'][key] = str(value)
+        value = str(value)
+        settings = self.config['Settings']
+        if settings.get(key) == value:
+            return
+        settings[key] = value
+        self._pending[key] = value
+        if self.on_change:
+            self.on_change()
 
     def save(self):
+        """
+        写入 config.ini；内容与文件相同时跳过 (返回 False)。
+        先完整写入同目录的临时文件并 fsync，再原子替换 (os.replace)：
+        崩溃或断电时文件要么是旧内容、要么是新内容，不会被截断。
+        """
         # Allow exception to propagate to UI
-        with open(self.config_path, 'w', encoding='utf-8') as f:
-            self.config.write(f)
+        buf = io.StringIO()
+        self.config.write(buf)
+        data = buf.getvalue().encode('utf-8')
+        if data == self._file_data and os.path.exists(self.config_path):
+            self._pending.clear()
+            return False
+        tmp_path = self.config_path + ".tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.config_path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        self._fsync_dir()
+        self._file_data = data
+        self._pending.clear()
+        return True
+
+    def _fsync_dir(self):
+        """POSIX: 同步目录项，使改名本身在断电后也能保留 (Windows 不支持打开目录，跳过)"""
+        if not hasattr(os, "O_DIRECTORY"):
+            return
+        try:
+            fd = os.open(self.config_dir, os.O_RDONLY | os.O_DIRECTORY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
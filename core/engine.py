@@ -0,0 +1,417 @@
+import datetime
+import time
+
+from core import idle_detector, keepalive, mouse_engine
+from core.events import Code, StatusEvent
+from core.metrics import EngineMetrics
+from core.schedule import build_schedule, seconds_of_day, ACTIVE, ENDED
+from core.ticker import TickScheduler
+from core.trajectory import Trajectory, PathLibrary, TrajectoryPlayer, STEPS_PER_SECOND
+from core.waiter import DeadlineWaiter
+
+DIRECTION_MAP = {
+    "上": (0, -1), "Up": (0, -1),
+    "下": (0, 1),  "Down": (0, 1),
+    "左": (-1, 0), "Left": (-1, 0),
+    "右": (1, 0),  "Right": (1, 0)
+}
+
+# 热更新时按变化的字段分组应用 (见 AutomationEngine.apply_config)
+SCHEDULE_FIELDS = frozenset({'start_hour', 'start_minute', 'start_second', 'end_hour', 'end_minute',
+                             'end_second', 'windows', 'windows_file', 'holidays_file'})
+MOTION_FIELDS = frozenset({'direction', 'pixels', 'motion', 'motion_duration', 'motion_library'})
+JIT_FIELDS = frozenset({'mode', 'idle_timeout', 'jit_margin'})
+RESTART_FIELDS = frozenset({'idle_backend', 'input_backend'}) # 后端替换需要重新启动
+ENGINE_FIELDS = SCHEDULE_FIELDS | MOTION_FIELDS | JIT_FIELDS | RESTART_FIELDS | {
+    'interval', 'activity_threshold', 'action', 'display_backend'}
+
+
+class _Motion:
+    """按配置 motion / motion_duration 预计算的平滑移动 (轨迹缓冲区，或 recorded 模式的录制路径库)"""
+    __slots__ = ("kind", "duration", "steps", "trajectory", "library", "library_index", "target")
+
+    def __init__(self, kind, duration, library=None):
+        self.kind = kind
+        self.duration = duration
+        self.steps = max(1, int(duration / 2 * STEPS_PER_SECOND))
+        self.library = library
+        self.library_index = 0
+        self.target = None
+        self.trajectory = Trajectory() if library is not None else Trajectory(self.steps)
+
+    def line(self, dx, dy):
+        """在预分配的缓冲区中就地计算朝 (dx, dy) 的路径"""
+        self.target = (dx, dy)
+        if self.kind == 'curve':
+            self.trajectory.line(dx, dy, self.steps, easing='ease', bend=0.25)
+        else:
+            self.trajectory.line(dx, dy, self.steps, easing=self.kind)
+
+
+class AutomationEngine:
+    """
+    调度 / 空闲检测 / 移动 主循环的协程实现，不依赖 Qt。
+
+    - 直接运行: asyncio.run(engine.run())
+    - Qt 界面: ui.worker.AutomationWorker 在 Qt 事件循环中驱动同一个协程
+
+    idle_backend / input_backend 可替换 (见 core.idle_detector / core.mouse_engine 的后端接口)，
+    未指定时按配置 idle_backend / input_backend (默认 auto) 从注册表创建；
+    每个节拍的保活动作按配置 action 创建 (见 core.keepalive，auto 选择开销最低者)；
+    waiter 为等待原语 (默认 core.waiter.DeadlineWaiter，基于 asyncio)。
+    metrics 为累计指标 (core.metrics.EngineMetrics)，可跨多个引擎实例共享。
+    状态通过回调输出: on_status(StatusEvent) / on_error(StatusEvent) / on_auto_close() (见 core.events)。
+    """
+
+    # 等待状态下没有可用边界 (如周历为空) 时的重新检查间隔
+    IDLE_RECHECK_SECONDS = 60
+
+    def __init__(self, config, idle_backend=None, input_backend=None, waiter=None, metrics=None):
+        self.config = config # 只读配置快照 (core.config_mgr.ConfigSnapshot)，运行期间不再解析
+        self._schedule = None # 预检 (is_expired) 时构建，run() 直接复用
+        # 为 None 时在 run() 中按配置 idle_backend / input_backend 创建
+        self.idle = idle_backend
+        self.input = input_backend
+        self.action = None # 运行时创建，暴露 calls / latency 指标
+        self.display = None # 显示器几何索引 (core.mouse_engine.DisplayIndex)，不可用时为 None
+        self.waiter = waiter or DeadlineWaiter()
+        self.ticker = None # 运行时创建，暴露 lateness 直方图等指标
+        self.metrics = metrics or EngineMetrics()
+        self.running = False
+
+        self.on_status = None
+        self.on_error = None
+        self.on_auto_close = None
+
+    # --- 回调 ---
+    def _status(self, code, a=None, b=None):
+        if self.on_status:
+            self.on_status(StatusEvent(code, a, b))
+
+    def _error(self, code, a=None):
+        self.metrics.errors += 1
+        if self.on_error:
+            self.on_error(StatusEvent(code, a))
+
+    # --- 控制 ---
+    def stop(self):
+        """线程安全：取消当前等待，run() 随即返回"""
+        self.waiter.cancel()
+
+    def apply_config(self, config):
+        """
+        发布新的配置快照：运行中时唤醒主循环，只应用变化的字段 (新的间隔从下一个节拍起生效)，
+        保留首次对齐 / 会话状态 / 节拍网格。引用替换是原子的，可从任意线程调用。
+        快照中有无法应用的设置 (如录制库损坏) 时报告 CONFIG_REJECTED，引擎继续按之前的设置运行。
+        """
+        if not self.running:
+            self._schedule = None
+        self.config = config
+        self.waiter.wake()
+
+    def is_expired(self, now=None):
+        """
+        Pre-flight Check: 单日模式下结束时间已过则不应启动。
+        配置无效时返回 False，交由 run() 报告错误。
+        """
+        try:
+            if self._schedule is None:
+                self._schedule = build_schedule(self.config)
+            return self._schedule.is_expired(now or datetime.datetime.now())
+        except (ValueError, OSError):
+            return False
+
+    def wakeups_per_hour(self):
+        """等待原语每小时的线程唤醒次数 (指标)"""
+        return self.waiter.wakeups_per_hour()
+
+    @staticmethod
+    def _offset(config):
+        dx, dy = DIRECTION_MAP.get(config.direction, (-1, 0))
+        return dx * config.pixels, dy * config.pixels
+
+    def _jit_lead(self, config):
+        """JIT 模式下每次移动距上次输入的秒数；非 JIT 模式或无法获取空闲超时时返回 None"""
+        if config.mode != 'jit':
+            return None
+        # Just-in-time: 目标超时未配置时读取系统屏保/锁屏超时，仍无法获取则退回固定间隔模式
+        idle_timeout = config.idle_timeout or self.idle.idle_timeout()
+        if not idle_timeout:
+            self._status(Code.JIT_UNAVAILABLE)
+            return None
+        self._status(Code.JIT_TIMEOUT, idle_timeout)
+        # 在超时前 jit_margin 秒移动一次 (至少提前 1 秒)
+        return max(1.0, idle_timeout - config.jit_margin)
+
+    @staticmethod
+    def _build_motion(config, action, dx, dy):
+        """
+        按配置创建 _Motion；瞬时移动 (jiggle、时长为 0、动作不是 jiggle、录制库为空) 时返回 None。
+        配置无效 (未知的 motion、录制库缺失或损坏) 时抛出异常，不影响正在使用的移动。
+        """
+        kind = config.motion or 'jiggle'
+        duration = config.motion_duration
+        if kind == 'jiggle' or duration <= 0 or action.name != 'jiggle':
+            return None
+        if kind == 'recorded':
+            library = PathLibrary.load(config.motion_library)
+            return _Motion(kind, duration, library) if len(library) else None
+        motion = _Motion(kind, duration)
+        motion.line(dx, dy)
+        return motion
+
+    def _fit_jiggle(self, dx, dy):
+        """
+        靠近屏幕边缘 / 显示器交界时改用仍在当前显示器内的方向，保证能移回原位；
+        原位移在任何方向都放不下时缩小到 1 像素再试，仍放不下时返回 None。
+        """
+        fitted = self.display.safe_offset(dx, dy)
+        if fitted != (0, 0) or (dx, dy) == (0, 0):
+            return fitted
+        fitted = self.display.safe_offset((dx > 0) - (dx < 0), (dy > 0) - (dy < 0))
+        return None if fitted == (0, 0) else fitted
+
+    def _jiggle_blocked(self):
+        """
+        jiggle 无法留在显示器内：改用不移动光标的输入 (nudge，其次 F15)。
+        零位移的 jiggle 在 uinput 上只会写出 SYN_REPORT (内核丢弃零位移)，不能代替保活。
+        后端都不支持时本次保活被跳过，返回 False。
+        """
+        self.metrics.jiggles_blocked += 1
+        backend = self.input
+        if getattr(backend, 'supports_nudge', False):
+            backend.nudge()
+            used = 'nudge'
+        elif getattr(backend, 'supports_key', False):
+            backend.tap_key()
+            used = 'key'
+        else:
+            used = None
+        self._status(Code.JIGGLE_BLOCKED, used)
+        return used is not None
+
+    async def _move(self, dx, dy):
+        """
+        一次保活：执行配置的保活动作，或 (jiggle 时) 按预计算轨迹平滑移出再移回。
+        返回是否发出了保活输入 (jiggle 放不下且没有替代输入时为 False)。
+        """
+        motion = self._motion
+        if motion is None:
+            if self.display is not None and self.action.name == 'jiggle':
+                fitted = self._fit_jiggle(dx, dy)
+                if fitted is None:
+                    return self._jiggle_blocked()
+                dx, dy = fitted
+            self.action.perform(dx, dy)
+            return True
+        trajectory = motion.trajectory
+        if motion.library is not None:
+            motion.library.load_into(motion.library_index, trajectory)
+            motion.library_index = (motion.library_index + 1) % len(motion.library)
+        elif (dx, dy) != motion.target:
+            motion.line(dx, dy)
+        if self.display is not None:
+            # 曲线的侧向偏移与录制路径的每一个中间点都须留在当前显示器内，而不只是终点
+            orientation = self.display.safe_orientation(trajectory.bounds())
+            if orientation is None:
+                # 整条路径放不下：退回瞬时 jiggle
+                fitted = self._fit_jiggle(dx, dy)
+                if fitted is None:
+                    return self._jiggle_blocked()
+                self.action.perform(*fitted)
+                return True
+            if orientation != (1, False):
+                trajectory.orient(*orientation)
+                motion.target = None # 缓冲区已变换，下次重新计算
+        half = motion.duration / 2
+        if await self._player.play(trajectory, half):
+            await self._player.play(trajectory, half, reverse=True)
+        self._player.restore() # 取消时一次性复位
+        return True
+
+    # --- 主循环 ---
+    async def run(self):
+        # 读取配置
+        try:
+            config = self.config
+            if self.idle is None:
+                self.idle = idle_detector.get_backend(config.idle_backend)
+            if self.input is None:
+                self.input = mouse_engine.get_backend(config.input_backend)
+            self.action = keepalive.create_action(config.action or 'jiggle', self.input)
+            self.display = mouse_engine.get_display_index(config.display_backend)
+            schedule = self._schedule or build_schedule(config)
+            start_s = config.start_second
+            interval = config.interval
+            threshold = config.activity_threshold
+            dx, dy = self._offset(config)
+            self._motion = self._build_motion(config, self.action, dx, dy)
+            self._player = TrajectoryPlayer(self.input, self.waiter)
+        except Exception as e:
+            self._error(Code.CONFIG_ERROR, str(e))
+            return
+
+        first_move = True
+
+        # 状态标记：本次会话是否已经开始工作过
+        has_active_session = False
+        # 上一轮计算出的调度边界 (用于发现休眠/时钟跳变期间越过的边界)
+        boundary = None
+        waiting_reported = False
+        rejected = None # 最近一个未能应用的快照，不再重复尝试
+        ticker = self.ticker = TickScheduler(interval)
+        metrics = self.metrics
+        metrics.bind(self)
+
+        jit_lead = self._jit_lead(config)
+        jit_mode = jit_lead is not None
+
+        # 推送式空闲检测挂接到当前事件循环，读数不再产生系统调用
+        event_driven = getattr(self.idle, "event_driven", False)
+        if hasattr(self.idle, "attach"):
+            self.idle.attach(self.waiter)
+        # 显示变更事件 (如 RRScreenChangeNotify) 同样由事件循环推送，使几何缓存失效
+        if self.display is not None:
+            self.display.attach(self.waiter)
+
+        self.running = True
+        try:
+            while not self.waiter.cancelled:
+                if self.config is not config and self.config is not rejected:
+                    # 热更新：只应用变化的字段，first_move / has_active_session / 节拍网格保持不变。
+                    # 先创建并校验全部新对象，都成功后才替换；任何一步失败时整个快照不应用，
+                    # 继续使用之前的设置运行 (直到发布下一个快照)
+                    new = self.config
+                    changed = config.changed_fields(new) & ENGINE_FIELDS
+                    action = None
+                    try:
+                        new_schedule = build_schedule(new) if changed & SCHEDULE_FIELDS else schedule
+                        if 'action' in changed:
+                            action = keepalive.create_action(new.action or 'jiggle', self.input)
+                        display = self.display
+                        if 'display_backend' in changed:
+                            display = mouse_engine.get_display_index(new.display_backend)
+                        offset, motion = (dx, dy), self._motion
+                        if changed & MOTION_FIELDS or action is not None:
+                            offset = self._offset(new)
+                            motion = self._build_motion(new, action or self.action, *offset)
+                    except Exception as e:
+                        if action is not None:
+                            action.close()
+                        rejected = new
+                        detail = str(e) if isinstance(e, (ValueError, OSError)) else f"{type(e).__name__}: {e}"
+                        self._status(Code.CONFIG_REJECTED, detail)
+                        continue
+
+                    config = new
+                    if new_schedule is not schedule:
+                        schedule = new_schedule
+                        boundary = None
+                        start_s = config.start_second
+                    if 'interval' in changed:
+                        ticker.set_interval(config.interval)
+                    threshold = config.activity_threshold
+                    if action is not None:
+                        self.action.close()
+                        metrics.replace_action(self.action, action)
+                        self.action = action
+                    if display is not self.display:
+                        if self.display is not None:
+                            self.display.detach()
+                        self.display = display
+                        if display is not None:
+                            display.attach(self.waiter)
+                    (dx, dy), self._motion = offset, motion
+                    if changed & JIT_FIELDS:
+                        jit_lead = self._jit_lead(config)
+                        jit_mode = jit_lead is not None
+                        ticker.reset() # 模式切换后立即重新评估
+                    if changed & RESTART_FIELDS:
+                        self._status(Code.RESTART_REQUIRED, ", ".join(sorted(changed & RESTART_FIELDS)))
+                    if changed - RESTART_FIELDS:
+                        self._status(Code.CONFIG_RELOADED, ", ".join(sorted(changed - RESTART_FIELDS)))
+
+                now_dt = datetime.datetime.now()
+                state = schedule.state(now_dt, has_active_session)
+
+                # 睡眠期间越过了边界 (系统休眠、NTP 校时、夏令时)：以边界时刻的状态为准，
+                # 避免跨天会话在次日被误判为"前半段"而继续运行
+                if boundary is not None and now_dt >= boundary and schedule.state(boundary, has_active_session) == ENDED:
+                    state = ENDED
+
+                # --- 核心判定逻辑 (V6 Asymmetric，见 core.schedule) ---
+                if state == ENDED:
+                    # 单日模式超过结束时间，或跨天会话自然结束 -> 视为会话完成
+                    self._status(Code.SCHEDULED_END)
+                    if self.on_auto_close:
+                        self.on_auto_close()
+                    break # 退出循环，触发自动关闭
+
+                boundary = schedule.next_transition(now_dt, has_active_session)
+
+                # --- 执行逻辑 ---
+                if state == ACTIVE:
+                    has_active_session = True
+                    waiting_reported = False
+
+                    if ticker.due() and jit_mode:
+                        idle_time = self.idle.idle_duration()
+                        metrics.idle.observe(idle_time)
+                        ticker.fire()
+                        if idle_time < jit_lead:
+                            # 用户期间有操作：直接睡到空闲即将超时的时刻，期间零轮询
+                            metrics.skips += 1
+                            self._status(Code.SKIPPED, idle_time)
+                            ticker.delay(jit_lead - idle_time)
+                        else:
+                            if await self._move(dx, dy):
+                                metrics.moves += 1
+                                self._status(Code.MOVED, seconds_of_day(now_dt))
+                            ticker.delay(jit_lead)
+
+                    elif ticker.due():
+                        idle_time = self.idle.idle_duration()
+                        metrics.idle.observe(idle_time)
+
+                        if idle_time < threshold:
+                            ticker.fire()
+                            metrics.skips += 1
+                            self._status(Code.SKIPPED, idle_time)
+                            if event_driven:
+                                # 读数免费：直接睡到空闲恰好越过阈值的时刻，而不是等下一个节拍
+                                ticker.delay(threshold - idle_time)
+                        elif first_move and now_dt.second != start_s:
+                            # Precision Alignment: 首次移动对齐到 :start_s 秒，
+                            # 之后的节拍均在该时刻的网格上 (anchor + k * interval)，不会漂移
+                            wait_s = (start_s - now_dt.second) % 60
+                            self._status(Code.ALIGNING, wait_s, start_s)
+                            ticker.anchor(now_dt.replace(microsecond=0) + datetime.timedelta(seconds=wait_s))
+                        else:
+                            ticker.fire()
+                            if await self._move(dx, dy):
+                                metrics.moves += 1
+                                self._status(Code.MOVED, seconds_of_day(now_dt))
+                        first_move = False
+
+                    deadline = ticker.next_deadline
+
+                else:
+                    # Waiting: 直接睡到下一次开始时间
+                    if not waiting_reported:
+                        self._status(Code.WAITING)
+                        waiting_reported = True
+                    ticker.reset()
+                    deadline = time.monotonic() + self.IDLE_RECHECK_SECONDS
+
+                if boundary is not None:
+                    deadline = min(deadline, ticker.to_monotonic(boundary))
+                if not await self.waiter.wait_until(ticker.clamp(deadline)): break
+                ticker.check_jump()
+        finally:
+            self.running = False
+            if hasattr(self.idle, "detach"):
+                self.idle.detach()
+            if self.display is not None:
+                self.display.detach()
+            self.action.close()
+            metrics.release(self)
@@ -0,0 +1,130 @@
+"""
+结构化状态事件：引擎 / 界面之间传递 StatusEvent (枚举代码 + 紧凑载荷)，取代字符串协议。
+
+翻译在显示时进行 (localize)，按代码查表 O(1)，无需再解析字符串；
+切换语言后重新 localize 已有事件即可得到新语言的文本。
+"""
+from enum import IntEnum
+
+from core.log_buffer import LOG_INFO, LOG_MOVE, LOG_SKIP, LOG_ERROR
+
+
+class Code(IntEnum):
+    READY = 0
+    STARTED = 1
+    STOPPED = 2
+    MOVED = 3              # a: 秒级时刻 (自当日 0 点的秒数)
+    SKIPPED = 4            # a: 空闲秒数
+    ALIGNING = 5           # a: 等待秒数, b: 对齐到的秒
+    WAITING = 6
+    SCHEDULED_END = 7
+    WORK_PERIOD_ENDED = 8
+    JIT_TIMEOUT = 9        # a: 空闲超时秒数
+    JIT_UNAVAILABLE = 10
+    CONFIG_ERROR = 11      # a: 错误信息
+    ERROR = 12             # a: 错误信息
+    THEME_CHANGED = 13     # a: 主题名
+    LANGUAGE_CHANGED = 14  # a: 语言名
+    MESSAGE = 15           # a: 语言文件中的键, b: 可选的格式化参数
+    TEXT = 16              # a: 原样显示的文本
+    CONFIG_RELOADED = 17   # a: 已应用的设置 (逗号分隔)
+    RESTART_REQUIRED = 18  # a: 需重新启动才生效的设置
+    CONFIG_REJECTED = 19   # a: 错误信息 (热更新未应用，继续使用之前的设置)
+    JIGGLE_BLOCKED = 20    # a: 代替 jiggle 的动作 ("nudge" / "key")，None 表示本次保活被跳过
+
+
+class StatusEvent:
+    __slots__ = ("code", "a", "b", "count")
+
+    def __init__(self, code, a=None, b=None):
+        self.code = code
+        self.a = a
+        self.b = b
+        self.count = 1 # 合并的重复次数 (见 ui.status_coalescer)
+
+    @property
+    def kind(self):
+        """日志过滤用的类型 (core.log_buffer.LOG_*)"""
+        return _KINDS.get(self.code, LOG_INFO)
+
+    def __repr__(self):
+        return f"StatusEvent({self.code.name}, {self.a!r}, {self.b!r})"
+
+    def __str__(self):
+        """不依赖语言文件的英文文本 (命令行 / 日志文件)"""
+        text = _PLAIN[self.code](self)
+        return f"{text} ×{self.count}" if self.count > 1 else text
+
+
+def clock(seconds):
+    """自当日 0 点的秒数 -> HH:MM:SS"""
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+_KINDS = {
+    Code.MOVED: LOG_MOVE,
+    Code.SKIPPED: LOG_SKIP,
+    Code.CONFIG_ERROR: LOG_ERROR,
+    Code.ERROR: LOG_ERROR,
+    Code.CONFIG_REJECTED: LOG_ERROR,
+    Code.JIGGLE_BLOCKED: LOG_SKIP,
+}
+
+# 代码 -> (i18n, event) -> 本地化文本；带参数的模板经 I18n.format (编译时转换好的模板)
+_LOCALIZERS = {
+    Code.READY: lambda i, e: i.get("log_ready"),
+    Code.STARTED: lambda i, e: i.get("log_started"),
+    Code.STOPPED: lambda i, e: i.get("log_stopped"),
+    Code.MOVED: lambda i, e: i.format("log_moved", clock(e.a)),
+    Code.SKIPPED: lambda i, e: i.format("status_skipped", f"{e.a:.1f}"),
+    Code.ALIGNING: lambda i, e: i.format("status_aligning_first_move", e.a, e.b),
+    Code.WAITING: lambda i, e: i.get("log_waiting"),
+    Code.SCHEDULED_END: lambda i, e: i.get("log_scheduled_end"),
+    Code.WORK_PERIOD_ENDED: lambda i, e: i.get("status_work_period_ended"),
+    Code.JIT_TIMEOUT: lambda i, e: i.format("status_jit_timeout", f"{e.a:g}"),
+    Code.JIT_UNAVAILABLE: lambda i, e: i.get("status_jit_unavailable"),
+    Code.CONFIG_ERROR: lambda i, e: i.format("log_config_error", e.a),
+    Code.ERROR: lambda i, e: f"{i.get('log_error_prefix')}{e.a}",
+    Code.THEME_CHANGED: lambda i, e: i.format("log_theme_changed", e.a),
+    Code.LANGUAGE_CHANGED: lambda i, e: i.format("log_lang_changed", e.a),
+    Code.MESSAGE: lambda i, e: i.get(e.a) if e.b is None else i.format(e.a, e.b),
+    Code.TEXT: lambda i, e: e.a,
+    Code.CONFIG_RELOADED: lambda i, e: i.format("log_config_reloaded", e.a),
+    Code.RESTART_REQUIRED: lambda i, e: i.format("log_config_restart_required", e.a),
+    Code.CONFIG_REJECTED: lambda i, e: i.format("log_config_rejected", e.a),
+    Code.JIGGLE_BLOCKED: lambda i, e: (i.format("log_jiggle_substituted", e.a) if e.a
+                                       else i.get("log_jiggle_skipped")),
+}
+
+_PLAIN = {
+    Code.READY: lambda e: "Ready.",
+    Code.STARTED: lambda e: "Started.",
+    Code.STOPPED: lambda e: "Stopped.",
+    Code.MOVED: lambda e: f"Moved at {clock(e.a)}",
+    Code.SKIPPED: lambda e: f"User active (idle {e.a:.1f}s), skipping...",
+    Code.ALIGNING: lambda e: f"Aligning first move: waiting {e.a}s for :{e.b:02d}",
+    Code.WAITING: lambda e: "Waiting - Outside working hours",
+    Code.SCHEDULED_END: lambda e: "Scheduled end reached.",
+    Code.WORK_PERIOD_ENDED: lambda e: "Work period has ended.",
+    Code.JIT_TIMEOUT: lambda e: f"Just-in-time mode: moving before the {e.a:g}s idle timeout",
+    Code.JIT_UNAVAILABLE: lambda e: "Idle timeout unavailable, using fixed interval",
+    Code.CONFIG_ERROR: lambda e: f"Config Error: {e.a}",
+    Code.ERROR: lambda e: f"Error: {e.a}",
+    Code.THEME_CHANGED: lambda e: f"Theme changed to {e.a}",
+    Code.LANGUAGE_CHANGED: lambda e: f"Language changed to {e.a}",
+    Code.MESSAGE: lambda e: e.a if e.b is None else f"{e.a}: {e.b}",
+    Code.TEXT: lambda e: e.a,
+    Code.CONFIG_RELOADED: lambda e: f"Configuration updated: {e.a}",
+    Code.RESTART_REQUIRED: lambda e: f"Restart required to apply: {e.a}",
+    Code.CONFIG_REJECTED: lambda e: f"Configuration not applied, keeping the previous settings: {e.a}",
+    Code.JIGGLE_BLOCKED: lambda e: (f"No room to move the cursor on this monitor, sent {e.a} instead" if e.a
+                                    else "No room to move the cursor on this monitor, keep-alive skipped"),
+}
+
+
+def localize(event, i18n):
+    """按 i18n (core.i18n.I18n) 的当前语言渲染事件。原始字符串原样返回"""
+    if isinstance(event, StatusEvent):
+        text = _LOCALIZERS[event.code](i18n, event)
+        return f"{text} ×{event.count}" if event.count > 1 else text
+    return event
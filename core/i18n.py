@@ -1,37 +1,218 @@
+"""
+界面文本。
+
+assets/language.ini 为源文件；构建时 (tools/compile_i18n.py，main.spec 会自动执行) 编译为
+assets/language.cat 并随程序打包。运行时只读取目录头和当前语言的数据块：
+
+    language.cat = MAGIC | 目录头长度 (4 字节) | marshal(目录头) | marshal(语言 1) | marshal(语言 2) ...
+    目录头: {"languages": [名称, ...], "blocks": {名称: (偏移, 长度)}}
+    语言块: (文本 {键: 文本}, 模板 {键: printf 模板})
+
+模板在编译时由 "{}" / "{:02d}" 之类的占位符转换为等价的 printf 形式 ("%s" / "%02d")，
+运行时 format() 直接做 % 运算，不再逐次解析 str.format 模板。
+language.cat 缺失、比 language.ini 旧 (开发环境) 或无法读取 (损坏、截断) 时，在内存中解析
+language.ini。运行时从不写出目录文件，只有 tools/compile_i18n.py 生成它，不会在源码树中留下产物。
+"""
 import configparser
+import marshal
 import os
+import re
+import string
+import struct
+
 from core.config_mgr import resource_path
 
+MAGIC = b"EPCAT1\n"
+_HEADER = struct.Struct("<I")
+
+# 可以无损转换为 printf 形式的格式说明 (如 "02d", ".1f"；空说明转换为 %s)
+_PRINTF_SPEC = re.compile(r"0?\d*(?:\.\d+)?[dfx]")
+
+
+def _printf_template(text):
+    """把只含顺序位置占位符的 str.format 模板转换为 printf 模板；无法等价转换时返回 None"""
+    parts = []
+    position = 0
+    for literal, field, spec, conversion in string.Formatter().parse(text):
+        parts.append(literal.replace("%", "%%"))
+        if field is None:
+            continue
+        if field not in ("", str(position)) or conversion or (spec and not _PRINTF_SPEC.fullmatch(spec)):
+            return None
+        parts.append("%" + (spec or "s"))
+        position += 1
+    return "".join(parts)
+
+
+def _field_count(text):
+    return sum(1 for _, field, _, _ in string.Formatter().parse(text) if field is not None)
+
+
+def _compile_language(texts):
+    """-> (文本, 模板)；模板只包含能转换为 printf 形式的条目，其余在运行时退回 str.format"""
+    templates = {}
+    for key, text in texts.items():
+        if _field_count(text):
+            template = _printf_template(text)
+            if template is not None:
+                templates[key] = template
+    return texts, templates
+
+
+def parse_source(ini_path):
+    """读取 language.ini -> {语言: {键: 文本}} (保持文件中的顺序)"""
+    config = configparser.ConfigParser(interpolation=None)
+    with open(ini_path, encoding="utf-8") as f:
+        config.read_file(f)
+    return {section: dict(config[section]) for section in config.sections()}
+
+
+def check_coverage(languages, referenced=()):
+    """
+    键覆盖检查：各语言的键集合一致、同一模板的占位符数量一致、代码引用的键都存在。
+    返回问题描述列表 (为空表示通过)。
+    """
+    problems = []
+    if not languages:
+        return ["no languages defined"]
+    names = list(languages)
+    reference = languages[names[0]]
+    for name in names[1:]:
+        texts = languages[name]
+        for key in reference.keys() - texts.keys():
+            problems.append(f"[{name}] missing key '{key}'")
+        for key in texts.keys() - reference.keys():
+            problems.append(f"[{name}] key '{key}' is not in [{names[0]}]")
+        for key in reference.keys() & texts.keys():
+            try:
+                if _field_count(reference[key]) != _field_count(texts[key]):
+                    problems.append(f"[{name}] '{key}' has different placeholders than [{names[0]}]")
+            except ValueError as e:
+                problems.append(f"[{name}] '{key}': {e}")
+    for key in sorted(set(referenced) - reference.keys()):
+        problems.append(f"key '{key}' is used in code but not defined")
+    return problems
+
+
+def compile_catalog(languages, out_path):
+    """把 parse_source() 的结果写成 language.cat (先写临时文件再改名)"""
+    blocks, offset = [], 0
+    index = {}
+    for name, texts in languages.items():
+        blob = marshal.dumps(_compile_language(texts))
+        index[name] = (offset, len(blob))
+        blocks.append(blob)
+        offset += len(blob)
+    header = marshal.dumps({"languages": list(languages), "blocks": index})
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC + _HEADER.pack(len(header)) + header)
+        for blob in blocks:
+            f.write(blob)
+    os.replace(tmp_path, out_path)
+
+
 class I18n:
-    def __init__(self, assets_dir):
-        self.languages = {}
-        self.current_language = "中文"
+    def __init__(self, assets_dir, language=None):
+        self.current_language = language or "中文" # 只加载这一种语言
         self.language_file_path = resource_path(os.path.join(assets_dir, "language.ini"))
+        self.catalog_path = resource_path(os.path.join(assets_dir, "language.cat"))
+        self._names = []
+        self._blocks = {}
+        self._data_start = 0
+        self._source = None # 无法使用已编译目录时在内存中解析的源文件
+        self._texts = {} # 当前语言 {键: 文本}
+        self._templates = {} # 当前语言 {键: printf 模板}
         self.load_language_file()
 
     def load_language_file(self):
-        if not os.path.exists(self.language_file_path):
-             # Default fallback if file missing
-             return
-
+        """读取目录头 (不加载任何语言的数据)，再加载当前语言；目录不可用时改用源文件"""
+        self._source = None
         try:
-            config = configparser.ConfigParser()
-            config.read(self.language_file_path, encoding='utf-8')
-            for section in config.sections():
-                self.languages[section] = dict(config[section])
+            if self._catalog_stale():
+                self._use_source()
+            else:
+                try:
+                    self._read_header()
+                except Exception as e:
+                    if not os.path.exists(self.language_file_path):
+                        raise
+                    print(f"Language catalog is unusable ({e}), reading language.ini instead")
+                    self._use_source()
         except Exception as e:
             print(f"Error loading language file: {e}")
+            return
+        if not self._load(self.current_language) and self._names:
+            self.current_language = self._names[0]
+            self._load(self.current_language)
+
+    def _catalog_stale(self):
+        """源文件存在且目录缺失或比它旧"""
+        if not os.path.exists(self.language_file_path):
+            return False
+        return (not os.path.exists(self.catalog_path)
+                or os.path.getmtime(self.language_file_path) > os.path.getmtime(self.catalog_path))
+
+    def _use_source(self):
+        self._source = parse_source(self.language_file_path)
+        self._names = list(self._source)
+
+    def _read_header(self):
+        with open(self.catalog_path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError("not a language catalog")
+            size, = _HEADER.unpack(f.read(_HEADER.size))
+            header = marshal.loads(f.read(size))
+        self._names = list(header["languages"])
+        self._blocks = dict(header["blocks"])
+        self._data_start = len(MAGIC) + _HEADER.size + size
+
+    def _read_block(self, language):
+        offset, size = self._blocks[language]
+        with open(self.catalog_path, "rb") as f:
+            f.seek(self._data_start + offset)
+            texts, templates = marshal.loads(f.read(size))
+        if not isinstance(texts, dict) or not isinstance(templates, dict):
+            raise ValueError(f"malformed block for {language}")
+        return texts, templates
+
+    def _load(self, language):
+        if language not in self._names:
+            return False
+        if self._source is None:
+            try:
+                texts, templates = self._read_block(language)
+            except Exception as e:
+                # 数据块损坏 / 截断：改用源文件 (之后切换语言也不再读取目录)
+                try:
+                    self._use_source()
+                except Exception:
+                    print(f"Error loading language '{language}': {e}")
+                    return False
+        if self._source is not None:
+            if language not in self._source:
+                return False
+            texts, templates = _compile_language(self._source[language])
+        self._texts, self._templates = texts, templates
+        return True
 
     def get(self, key):
-        if self.current_language in self.languages:
-            return self.languages[self.current_language].get(key, key)
-        return key
+        return self._texts.get(key, key)
+
+    def format(self, key, *args):
+        """等价于 get(key).format(*args)，使用编译时转换好的模板"""
+        template = self._templates.get(key)
+        if template is not None:
+            return template % args
+        return self._texts.get(key, key).format(*args)
 
     def set_language(self, language):
-        if language in self.languages:
+        if language == self.current_language and self._texts:
+            return True
+        if self._load(language):
             self.current_language = language
             return True
         return False
-    
+
     def get_available_languages(self):
-        return list(self.languages.keys())
+        return list(self._names)
@@ -1,16 +1,359 @@
+"""
+空闲检测后端。
+
+后端接口:
+    idle_duration() -> float: 自上次用户输入以来的空闲秒数
+    idle_timeout() -> float | None: 系统空闲超时 (屏保/锁屏)，未启用或无法读取时返回 None
+
+已注册后端: windows (GetLastInputInfo)、evdev (推送式，监听输入设备)、x11 (XScreenSaver)、
+logind (IdleHint)、fake (测试用)。
+本模块导入时不加载任何本地库，可在任意平台导入。
+"""
 import ctypes
-from ctypes import windll, Structure, c_uint, byref
+import ctypes.util
+import os
+import subprocess
+import sys
+import threading
+import time
+from ctypes import c_uint, byref
+
+from core import native
+
+SPI_GETSCREENSAVEACTIVE = 0x0010
+SPI_GETSCREENSAVETIMEOUT = 0x000E
+
+# 同一 tick 内多个调用方共享一次本地查询
+DEFAULT_CACHE_TTL = 0.1
+
+_BACKENDS = {}
+
+def register_backend(name):
+    """类装饰器：以 name 注册空闲检测后端"""
+    def decorator(cls):
+        cls.name = name
+        _BACKENDS[name] = cls
+        return cls
+    return decorator
+
+def available_backends():
+    return [name for name, cls in _BACKENDS.items() if cls.available()]
+
+@register_backend("windows")
+class WindowsIdleBackend:
+    """GetLastInputInfo + GetTickCount64 (dwTime 为 32 位，按模 2^32 计算差值，49.7 天回绕后仍正确)"""
+
+    @staticmethod
+    def available():
+        return sys.platform == "win32"
+
+    def __init__(self):
+        self._user32 = ctypes.windll.user32
+        native.bindings() # 预先解析并声明原型
+
+    def idle_duration(self):
+        try:
+            return native.idle_ms() / 1000.0  # 转为秒 (预分配的 LASTINPUTINFO，见 core.native)
+        except Exception:
+            return 0.0
+
+    def idle_timeout(self):
+        active = c_uint(0)
+        timeout = c_uint(0)
+        try:
+            self._user32.SystemParametersInfoW(SPI_GETSCREENSAVEACTIVE, 0, byref(active), 0)
+            if not active.value:
+                return None
+            self._user32.SystemParametersInfoW(SPI_GETSCREENSAVETIMEOUT, 0, byref(timeout), 0)
+        except Exception:
+            return None
+        return float(timeout.value) if timeout.value else None
+
+# 自身注入设备 (uinput) 的名称前缀，推送式检测需忽略
+OWN_DEVICE_PREFIX = "ever-pulse"
+# /sys/class/input/eventN/device/capabilities/ev 中的 EV_KEY / EV_REL / EV_ABS 位
+_EV_INPUT_MASK = (1 << 1) | (1 << 2) | (1 << 3)
+
+@register_backend("evdev")
+class EvdevIdleBackend:
+    """
+    推送式空闲检测：监听 /dev/input/event* 的可读事件，在内存中记录最后一次输入时刻，
+    读取空闲时长不产生任何系统调用。
+
+    需由事件循环驱动: attach(waiter) 通过 waiter.watch(fd, callback) 注册
+    (asyncio 为 loop.add_reader / epoll，Qt 为 QSocketNotifier)。
+    未挂接时退回轮询后端 (x11 / logind) 的读数；空闲超时同样取自轮询后端。
+    需要对输入设备的读权限 (通常为 input 用户组)。
+    """
+    event_driven = True
+
+    @staticmethod
+    def available():
+        return sys.platform.startswith("linux") and bool(EvdevIdleBackend._device_paths())
+
+    @staticmethod
+    def _device_paths():
+        paths = []
+        try:
+            names = sorted(os.listdir("/sys/class/input"))
+        except OSError:
+            return paths
+        for name in names:
+            if not name.startswith("event"):
+                continue
+            sys_dir = os.path.join("/sys/class/input", name, "device")
+            try:
+                with open(os.path.join(sys_dir, "capabilities", "ev")) as f:
+                    caps = int(f.read().split()[-1], 16)
+                with open(os.path.join(sys_dir, "name")) as f:
+                    dev_name = f.read().strip()
+            except (OSError, ValueError, IndexError):
+                continue
+            path = os.path.join("/dev/input", name)
+            if caps & _EV_INPUT_MASK and not dev_name.startswith(OWN_DEVICE_PREFIX) and os.access(path, os.R_OK):
+                paths.append(path)
+        return paths
+
+    def __init__(self, fallback=None):
+        self._fds = []
+        for path in self._device_paths():
+            try:
+                self._fds.append(os.open(path, os.O_RDONLY | os.O_NONBLOCK))
+            except OSError:
+                continue
+        if not self._fds:
+            raise OSError("No readable input devices")
+        if fallback is None:
+            fallback = self._polling_fallback()
+        self._fallback = fallback
+        self._waiter = None
+        self.on_input = None # 可选回调: 每批输入事件后调用
+        # 以轮询后端的读数作为初始值，无法获取时视为刚刚有输入
+        initial = fallback.idle_duration() if fallback else 0.0
+        self.last_input = time.monotonic() - initial
+
+    @staticmethod
+    def _polling_fallback():
+        for name in available_backends():
+            if getattr(_BACKENDS[name], "event_driven", False):
+                continue
+            try:
+                return _BACKENDS[name]()
+            except OSError:
+                continue
+        return None
+
+    def attach(self, waiter):
+        self._waiter = waiter
+        for fd in self._fds:
+            waiter.watch(fd, lambda fd=fd: self._on_readable(fd))
+
+    def detach(self):
+        if self._waiter is not None:
+            for fd in self._fds:
+                self._waiter.unwatch(fd)
+            self._waiter = None
+
+    def _on_readable(self, fd):
+        try:
+            while os.read(fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        except OSError:
+            # 设备被拔出
+            if self._waiter is not None:
+                self._waiter.unwatch(fd)
+            return
+        self.last_input = time.monotonic()
+        if self.on_input:
+            self.on_input()
+
+    def idle_duration(self):
+        if self._waiter is None and self._fallback is not None:
+            return self._fallback.idle_duration()
+        return time.monotonic() - self.last_input
+
+    def idle_timeout(self):
+        return self._fallback.idle_timeout() if self._fallback else None
+
+    def close(self):
+        self.detach()
+        for fd in self._fds:
+            os.close(fd)
+        self._fds = []
+
+@register_backend("x11")
+class X11IdleBackend:
+    """X11 MIT-SCREEN-SAVER 扩展 (libXss)：idle 字段即为自上次输入以来的毫秒数 (本线程的 X 连接，见 core.native)"""
+
+    @staticmethod
+    def available():
+        return bool(os.environ.get("DISPLAY")) and ctypes.util.find_library("Xss") is not None
+
+    def __init__(self):
+        if native.bindings().XScreenSaverQueryInfo is None:
+            raise OSError("libXss is not available")
 
-class LASTINPUTINFO(Structure):
-    _fields_ = [("cbSize", c_uint), ("dwTime", c_uint)]
+    def idle_duration(self):
+        return native.idle_ms() / 1000.0
+
+    def idle_timeout(self):
+        timeout = native.screensaver_timeout()
+        return float(timeout) if timeout > 0 else None
+
+@register_backend("logind")
+class LogindIdleBackend:
+    """
+    systemd-logind 会话的 IdleHint (由桌面环境在其自身空闲超时后设置)，适用于 Wayland / 无 X11 的会话。
+    精度取决于桌面环境；IdleHint 未设置时视为用户活跃。
+
+    loginctl 是子进程调用 (最长 2 秒超时)，而引擎可能运行在界面线程中，因此由后台线程每
+    poll_interval 秒查询一次并保存 IdleSinceHintMonotonic；idle_duration() 只读取保存的值，不阻塞。
+    IdleHint 的变化最多延迟 poll_interval 秒被发现，首次查询完成前视为用户活跃。
+    """
+    POLL_INTERVAL = 1.0
+
+    @staticmethod
+    def available():
+        return sys.platform.startswith("linux") and os.path.exists("/run/systemd/seats")
+
+    def __init__(self, session=None, poll_interval=POLL_INTERVAL):
+        self._session = session or os.environ.get("XDG_SESSION_ID", "auto")
+        self.poll_interval = poll_interval
+        self._since = None # 空闲开始时刻 (monotonic 秒)，活跃时为 None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _properties(self, *names):
+        try:
+            out = subprocess.run(
+                ["loginctl", "show-session", self._session] + [f"--property={n}" for n in names],
+                capture_output=True, text=True, timeout=2).stdout
+        except (OSError, subprocess.SubprocessError):
+            return {}
+        return dict(line.split("=", 1) for line in out.splitlines() if "=" in line)
+
+    def _idle_since(self):
+        props = self._properties("IdleHint", "IdleSinceHintMonotonic")
+        if props.get("IdleHint") != "yes":
+            return None
+        try:
+            since_us = int(props.get("IdleSinceHintMonotonic", "0"))
+        except ValueError:
+            return None
+        # logind 使用 CLOCK_MONOTONIC 微秒，与 Linux 上的 time.monotonic() 同源
+        return since_us / 1e6 if since_us else None
+
+    def _run(self):
+        while True:
+            self._since = self._idle_since()
+            if self._stop.wait(self.poll_interval):
+                return
+
+    def idle_duration(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="logind-idle", daemon=True)
+            self._thread.start()
+        since = self._since
+        return max(0.0, time.monotonic() - since) if since is not None else 0.0
+
+    def idle_timeout(self):
+        return None
+
+    def close(self):
+        self._stop.set()
+
+@register_backend("fake")
+class FakeIdleBackend:
+    """确定性的测试后端：空闲时间与超时完全由调用方控制，并统计查询次数"""
+
+    @staticmethod
+    def available():
+        return False # 仅在显式指定时使用
+
+    def __init__(self, idle=0.0, timeout=None, event_driven=False):
+        self.event_driven = event_driven
+        self.idle = float(idle)
+        self.timeout = timeout
+        self.queries = 0
+
+    def advance(self, seconds):
+        self.idle += seconds
+
+    def touch(self):
+        """模拟一次用户输入"""
+        self.idle = 0.0
+
+    def idle_duration(self):
+        self.queries += 1
+        return self.idle
+
+    def idle_timeout(self):
+        return self.timeout
+
+class CachedIdleBackend:
+    """
+    短 TTL 缓存：TTL 内的重复读取复用上一次本地查询，并按经过的时间外推空闲时长。
+    """
+
+    def __init__(self, backend, ttl=DEFAULT_CACHE_TTL, clock=time.monotonic):
+        self.backend = backend
+        self.ttl = ttl
+        self._clock = clock
+        self._value = 0.0
+        self._read_at = None
+
+    @property
+    def name(self):
+        return self.backend.name
+
+    def idle_duration(self):
+        now = self._clock()
+        if self._read_at is None or now - self._read_at >= self.ttl:
+            self._value = self.backend.idle_duration()
+            self._read_at = now
+            return self._value
+        return self._value + (now - self._read_at)
+
+    def invalidate(self):
+        self._read_at = None
+
+    def idle_timeout(self):
+        return self.backend.idle_timeout()
+
+def create_backend(name=None, **kwargs):
+    """
+    创建后端实例；name 为空或 'auto' 时按平台自动选择第一个可用后端。
+    Raises:
+        ValueError: 未知后端或没有可用后端
+    """
+    if name and name != "auto":
+        if name not in _BACKENDS:
+            raise ValueError(f"Unknown idle backend: {name}")
+        return _BACKENDS[name](**kwargs)
+    for candidate in available_backends():
+        try:
+            return _BACKENDS[candidate](**kwargs)
+        except OSError:
+            continue
+    raise ValueError("No idle backend available on this platform")
+
+_instances = {}
+
+def get_backend(name=None):
+    """返回按名称共享的后端 (默认自动选择)，轮询式后端外包一层短 TTL 缓存"""
+    key = name or "auto"
+    if key not in _instances:
+        backend = create_backend(name)
+        # 推送式后端的读取本身没有开销，无需缓存
+        _instances[key] = backend if getattr(backend, "event_driven", False) else CachedIdleBackend(backend)
+    return _instances[key]
 
 def get_idle_duration():
     """返回自上次用户输入（鼠标/键盘）以来的空闲秒数"""
-    lii = LASTINPUTINFO()
-    lii.cbSize = ctypes.sizeof(LASTINPUTINFO)
-    try:
-        windll.user32.GetLastInputInfo(byref(lii))    # 获取最后一次输入的 TickCount
-        elapsed = windll.kernel32.GetTickCount() - lii.dwTime  # 系统启动后经过的毫秒数减去上次输入时刻
-        return elapsed / 1000.0  # 转为秒
-    except Exception:
-        return 0.0
+    return get_backend().idle_duration()
+
+def get_idle_timeout():
+    """返回系统空闲超时秒数 (屏保/锁屏)，无法获取时返回 None"""
+    return get_backend().idle_timeout()
@@ -0,0 +1,119 @@
+"""
+单实例锁 (不依赖 Qt)：进程存活期间持有锁文件上的排他锁，进程退出或崩溃时由系统释放。
+
+锁文件按用户区分 (见 lock_path)，共享的临时目录中不同用户互不影响。
+只有锁被其他进程持有时才视为"实例在运行"；无法创建或打开锁文件等其他错误以 OSError 抛出。
+"""
+import errno
+import getpass
+import os
+import re
+import sys
+import tempfile
+
+# 非阻塞加锁失败时表示"被其他进程持有"的 errno (flock: EWOULDBLOCK；msvcrt.locking: EACCES / EDEADLOCK)
+_CONTENDED = {errno.EAGAIN, errno.EWOULDBLOCK, errno.EACCES, getattr(errno, "EDEADLOCK", errno.EDEADLK)}
+
+if sys.platform == "win32":
+    import msvcrt
+
+    def _try_lock(fd, shared=False):
+        # Windows 没有共享锁：探测同样使用排他锁 (立即释放)
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+
+    def _unlock(fd):
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _try_lock(fd, shared=False):
+        fcntl.flock(fd, (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | fcntl.LOCK_NB)
+
+    def _unlock(fd):
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+def user_key():
+    """当前用户的标识 (只含文件名安全的字符)，用于区分锁文件与本地套接字名"""
+    try:
+        name = getpass.getuser()
+    except (OSError, KeyError, ImportError):
+        name = str(os.getuid()) if hasattr(os, "getuid") else "user"
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+
+
+def runtime_dir():
+    """按用户的运行时目录：XDG_RUNTIME_DIR (仅本用户可访问)，Windows 为 LOCALAPPDATA，否则为临时目录"""
+    for var in ("XDG_RUNTIME_DIR", "LOCALAPPDATA"):
+        path = os.environ.get(var)
+        if path and os.path.isdir(path):
+            return path
+    return tempfile.gettempdir()
+
+
+def lock_path(app_key):
+    # 退回共享的临时目录时文件名中的用户名保证各用户使用不同的锁
+    return os.path.join(runtime_dir(), f"{app_key}-{user_key()}.lock")
+
+
+class InstanceLock:
+    """锁文件上的排他锁 (内容为持有者 PID，仅供排查)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+
+    @property
+    def held(self):
+        return self._fd is not None
+
+    def acquire(self):
+        """
+        取得锁返回 True；其他进程持有时立即返回 False (不等待)。
+        Raises:
+            OSError: 锁文件无法创建或加锁失败的原因不是被占用
+        """
+        if self._fd is not None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            _try_lock(fd)
+        except OSError as e:
+            os.close(fd)
+            if e.errno in _CONTENDED:
+                return False
+            raise
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode("ascii"))
+        self._fd = fd
+        return True
+
+    def probe(self):
+        """
+        其他进程是否持有锁。不创建、不修改锁文件，只短暂持有共享锁 (POSIX)，
+        多个探测之间互不冲突。正在启动的实例恰好与探测冲突时由 SingleInstance.notify_running 重试。
+        """
+        if self._fd is not None:
+            return False
+        try:
+            fd = os.open(self.path, os.O_RDONLY)
+        except FileNotFoundError:
+            return False # 从未有实例运行过
+        try:
+            _try_lock(fd, shared=True)
+        except OSError as e:
+            if e.errno in _CONTENDED:
+                return True
+            raise
+        else:
+            _unlock(fd)
+        finally:
+            os.close(fd)
+        return False
+
+    def release(self):
+        if self._fd is not None:
+            os.close(self._fd) # 关闭即释放锁
+            self._fd = None
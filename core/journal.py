@@ -0,0 +1,141 @@
+"""
+活动日志文件 (追加写入，按大小轮转，可选 gzip 压缩)。
+
+调用方只把条目放入无锁队列 (collections.deque 的 append / popleft 在 CPython 中是原子的)，
+由专用的后台线程按 flush_interval 批量写入并刷新，磁盘慢 (如网络盘) 时也不会阻塞
+自动化循环或 UI 线程。写入线程跟不上时队列达到 max_pending 后丢弃最旧的条目并计数。
+"""
+import collections
+import datetime
+import gzip
+import os
+import shutil
+import threading
+import time
+
+from core.events import StatusEvent
+
+DEFAULT_MAX_BYTES = 1024 * 1024
+DEFAULT_BACKUPS = 5
+
+
+class Journal:
+    """
+    path 为当前日志文件；超过 max_bytes 时轮转为 path.1 … path.{backups} (compress 时为 .N.gz)，
+    backups 为 0 时直接丢弃旧内容。dropped / errors / written 为累计计数 (见 metrics 输出)。
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES, backups=DEFAULT_BACKUPS, compress=False,
+                 flush_interval=1.0, max_pending=10000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.compress = compress
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.dropped = 0 # 队列溢出丢弃的条数
+        self.errors = 0 # 写入失败的批次数
+        self.written = 0
+        self._queue = collections.deque(maxlen=max_pending)
+        self._stop = threading.Event()
+        self._file = None
+        self._thread = threading.Thread(target=self._run, name="journal-writer", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        按校验过的配置快照 (ConfigManager.snapshot()) 的 journal_* 创建 config/activity.log 的日志；
+        journal_enabled 为 False 时返回 None。布尔值的各种写法 (true / yes / 1 …) 由快照统一解析。
+        """
+        if not config.journal_enabled:
+            return None
+        return cls(os.path.join(config.config_dir, "activity.log"),
+                   max_bytes=config.journal_max_kb * 1024,
+                   backups=config.journal_backups,
+                   compress=config.journal_compress)
+
+    # --- 生产者 (任意线程，不阻塞) ---
+    def record(self, event):
+        """记录一个状态事件；只保存快照 (事件对象之后可能被合并计数修改)"""
+        self._put((time.time(), event.code, event.a, event.b))
+
+    def write(self, text):
+        self._put((time.time(), None, text, None))
+
+    def _put(self, item):
+        if len(self._queue) >= self.max_pending:
+            self.dropped += 1
+        self._queue.append(item)
+
+    def close(self, timeout=2.0):
+        """停止写入线程并写出剩余条目 (最多等待 timeout 秒)"""
+        self._stop.set()
+        self._thread.join(timeout)
+
+    # --- 写入线程 ---
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self._flush()
+        self._flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @staticmethod
+    def _format(item):
+        ts, code, a, b = item
+        stamp = datetime.datetime.fromtimestamp(ts).isoformat(timespec="seconds")
+        if code is None:
+            return f"{stamp} {a}\n"
+        return f"{stamp} {code.name} {StatusEvent(code, a, b)}\n"
+
+    def _flush(self):
+        queue = self._queue
+        if not queue:
+            return
+        lines = []
+        try:
+            while True:
+                lines.append(self._format(queue.popleft()))
+        except IndexError:
+            pass
+        data = "".join(lines).encode("utf-8")
+        try:
+            if self._file is None:
+                self._file = open(self.path, "ab")
+            if self._file.tell() and self._file.tell() + len(data) > self.max_bytes:
+                self._rotate()
+            self._file.write(data)
+            self._file.flush()
+            self.written += len(lines)
+        except OSError:
+            # 磁盘不可用：丢弃本批，下一批重新打开文件
+            self.errors += 1
+            if self._file is not None:
+                try:
+                    self._file.close()
+                except OSError:
+                    pass
+                self._file = None
+
+    def _backup_name(self, i):
+        return f"{self.path}.{i}.gz" if self.compress else f"{self.path}.{i}"
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        if self.backups > 0:
+            for i in range(self.backups - 1, 0, -1):
+                src = self._backup_name(i)
+                if os.path.exists(src):
+                    os.replace(src, self._backup_name(i + 1))
+            if self.compress:
+                with open(self.path, "rb") as src, gzip.open(self._backup_name(1), "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                os.remove(self.path)
+            else:
+                os.replace(self.path, self._backup_name(1))
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, "ab")
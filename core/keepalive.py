@@ -0,0 +1,189 @@
+"""
+保活动作：引擎每个节拍执行一次，让会话保持活跃。
+
+动作接口:
+    perform(dx, dy): 执行一次保活 (dx, dy 仅 jiggle 使用)
+    calls: 累计本地调用 (系统调用) 次数
+    latency: 每次 perform 的耗时直方图 (秒)
+    COST: 每次 perform 注入的输入事件数 (系统需要处理并分发给前台程序的事件)
+    resets_idle: 是否重置系统空闲计时 (在线状态 / 锁屏)；仅阻止休眠的动作为 False
+    close(): 释放资源 (如休眠抑制)
+
+已注册动作 (按打扰程度从低到高): nudge (零位移输入)、key (F15)、jiggle (光标移动并返回)、
+execution_state (Windows SetThreadExecutionState)、logind (systemd-inhibit 空闲/休眠抑制)。
+auto 在可用且 resets_idle 的动作中选择 COST 最低者，相同时取注册顺序靠前者：
+输入类动作每次都只有一次本地调用，区别在于注入的事件数 (nudge 1，key 按下 + 释放 2，
+jiggle 移动 + 返回 2)，因此顺序为 nudge > key > jiggle (key 不移动光标，排在 jiggle 之前)。
+"""
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+from core.metrics import Histogram, CALL_BUCKETS
+
+_ACTIONS = {}
+
+def register_action(name):
+    """类装饰器：以 name 注册保活动作"""
+    def decorator(cls):
+        cls.name = name
+        _ACTIONS[name] = cls
+        return cls
+    return decorator
+
+def available_actions(backend):
+    return [name for name, cls in _ACTIONS.items() if cls.available(backend)]
+
+class KeepAliveAction:
+    """动作基类：子类实现 _perform(dx, dy)，返回本次发起的本地调用次数"""
+    COST = 1 # 输入事件数，见模块说明
+    resets_idle = True
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.calls = 0
+        self.latency = Histogram(CALL_BUCKETS)
+
+    def perform(self, dx, dy):
+        start = time.perf_counter()
+        self.calls += self._perform(dx, dy)
+        self.latency.observe(time.perf_counter() - start)
+
+    def close(self):
+        pass
+
+# --- 输入类动作 (经由 core.mouse_engine 的注入后端) ---
+
+@register_action("nudge")
+class NudgeAction(KeepAliveAction):
+    """零位移相对移动：重置空闲计时而光标不动"""
+
+    @staticmethod
+    def available(backend):
+        return backend is not None and getattr(backend, "supports_nudge", False)
+
+    def _perform(self, dx, dy):
+        self.backend.nudge()
+        return 1
+
+@register_action("key")
+class KeyAction(KeepAliveAction):
+    """按下并释放 F15 (多数程序不响应该键)"""
+    COST = 2
+
+    @staticmethod
+    def available(backend):
+        return backend is not None and getattr(backend, "supports_key", False)
+
+    def _perform(self, dx, dy):
+        self.backend.tap_key()
+        return 1
+
+@register_action("jiggle")
+class JiggleAction(KeepAliveAction):
+    """光标移动 (dx, dy) 并返回，同一次本地调用"""
+    COST = 2
+
+    @staticmethod
+    def available(backend):
+        return backend is not None
+
+    def _perform(self, dx, dy):
+        self.backend.jiggle(dx, dy)
+        return 1
+
+# --- 休眠 / 空闲抑制 (不重置空闲计时，只阻止休眠与锁屏) ---
+
+ES_CONTINUOUS = 0x80000000
+ES_SYSTEM_REQUIRED = 0x00000001
+ES_DISPLAY_REQUIRED = 0x00000002
+
+@register_action("execution_state")
+class ExecutionStateAction(KeepAliveAction):
+    """
+    SetThreadExecutionState(ES_CONTINUOUS | ...)：创建时设置一次，在调用线程存活期间持续有效，
+    节拍内无需任何调用。必须在运行事件循环的线程上创建与关闭。
+    """
+    COST = 0
+    resets_idle = False
+
+    @staticmethod
+    def available(backend):
+        return sys.platform == "win32"
+
+    def __init__(self, backend):
+        super().__init__(backend)
+        import ctypes
+        self._kernel32 = ctypes.windll.kernel32
+        if not self._kernel32.SetThreadExecutionState(ES_CONTINUOUS | ES_SYSTEM_REQUIRED | ES_DISPLAY_REQUIRED):
+            raise OSError("SetThreadExecutionState failed")
+        self.calls += 1
+
+    def _perform(self, dx, dy):
+        return 0
+
+    def close(self):
+        if self._kernel32 is not None:
+            self._kernel32.SetThreadExecutionState(ES_CONTINUOUS)
+            self.calls += 1
+            self._kernel32 = None
+
+@register_action("logind")
+class LogindInhibitAction(KeepAliveAction):
+    """
+    通过 systemd-inhibit 持有 logind 的 idle:sleep 抑制锁，子进程存活期间有效。
+    bus_address 可指定替代的 D-Bus 系统总线 (子进程的 DBUS_SYSTEM_BUS_ADDRESS)，如本地的模拟总线；
+    command 可替换整条命令 (默认 COMMAND)。两者都经 create_action('logind', backend, **kwargs) 传入。
+    每个节拍只检查一次子进程状态 (waitpid)，子进程退出时重新获取。
+    """
+    COST = 0
+    resets_idle = False
+    COMMAND = ("systemd-inhibit", "--what=idle:sleep", "--who=Ever-Pulse",
+               "--why=Keep session active", "--mode=block", "sleep", "infinity")
+
+    @staticmethod
+    def available(backend):
+        return sys.platform.startswith("linux") and shutil.which("systemd-inhibit") is not None
+
+    def __init__(self, backend, bus_address=None, command=None):
+        super().__init__(backend)
+        self._command = tuple(command) if command else self.COMMAND
+        self._env = dict(os.environ, DBUS_SYSTEM_BUS_ADDRESS=bus_address) if bus_address else None
+        self._proc = None
+        self._acquire()
+
+    def _acquire(self):
+        self._proc = subprocess.Popen(self._command, env=self._env, stdin=subprocess.DEVNULL,
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.calls += 1
+
+    def _perform(self, dx, dy):
+        if self._proc.poll() is not None:
+            self._acquire() # 子进程已退出 (如 logind 重启)，重新获取
+        return 1
+
+    def close(self):
+        if self._proc is not None:
+            self._proc.terminate()
+            self._proc.wait()
+            self._proc = None
+
+def create_action(name, backend, **kwargs):
+    """
+    创建保活动作；name 为空或 'auto' 时选择开销最低的可用动作。
+    Raises:
+        ValueError: 未知动作或动作在当前后端上不可用
+    """
+    if name and name != "auto":
+        if name not in _ACTIONS:
+            raise ValueError(f"Unknown keep-alive action: {name}")
+        cls = _ACTIONS[name]
+        if not cls.available(backend):
+            raise ValueError(f"Keep-alive action not available: {name}")
+        return cls(backend, **kwargs)
+    candidates = [_ACTIONS[n] for n in available_actions(backend) if _ACTIONS[n].resets_idle]
+    if not candidates:
+        raise ValueError("No keep-alive action available")
+    return min(candidates, key=lambda cls: cls.COST)(backend, **kwargs)
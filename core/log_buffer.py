@@ -0,0 +1,65 @@
+"""
+活动日志的固定容量环形缓冲区 (不依赖 Qt)。
+
+条目按追加序号 seq 寻址，仅 [first_seq, total) 范围内的条目仍在缓冲区中；
+append 为 O(1)，写满后覆盖最旧的条目，不移动任何已有数据。
+"""
+import time
+
+# 条目类型 (按位组合为过滤掩码)
+LOG_INFO = 1
+LOG_MOVE = 2
+LOG_SKIP = 4
+LOG_ERROR = 8
+LOG_ALL = LOG_INFO | LOG_MOVE | LOG_SKIP | LOG_ERROR
+
+DEFAULT_CAPACITY = 50000
+
+
+class LogBuffer:
+    """时间戳 / 类型 / 文本分列预分配，写入时无额外分配 (除文本本身)"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._times = [0.0] * capacity
+        self._kinds = bytearray(capacity)
+        self._texts = [None] * capacity
+        self.total = 0 # 累计追加条数，即下一条的 seq
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    @property
+    def first_seq(self):
+        return self.total - len(self)
+
+    @property
+    def full(self):
+        return self.total >= self.capacity
+
+    def append(self, kind, text, timestamp=None):
+        """追加一条并返回其 seq；缓冲区已满时最旧的一条 (first_seq) 被覆盖"""
+        seq = self.total
+        slot = seq % self.capacity
+        self._times[slot] = time.time() if timestamp is None else timestamp
+        self._kinds[slot] = kind
+        self._texts[slot] = text
+        self.total = seq + 1
+        return seq
+
+    def touch(self, seq, timestamp=None):
+        """更新一条的时间戳 (合并重复状态时使用)"""
+        self._times[seq % self.capacity] = time.time() if timestamp is None else timestamp
+
+    def kind(self, seq):
+        return self._kinds[seq % self.capacity]
+
+    def get(self, seq):
+        """返回 (timestamp, kind, text)；seq 须在 [first_seq, total) 内"""
+        slot = seq % self.capacity
+        return self._times[slot], self._kinds[slot], self._texts[slot]
+
+    def matching(self, mask):
+        """按时间顺序返回类型属于 mask 的所有 seq"""
+        kinds, cap = self._kinds, self.capacity
+        return [seq for seq in range(self.first_seq, self.total) if kinds[seq % cap] & mask]
@@ -0,0 +1,146 @@
+import bisect
+
+
+class Histogram:
+    """
+    固定桶直方图 (预分配计数数组，记录时无额外分配)。
+    bounds 为各桶的上界 (升序)，最后隐含一个 +Inf 桶。
+    """
+
+    def __init__(self, bounds):
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """按桶上界估算分位数；落在 +Inf 桶时返回观测到的最大值"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+
+    def reset(self):
+        for i in range(len(self.counts)):
+            self.counts[i] = 0
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+
+# 秒为单位的延迟桶：0.5ms ~ 5s
+LATENCY_BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+# 单次本地调用的耗时桶：1us ~ 100ms
+CALL_BUCKETS = (0.000001, 0.000005, 0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.1)
+
+# 空闲时长桶 (秒)
+IDLE_BUCKETS = (1, 2, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+
+class EngineMetrics:
+    """
+    引擎的累计指标，跨多次启动 / 停止保持单调递增 (Prometheus counter 语义)。
+    计数器为普通整数字段，直方图预分配；每个节拍只做整数加法与一次分桶，不分配对象。
+    bind() 让当前运行的 ticker / 保活动作直接写入这里的直方图，release() 在结束时累加其计数。
+    """
+    __slots__ = ("moves", "skips", "errors", "jiggles_blocked", "idle", "lateness", "call_latency",
+                 "_calls", "_wakeups", "_engine")
+
+    def __init__(self):
+        self.moves = 0
+        self.skips = 0 # 因用户活动跳过的节拍
+        self.errors = 0
+        self.jiggles_blocked = 0 # 显示器内放不下 jiggle，改用 nudge / F15 或跳过的次数
+        self.idle = Histogram(IDLE_BUCKETS) # 每次检查时读到的空闲秒数
+        self.lateness = Histogram(LATENCY_BUCKETS) # 节拍迟到量
+        self.call_latency = Histogram(CALL_BUCKETS) # 保活动作 (本地调用) 耗时
+        self._calls = 0 # 已结束的运行累计的本地调用次数
+        self._wakeups = 0
+        self._engine = None
+
+    def bind(self, engine):
+        engine.ticker.lateness = self.lateness
+        engine.action.latency = self.call_latency
+        self._engine = engine
+
+    def replace_action(self, old, new):
+        """运行中替换保活动作 (配置热更新)：累加旧动作的调用次数，新动作写入同一直方图"""
+        self._calls += old.calls
+        new.latency = self.call_latency
+
+    def release(self, engine):
+        if self._engine is engine:
+            self._calls += engine.action.calls
+            self._wakeups += engine.waiter.wakeups
+            self._engine = None
+
+    @property
+    def running(self):
+        return self._engine is not None and self._engine.running
+
+    @property
+    def calls(self):
+        engine = self._engine
+        return self._calls + (engine.action.calls if engine else 0)
+
+    @property
+    def wakeups(self):
+        engine = self._engine
+        return self._wakeups + (engine.waiter.wakeups if engine else 0)
+
+    @property
+    def wakeups_per_hour(self):
+        engine = self._engine
+        return engine.wakeups_per_hour() if engine else 0.0
+
+    def samples(self):
+        """(名称, 类型, 说明, 值或直方图)，名称不含前缀"""
+        return (
+            ("running", "gauge", "1 while the automation loop is running", int(self.running)),
+            ("moves_total", "counter", "Keep-alive moves performed", self.moves),
+            ("skips_total", "counter", "Ticks skipped because the user was active", self.skips),
+            ("errors_total", "counter", "Engine errors", self.errors),
+            ("jiggles_blocked_total", "counter",
+             "Jiggles that did not fit on the monitor and were replaced or skipped", self.jiggles_blocked),
+            ("idle_seconds", "histogram", "User idle time observed at each tick", self.idle),
+            ("tick_lateness_seconds", "histogram", "Tick firing delay behind its deadline", self.lateness),
+            ("loop_wakeups_total", "counter", "Wakeups of the automation loop", self.wakeups),
+            ("loop_wakeups_per_hour", "gauge", "Wakeup rate of the current run", self.wakeups_per_hour),
+            ("native_calls_total", "counter", "Native calls made by keep-alive actions", self.calls),
+            ("native_call_seconds", "histogram", "Latency of one keep-alive action", self.call_latency),
+        )
+
+
+def format_prometheus(samples, prefix="everpulse_"):
+    """按 Prometheus 文本格式 (0.0.4) 输出 samples()；只在被抓取时分配"""
+    lines = []
+    for name, kind, help_text, value in samples:
+        name = prefix + name
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == "histogram":
+            cumulative = 0
+            for bound, count in zip(value.bounds, value.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{le="{bound:g}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{le="+Inf"}} {value.count}')
+            lines.append(f"{name}_sum {value.sum:.9g}")
+            lines.append(f"{name}_count {value.count}")
+        else:
+            lines.append(f"{name} {value:.9g}" if isinstance(value, float) else f"{name} {value}")
+    lines.append("")
+    return "\n".join(lines)
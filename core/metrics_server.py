@@ -0,0 +1,47 @@
+from PySide6.QtNetwork import QTcpServer, QHostAddress
+from PySide6.QtCore import QObject
+
+class MetricsServer(QObject):
+    """
+    仅监听 127.0.0.1 的最小 HTTP 端点，任何 GET 请求都返回 Prometheus 文本格式的指标。
+    运行在 Qt 事件循环中 (非阻塞套接字)，不额外占用线程；provider 只在被抓取时调用。
+    """
+    CONTENT_TYPE = b"text/plain; version=0.0.4; charset=utf-8"
+    MAX_REQUEST = 8192
+
+    def __init__(self, provider, parent=None):
+        super().__init__(parent)
+        self.provider = provider
+        self.scrapes = 0
+        self._server = QTcpServer(self)
+        self._server.newConnection.connect(self._on_connection)
+
+    def listen(self, port):
+        """端口被占用等失败时抛出 OSError"""
+        if not self._server.listen(QHostAddress(QHostAddress.LocalHost), port):
+            raise OSError(f"Cannot listen on 127.0.0.1:{port}: {self._server.errorString()}")
+
+    def close(self):
+        self._server.close()
+
+    def _on_connection(self):
+        while self._server.hasPendingConnections():
+            socket = self._server.nextPendingConnection()
+            buf = bytearray()
+            socket.readyRead.connect(lambda s=socket, b=buf: self._on_ready_read(s, b))
+            socket.disconnected.connect(socket.deleteLater)
+
+    def _on_ready_read(self, socket, buf):
+        buf += bytes(socket.readAll())
+        if b"\r\n\r\n" not in buf and len(buf) < self.MAX_REQUEST:
+            return # 请求头尚未收全
+        if buf.startswith(b"GET "):
+            self.scrapes += 1
+            body = self.provider().encode("utf-8")
+            head = b"HTTP/1.0 200 OK\r\nContent-Type: " + self.CONTENT_TYPE
+        else:
+            body = b"Method Not Allowed\n"
+            head = b"HTTP/1.0 405 Method Not Allowed\r\nContent-Type: text/plain"
+        socket.readyRead.disconnect() # 每个连接只应答一次
+        socket.write(head + b"\r\nContent-Length: %d\r\nConnection: close\r\n\r\n" % len(body) + body)
+        socket.disconnectFromHost()
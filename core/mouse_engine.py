@@ -1,37 +1,528 @@
+"""
+输入注入后端。
+
+后端接口:
+    move_batch(motions): 在一次本地调用中注入一组相对移动 [(dx, dy), ...]
+    move_relative(dx, dy): 单次相对移动
+    jiggle(dx, dy): 移动并立即返回原位 (同一批次，无阻塞等待)
+    nudge(): 零位移相对移动 (supports_nudge 为 True 时可重置空闲计时)
+    tap_key(): 按下并释放 F15 (supports_key)
+    calls: 已执行的本地注入调用次数
+
+已注册后端: windows (SendInput)、uinput (Linux 内核虚拟设备)、xtest (X11 XTest)、null (仅记录)。
+显示器几何 (DisplayIndex): windows (EnumDisplayMonitors)、xrandr、fake，用于让移动不越出当前显示器。
+本模块导入时不加载任何本地库，可在任意平台导入。
+"""
 import ctypes
-from ctypes import windll, Structure, c_long, byref
+import ctypes.util
+import os
+import struct
+import sys
 import time
+from ctypes import Structure, c_long, c_ulong, byref
+
+from core import native
+from core.idle_detector import OWN_DEVICE_PREFIX
+from core.native import POINT, VK_F15, XK_F15
+from core.trajectory import Trajectory, STEPS_PER_SECOND
+
+_BACKENDS = {}
+
+def register_backend(name):
+    """类装饰器：以 name 注册输入注入后端"""
+    def decorator(cls):
+        cls.name = name
+        _BACKENDS[name] = cls
+        return cls
+    return decorator
+
+def available_backends():
+    return [name for name, cls in _BACKENDS.items() if cls.available()]
+
+class InputBackend:
+    """后端基类：子类只需实现 _inject(motions)，一次调用完成整批注入"""
+    supports_nudge = False # 零位移移动是否会被系统当作一次输入
+    supports_key = False
+
+    def __init__(self):
+        self.calls = 0
+
+    def move_batch(self, motions):
+        if motions:
+            self._inject(motions)
+            self.calls += 1
+
+    def move_relative(self, dx, dy):
+        self.move_batch(((dx, dy),))
+
+    def jiggle(self, dx, dy):
+        self.move_batch(((dx, dy), (-dx, -dy)))
+
+    def nudge(self):
+        self._inject(((0, 0),))
+        self.calls += 1
+
+    def tap_key(self):
+        """按下并释放 F15 (一次本地调用)"""
+        self._tap_key()
+        self.calls += 1
+
+    def _tap_key(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+# --- Windows ---
+
+@register_backend("windows")
+class WindowsInputBackend(InputBackend):
+    """SendInput：整批移动换算为绝对坐标 (不受指针加速度影响)，作为多个 INPUT 记录一次提交 (预分配缓冲区，见 core.native)"""
+    supports_nudge = True
+    supports_key = True
+
+    @staticmethod
+    def available():
+        return sys.platform == "win32"
+
+    def _inject(self, motions):
+        native.send_motions(motions)
+
+    def _tap_key(self):
+        native.send_key(VK_F15)
+
+# --- Linux uinput ---
+
+EV_SYN, EV_KEY, EV_REL = 0x00, 0x01, 0x02
+SYN_REPORT = 0
+REL_X, REL_Y = 0x00, 0x01
+BTN_LEFT = 0x110
+KEY_F15 = 185
+BUS_VIRTUAL = 0x06
+UI_SET_EVBIT = 0x40045564
+UI_SET_KEYBIT = 0x40045565
+UI_SET_RELBIT = 0x40045566
+UI_DEV_SETUP = 0x405C5503
+UI_DEV_CREATE = 0x5501
+UI_DEV_DESTROY = 0x5502
+_INPUT_EVENT = struct.Struct("llHHi")
+
+@register_backend("uinput")
+class UinputInputBackend(InputBackend):
+    """
+    /dev/uinput 虚拟指针设备：整批事件 (含 SYN_REPORT) 打包为一次 write()。
+    不依赖显示服务器 (X11 / Wayland 均可)，需要对 /dev/uinput 的写权限。
+    内核会丢弃值为 0 的相对移动事件，因此不支持 nudge。
+    """
+    DEVICE_NAME = OWN_DEVICE_PREFIX + " virtual pointer"
+    supports_key = True
+
+    @staticmethod
+    def available():
+        return sys.platform.startswith("linux") and os.access("/dev/uinput", os.W_OK)
+
+    def __init__(self, path="/dev/uinput"):
+        super().__init__()
+        import fcntl
+        self._fd = os.open(path, os.O_WRONLY | os.O_NONBLOCK)
+        try:
+            fcntl.ioctl(self._fd, UI_SET_EVBIT, EV_KEY)
+            fcntl.ioctl(self._fd, UI_SET_KEYBIT, BTN_LEFT) # 部分桌面只把带按键的设备识别为指针
+            fcntl.ioctl(self._fd, UI_SET_KEYBIT, KEY_F15)
+            fcntl.ioctl(self._fd, UI_SET_EVBIT, EV_REL)
+            fcntl.ioctl(self._fd, UI_SET_RELBIT, REL_X)
+            fcntl.ioctl(self._fd, UI_SET_RELBIT, REL_Y)
+            setup = struct.pack("HHHH80sI", BUS_VIRTUAL, 0x1, 0x1, 1, self.DEVICE_NAME.encode(), 0)
+            fcntl.ioctl(self._fd, UI_DEV_SETUP, setup)
+            fcntl.ioctl(self._fd, UI_DEV_CREATE)
+        except OSError:
+            os.close(self._fd)
+            raise
+        self._ioctl = fcntl.ioctl
+
+    def _inject(self, motions):
+        buf = bytearray()
+        for dx, dy in motions:
+            if dx:
+                buf += _INPUT_EVENT.pack(0, 0, EV_REL, REL_X, dx)
+            if dy:
+                buf += _INPUT_EVENT.pack(0, 0, EV_REL, REL_Y, dy)
+            buf += _INPUT_EVENT.pack(0, 0, EV_SYN, SYN_REPORT, 0)
+        os.write(self._fd, buf)
+
+    def _tap_key(self):
+        os.write(self._fd, b"".join((
+            _INPUT_EVENT.pack(0, 0, EV_KEY, KEY_F15, 1),
+            _INPUT_EVENT.pack(0, 0, EV_SYN, SYN_REPORT, 0),
+            _INPUT_EVENT.pack(0, 0, EV_KEY, KEY_F15, 0),
+            _INPUT_EVENT.pack(0, 0, EV_SYN, SYN_REPORT, 0),
+        )))
+
+    def close(self):
+        if self._fd is not None:
+            self._ioctl(self._fd, UI_DEV_DESTROY)
+            os.close(self._fd)
+            self._fd = None
+
+# --- X11 XTest ---
+
+@register_backend("xtest")
+class XTestInputBackend(InputBackend):
+    """XTestFakeRelativeMotionEvent 排队后由一次 XFlush 发送整批请求 (本线程的 X 连接，见 core.native)"""
+    supports_nudge = True
+
+    @staticmethod
+    def available():
+        return bool(os.environ.get("DISPLAY")) and ctypes.util.find_library("Xtst") is not None
+
+    def __init__(self):
+        super().__init__()
+        if native.bindings().XTestFakeRelativeMotionEvent is None:
+            raise OSError("libXtst is not available")
+        # 键盘映射中没有 F15 时不支持按键动作
+        self.supports_key = native.key_supported(XK_F15)
+
+    def _inject(self, motions):
+        native.send_motions(motions)
+
+    def _tap_key(self):
+        native.send_key(XK_F15)
+
+# --- Null ---
+
+@register_backend("null")
+class NullInputBackend(InputBackend):
+    """不注入任何输入，只记录每批移动 (测试 / 基准用)"""
+    supports_nudge = True
+    supports_key = True
+
+    @staticmethod
+    def available():
+        return False # 仅在显式指定时使用
+
+    def __init__(self):
+        super().__init__()
+        self.events = []
+
+    def _inject(self, motions):
+        self.events.append((time.monotonic(), tuple(motions)))
+
+    def _tap_key(self):
+        self.events.append((time.monotonic(), "F15"))
+
+def create_backend(name=None, **kwargs):
+    """
+    创建后端实例；name 为空或 'auto' 时按平台自动选择第一个可用后端。
+    Raises:
+        ValueError: 未知后端或没有可用后端
+    """
+    if name and name != "auto":
+        if name not in _BACKENDS:
+            raise ValueError(f"Unknown input backend: {name}")
+        return _BACKENDS[name](**kwargs)
+    for candidate in available_backends():
+        try:
+            return _BACKENDS[candidate](**kwargs)
+        except OSError:
+            continue
+    raise ValueError("No input backend available on this platform")
+
+_instances = {}
+
+def get_backend(name=None):
+    """返回按名称共享的后端实例 (默认自动选择)"""
+    key = name or "auto"
+    if key not in _instances:
+        _instances[key] = create_backend(name)
+    return _instances[key]
 
-class POINT(Structure):
-    _fields_ = [("x", c_long), ("y", c_long)]
+# --- 显示器几何 ---
+#
+# 显示器矩形 (x0, y0, x1, y1，半开区间) 由 DisplayIndex 缓存，只在显示变更事件时失效：
+# xrandr 通过 RRScreenChangeNotify (X 连接 fd 挂接到 waiter)，Windows 由界面层在
+# Qt 的 screenAdded / screenRemoved / geometryChanged 信号中调用 invalidate_display_geometry()。
+
+_DISPLAYS = {}
+
+def register_display(name):
+    """类装饰器：以 name 注册显示器几何后端"""
+    def decorator(cls):
+        cls.name = name
+        _DISPLAYS[name] = cls
+        return cls
+    return decorator
+
+class RECT(Structure):
+    _fields_ = [("left", c_long), ("top", c_long), ("right", c_long), ("bottom", c_long)]
+
+@register_display("windows")
+class WindowsDisplay:
+    """EnumDisplayMonitors 枚举显示器，GetCursorPos 读取光标"""
+
+    @staticmethod
+    def available():
+        return sys.platform == "win32"
+
+    def __init__(self):
+        self._user32 = ctypes.windll.user32
+        self.on_change = None
+
+    def monitors(self):
+        rects = []
+        def collect(hmonitor, hdc, rect, data):
+            r = rect.contents
+            rects.append((r.left, r.top, r.right, r.bottom))
+            return True
+        proc = ctypes.WINFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p,
+                                  ctypes.POINTER(RECT), ctypes.c_void_p)(collect)
+        self._user32.EnumDisplayMonitors(None, None, proc, 0)
+        return rects
+
+    def pointer(self):
+        return native.cursor_pos()
+
+class XRRMonitorInfo(Structure):
+    _fields_ = [("name", c_ulong), ("primary", ctypes.c_int), ("automatic", ctypes.c_int),
+                ("noutput", ctypes.c_int), ("x", ctypes.c_int), ("y", ctypes.c_int),
+                ("width", ctypes.c_int), ("height", ctypes.c_int), ("mwidth", ctypes.c_int),
+                ("mheight", ctypes.c_int), ("outputs", ctypes.c_void_p)]
+
+RRScreenChangeNotifyMask = 1 << 0
+
+@register_display("xrandr")
+class XrandrDisplay:
+    """
+    XRRGetMonitors 枚举显示器，光标位置由 core.native 读取。
+    attach(waiter) 订阅 RRScreenChangeNotify 并监听 X 连接的 fd，变更时调用 on_change；
+    事件在自己的 X 连接上接收，不与 core.native 按线程打开的连接混用。
+    """
+
+    @staticmethod
+    def available():
+        return bool(os.environ.get("DISPLAY")) and ctypes.util.find_library("Xrandr") is not None
+
+    def __init__(self):
+        self._xlib = ctypes.CDLL(ctypes.util.find_library("X11"))
+        self._xrandr = ctypes.CDLL(ctypes.util.find_library("Xrandr"))
+        self._xlib.XOpenDisplay.restype = ctypes.c_void_p
+        self._xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        self._xlib.XDefaultRootWindow.restype = c_ulong
+        self._xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        self._xlib.XConnectionNumber.argtypes = [ctypes.c_void_p]
+        self._xlib.XPending.argtypes = [ctypes.c_void_p]
+        self._xlib.XNextEvent.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+        self._xrandr.XRRGetMonitors.restype = ctypes.POINTER(XRRMonitorInfo)
+        self._xrandr.XRRGetMonitors.argtypes = [ctypes.c_void_p, c_ulong, ctypes.c_int, ctypes.POINTER(ctypes.c_int)]
+        self._xrandr.XRRFreeMonitors.argtypes = [ctypes.POINTER(XRRMonitorInfo)]
+        self._xrandr.XRRSelectInput.argtypes = [ctypes.c_void_p, c_ulong, ctypes.c_int]
+        self._xrandr.XRRUpdateConfiguration.argtypes = [ctypes.c_void_p]
+        self._display = self._xlib.XOpenDisplay(None)
+        if not self._display:
+            raise OSError("Cannot open X display")
+        self._root = self._xlib.XDefaultRootWindow(self._display)
+        self._event = ctypes.create_string_buffer(192) # sizeof(XEvent)
+        self._waiter = None
+        self.on_change = None
+
+    def monitors(self):
+        count = ctypes.c_int()
+        info = self._xrandr.XRRGetMonitors(self._display, self._root, True, byref(count))
+        try:
+            return [(m.x, m.y, m.x + m.width, m.y + m.height) for m in info[:count.value]]
+        finally:
+            if info:
+                self._xrandr.XRRFreeMonitors(info)
+
+    def pointer(self):
+        return native.cursor_pos()
+
+    def attach(self, waiter):
+        self._xrandr.XRRSelectInput(self._display, self._root, RRScreenChangeNotifyMask)
+        self._waiter = waiter
+        waiter.watch(self._xlib.XConnectionNumber(self._display), self._on_readable)
+
+    def detach(self):
+        if self._waiter is not None:
+            self._waiter.unwatch(self._xlib.XConnectionNumber(self._display))
+            self._xrandr.XRRSelectInput(self._display, self._root, 0)
+            self._waiter = None
+
+    def _on_readable(self):
+        changed = False
+        while self._xlib.XPending(self._display):
+            self._xlib.XNextEvent(self._display, self._event)
+            self._xrandr.XRRUpdateConfiguration(self._event)
+            changed = True
+        if changed and self.on_change:
+            self.on_change()
+
+@register_display("fake")
+class FakeDisplay:
+    """内存中的显示器布局 (测试 / 无界面环境用)；set_monitors() 模拟显示变更事件"""
+
+    @staticmethod
+    def available():
+        return False # 仅在显式指定时使用
+
+    def __init__(self, rects=((0, 0, 1920, 1080),), pointer=(0, 0)):
+        self._rects = list(rects)
+        self.position = pointer
+        self.queries = 0
+        self.on_change = None
+
+    def monitors(self):
+        self.queries += 1
+        return list(self._rects)
+
+    def pointer(self):
+        return self.position
+
+    def set_monitors(self, rects):
+        self._rects = list(rects)
+        if self.on_change:
+            self.on_change()
+
+# safe_orientation 依次尝试的路径变换 (sign, swap)：原方向、反方向、交换坐标轴、交换并反向
+ORIENTATIONS = ((1, False), (-1, False), (1, True), (-1, True))
+
+class DisplayIndex:
+    """
+    显示器矩形的缓存索引：首次使用时查询一次，之后直到显示变更事件 (invalidate) 前不再查询系统。
+    safe_offset() / safe_orientation() 为当前光标选择一个整条路径都不会越出所在显示器的方向，
+    使"移动并返回"总能回到原位 (越出的点会被系统钳制在屏幕边缘，返回时就回不到起点)。
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.refreshes = 0
+        self._rects = None
+        self._last = None # 上次命中的显示器，光标通常停在同一块屏幕上
+        backend.on_change = self.invalidate
+
+    def invalidate(self):
+        """线程安全：下次使用时重新查询显示器布局"""
+        self._rects = None
+
+    def rects(self):
+        rects = self._rects
+        if rects is None:
+            rects = self._rects = self.backend.monitors()
+            self._last = None
+            self.refreshes += 1
+        return rects
+
+    def monitor_at(self, x, y):
+        """返回包含 (x, y) 的显示器矩形，不在任何显示器上时返回 None"""
+        rects = self.rects()
+        last = self._last
+        if last is not None and last[0] <= x < last[2] and last[1] <= y < last[3]:
+            return last
+        for rect in rects:
+            if rect[0] <= x < rect[2] and rect[1] <= y < rect[3]:
+                self._last = rect
+                return rect
+        return None
+
+    def safe_offset(self, dx, dy):
+        """
+        瞬时移动 (dx, dy) 并返回：依次尝试 (dx, dy)、反方向、两个垂直方向，
+        返回第一个落点仍在同一显示器内的位移；都不行时返回 (0, 0)，光标位置未知时原样返回。
+        """
+        orientation = self.safe_orientation((min(0, dx), min(0, dy), max(0, dx), max(0, dy)))
+        if orientation is None:
+            return 0, 0
+        sign, swap = orientation
+        return (sign * dy, sign * dx) if swap else (sign * dx, sign * dy)
+
+    def safe_orientation(self, bounds):
+        """
+        bounds 为路径途经各点相对起点的包围盒 (x_min, y_min, x_max, y_max，见 Trajectory.bounds)。
+        依次尝试原方向、反方向、交换坐标轴 (垂直方向)、交换并反向，返回第一个使整条路径都落在
+        光标所在显示器内的 (sign, swap)；都不行时返回 None，光标位置未知时返回原方向 (1, False)。
+        """
+        x, y = self.backend.pointer()
+        rect = self.monitor_at(x, y)
+        if rect is None:
+            return 1, False
+        x0, y0, x1, y1 = rect
+        bx0, by0, bx1, by1 = bounds
+        for sign, swap in ORIENTATIONS:
+            lx, ly, hx, hy = (by0, bx0, by1, bx1) if swap else bounds
+            if sign < 0:
+                lx, ly, hx, hy = -hx, -hy, -lx, -ly
+            if x0 <= x + lx and x + hx < x1 and y0 <= y + ly and y + hy < y1:
+                return sign, swap
+        return None
+
+    def attach(self, waiter):
+        if hasattr(self.backend, "attach"):
+            self.backend.attach(waiter)
+
+    def detach(self):
+        if hasattr(self.backend, "detach"):
+            self.backend.detach()
+
+_display_indexes = {}
+
+def get_display_index(name=None):
+    """
+    返回按名称共享的显示器几何索引；name 为 'none'、后端不可用或创建失败时返回 None
+    (此时移动不做边界检查)。
+    """
+    key = name or "auto"
+    if key not in _display_indexes:
+        index = None
+        if key == "auto":
+            candidates = [n for n, cls in _DISPLAYS.items() if cls.available()]
+        else:
+            candidates = [key] if key in _DISPLAYS else []
+        for candidate in candidates:
+            try:
+                index = DisplayIndex(_DISPLAYS[candidate]())
+                break
+            except OSError:
+                continue
+        _display_indexes[key] = index
+    return _display_indexes[key]
+
+def invalidate_display_geometry():
+    """显示器增减或分辨率变化时调用 (如 Qt 的 screen 信号)，使所有缓存失效"""
+    for index in _display_indexes.values():
+        if index is not None:
+            index.invalidate()
+
+# --- 绝对定位 ---
 
 def get_mouse_position():
-    pt = POINT()
-    windll.user32.GetCursorPos(byref(pt))
-    return pt.x, pt.y
+    return native.cursor_pos()
 
 def set_mouse_position(x, y, duration=0.0):
+    """
+    移动到绝对坐标。duration > 0 时平滑移动并阻塞调用线程；
+    引擎内请使用 core.trajectory.TrajectoryPlayer (非阻塞)。
+    """
     if duration > 0:
-        # 平滑移动
+        # 平滑移动：整条路径一次预计算，按绝对截止时间逐步定位 (不累积漂移)
         orig_x, orig_y = get_mouse_position()
-        steps = int(duration * 100)  # 根据持续时间计算步数  (e.g. 0.1s -> 10 steps)
+        steps = int(duration * STEPS_PER_SECOND)  # 根据持续时间计算步数  (e.g. 0.1s -> 10 steps)
 
         if steps > 0:
-            x_step = (x - orig_x) / steps
-            y_step = (y - orig_y) / steps
-
+            path = Trajectory(steps).line(x - orig_x, y - orig_y, steps, easing="linear")
+            start = time.monotonic()
+            cur_x, cur_y = orig_x, orig_y
             for i in range(steps):
-                new_x = int(orig_x + (x_step * (i+1)))
-                new_y = int(orig_y + (y_step * (i+1)))
-                windll.user32.SetCursorPos(new_x, new_y)
-                time.sleep(duration / steps)
+                cur_x += path.dx[i]
+                cur_y += path.dy[i]
+                native.set_cursor_pos(cur_x, cur_y)
+                delay = start + (i + 1) * duration / steps - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
     else:
         # 直接移动
-        windll.user32.SetCursorPos(x, y)
+        native.set_cursor_pos(x, y)
 
-def move_relative(dx, dy, duration=0.0):
+def move_relative(dx, dy):
     """
-    相对当前位置移动
+    相对当前位置移动 (使用默认注入后端)
     """
-    x, y = get_mouse_position()
-    set_mouse_position(x + dx, y + dy, duration)
+    get_backend().move_relative(dx, dy)
@@ -0,0 +1,329 @@
+"""
+热路径的本地调用层。
+
+- 函数在首次使用时解析一次并声明 restype，调用时不再做动态属性查找
+- 输出参数结构体、byref 引用与 INPUT 缓冲区按线程预先分配并复用，调用时不分配 ctypes 对象
+- 热路径函数不设 argtypes：argtypes 会在每次调用时经 from_param 转换参数，实测比直接传入
+  预先构造好的 ctypes 对象 (byref / c_void_p / c_ulong) 更慢；非热路径函数照常声明完整原型
+- Windows 使用私有的 WinDLL 实例，声明的原型不会影响共享的 ctypes.windll
+
+统一接口 (Windows: user32 / kernel32；Linux: libX11 / libXtst / libXss):
+    cursor_pos() -> (x, y)
+    set_cursor_pos(x, y)
+    send_motions(motions): 一次本地调用注入一组相对移动 [(dx, dy), ...]
+        (Windows 从当前光标位置换算为虚拟桌面上的绝对坐标注入，不受指针加速度影响，移出后能准确移回)
+    send_key(vk): 按下并释放一个按键 (Windows 虚拟键码 / X11 keysym)
+    key_supported(vk) -> bool: 当前键盘映射中是否有该按键 (X11 可能没有 F15)
+    idle_ms() -> int: 自上次用户输入以来的毫秒数
+
+仅 X11: screensaver_timeout() -> int: XGetScreenSaver 的超时秒数 (0 为未启用)
+
+mouse_engine / idle_detector 的 windows / xtest / x11 后端都经由本模块调用，不各自加载本地库。
+
+本模块导入时不加载任何本地库；不支持的平台上调用时抛出 OSError。
+"""
+import ctypes
+import ctypes.util
+import os
+import sys
+import threading
+from ctypes import Structure, Union, byref, sizeof, c_int, c_uint, c_long, c_ulong, c_ushort, c_void_p
+
+# --- 结构体 ---
+
+class POINT(Structure):
+    _fields_ = [("x", c_long), ("y", c_long)]
+
+class LASTINPUTINFO(Structure):
+    _fields_ = [("cbSize", c_uint), ("dwTime", c_uint)]
+
+class MOUSEINPUT(Structure):
+    _fields_ = [("dx", c_long), ("dy", c_long), ("mouseData", c_ulong), ("dwFlags", c_ulong),
+                ("time", c_ulong), ("dwExtraInfo", ctypes.c_size_t)]
+
+class KEYBDINPUT(Structure):
+    _fields_ = [("wVk", c_ushort), ("wScan", c_ushort), ("dwFlags", c_ulong),
+                ("time", c_ulong), ("dwExtraInfo", ctypes.c_size_t)]
+
+class _INPUTUNION(Union):
+    _fields_ = [("mi", MOUSEINPUT), ("ki", KEYBDINPUT)]
+
+class INPUT(Structure):
+    _anonymous_ = ("u",)
+    _fields_ = [("type", c_ulong), ("u", _INPUTUNION)]
+
+class XScreenSaverInfo(Structure):
+    _fields_ = [("window", c_ulong), ("state", c_int), ("kind", c_int),
+                ("til_or_since", c_ulong), ("idle", c_ulong), ("eventMask", c_ulong)]
+
+INPUT_MOUSE = 0
+INPUT_KEYBOARD = 1
+MOUSEEVENTF_MOVE = 0x0001
+MOUSEEVENTF_VIRTUALDESK = 0x4000
+MOUSEEVENTF_ABSOLUTE = 0x8000
+SM_XVIRTUALSCREEN, SM_YVIRTUALSCREEN, SM_CXVIRTUALSCREEN, SM_CYVIRTUALSCREEN = 76, 77, 78, 79
+KEYEVENTF_KEYUP = 0x0002
+VK_F15 = 0x7E
+XK_F15 = 0xFFCC
+_INPUT_SIZE = sizeof(INPUT)
+
+# --- Windows ---
+
+def _normalize(v, origin, size):
+    """
+    虚拟桌面像素坐标 -> SendInput 绝对坐标 (0..65535)。
+    系统按 n * size / 65536 向下取整映射回像素，因此这里向上取整，保证恰好落在像素 v 上。
+    """
+    n = ((v - origin) * 65536 + size - 1) // max(size, 1)
+    return 0 if n < 0 else 65535 if n > 65535 else n
+
+class _WinBindings:
+    """
+    user32 / kernel32；每线程一份 POINT / LASTINPUTINFO / INPUT 缓冲区。
+    参数均为 int 或预先构造的 byref / 数组，无需 argtypes 转换。
+    相对移动 (MOUSEEVENTF_MOVE) 会按"提高指针精确度"的加速曲线缩放，移出与移回的距离不一定相等，
+    因此 send_motions 以当前光标为起点累加位移，按绝对坐标 (ABSOLUTE | VIRTUALDESK) 注入。
+    """
+
+    def __init__(self):
+        user32 = ctypes.WinDLL("user32")
+        kernel32 = ctypes.WinDLL("kernel32")
+        self.GetCursorPos = user32.GetCursorPos
+        self.GetCursorPos.restype = c_int
+        self.SetCursorPos = user32.SetCursorPos
+        self.SetCursorPos.restype = c_int
+        self.GetLastInputInfo = user32.GetLastInputInfo
+        self.GetLastInputInfo.restype = c_int
+        self.SendInput = user32.SendInput
+        self.SendInput.restype = c_uint
+        self.GetSystemMetrics = user32.GetSystemMetrics
+        self.GetSystemMetrics.restype = c_int
+        self.GetTickCount64 = kernel32.GetTickCount64
+        self.GetTickCount64.restype = ctypes.c_ulonglong
+        self._tls = threading.local()
+
+    def _scratch(self):
+        tls = self._tls
+        if not hasattr(tls, "pt"):
+            tls.pt = POINT()
+            tls.pt_ref = byref(tls.pt)
+            tls.lii = LASTINPUTINFO()
+            tls.lii.cbSize = sizeof(LASTINPUTINFO)
+            tls.lii_ref = byref(tls.lii)
+            tls.inputs = None
+            self._reserve(tls, 4)
+            tls.keys = (INPUT * 2)()
+            for rec, flags in zip(tls.keys, (0, KEYEVENTF_KEYUP)):
+                rec.type = INPUT_KEYBOARD
+                rec.ki.dwFlags = flags
+        return tls
+
+    @staticmethod
+    def _reserve(tls, n):
+        if tls.inputs is None or len(tls.inputs) < n:
+            tls.inputs = (INPUT * max(n, 4))()
+            # 子结构体视图与缓冲区共享内存，预先取出后填充时不再创建代理对象
+            tls.mouse = [rec.mi for rec in tls.inputs]
+            for mi, rec in zip(tls.mouse, tls.inputs):
+                rec.type = INPUT_MOUSE
+                mi.dwFlags = MOUSEEVENTF_MOVE | MOUSEEVENTF_ABSOLUTE | MOUSEEVENTF_VIRTUALDESK
+
+    def cursor_pos(self):
+        tls = self._scratch()
+        self.GetCursorPos(tls.pt_ref)
+        return tls.pt.x, tls.pt.y
+
+    def set_cursor_pos(self, x, y):
+        self.SetCursorPos(x, y)
+
+    def send_motions(self, motions):
+        tls = self._scratch()
+        n = len(motions)
+        self._reserve(tls, n)
+        self.GetCursorPos(tls.pt_ref)
+        x, y = tls.pt.x, tls.pt.y
+        metrics = self.GetSystemMetrics
+        vx, vy = metrics(SM_XVIRTUALSCREEN), metrics(SM_YVIRTUALSCREEN)
+        vw, vh = metrics(SM_CXVIRTUALSCREEN), metrics(SM_CYVIRTUALSCREEN)
+        mouse = tls.mouse
+        for i in range(n):
+            dx, dy = motions[i]
+            x += dx
+            y += dy
+            mi = mouse[i]
+            mi.dx = _normalize(x, vx, vw)
+            mi.dy = _normalize(y, vy, vh)
+        self.SendInput(n, tls.inputs, _INPUT_SIZE)
+
+    def key_supported(self, vk):
+        return True
+
+    def send_key(self, vk):
+        records = self._scratch().keys
+        records[0].ki.wVk = records[1].ki.wVk = vk
+        self.SendInput(2, records, _INPUT_SIZE)
+
+    def idle_ms(self):
+        tls = self._scratch()
+        self.GetLastInputInfo(tls.lii_ref)
+        # dwTime 为 32 位，按模 2^32 计算差值，49.7 天回绕后仍正确
+        return (self.GetTickCount64() - tls.lii.dwTime) & 0xFFFFFFFF
+
+# --- Linux (X11) ---
+
+class _X11Bindings:
+    """
+    libX11 / libXtst / libXss。Xlib 连接不可跨线程共享，因此每个线程打开自己的
+    Display 并预分配 XQueryPointer 输出参数与 XScreenSaverInfo。
+    热路径函数不设 argtypes，Display* / Window / Time 以预先构造的 c_void_p / c_ulong 传入
+    (直接传 Python int 会被截断为 32 位)。
+    """
+
+    def __init__(self):
+        if not os.environ.get("DISPLAY") or not ctypes.util.find_library("X11"):
+            raise OSError("X11 is not available")
+        xlib = ctypes.CDLL(ctypes.util.find_library("X11"))
+        self.XOpenDisplay = xlib.XOpenDisplay
+        self.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        self.XOpenDisplay.restype = c_void_p
+        self.XDefaultRootWindow = xlib.XDefaultRootWindow
+        self.XDefaultRootWindow.argtypes = [c_void_p]
+        self.XDefaultRootWindow.restype = c_ulong
+        self.XQueryPointer = xlib.XQueryPointer
+        self.XQueryPointer.restype = c_int
+        self.XWarpPointer = xlib.XWarpPointer
+        self.XWarpPointer.restype = c_int
+        self.XFlush = xlib.XFlush
+        self.XFlush.restype = c_int
+        self.XKeysymToKeycode = xlib.XKeysymToKeycode
+        self.XKeysymToKeycode.argtypes = [c_void_p, c_ulong]
+        self.XKeysymToKeycode.restype = ctypes.c_ubyte
+        self.XGetScreenSaver = xlib.XGetScreenSaver
+        self.XGetScreenSaver.argtypes = [c_void_p] + [ctypes.POINTER(c_int)] * 4
+        self.XGetScreenSaver.restype = c_int
+
+        self.XTestFakeRelativeMotionEvent = self.XTestFakeKeyEvent = None
+        if ctypes.util.find_library("Xtst"):
+            xtst = ctypes.CDLL(ctypes.util.find_library("Xtst"))
+            self.XTestFakeRelativeMotionEvent = xtst.XTestFakeRelativeMotionEvent
+            self.XTestFakeRelativeMotionEvent.restype = c_int
+            self.XTestFakeKeyEvent = xtst.XTestFakeKeyEvent
+            self.XTestFakeKeyEvent.restype = c_int
+
+        self.XScreenSaverQueryInfo = None
+        if ctypes.util.find_library("Xss"):
+            xss = ctypes.CDLL(ctypes.util.find_library("Xss"))
+            self.XScreenSaverQueryInfo = xss.XScreenSaverQueryInfo
+            self.XScreenSaverQueryInfo.restype = c_int
+        self._tls = threading.local()
+
+    def _scratch(self):
+        tls = self._tls
+        if not hasattr(tls, "display"):
+            display = self.XOpenDisplay(None)
+            if not display:
+                raise OSError("Cannot open X display")
+            tls.display = c_void_p(display)
+            tls.root = c_ulong(self.XDefaultRootWindow(display))
+            tls.none = c_ulong(0) # None 窗口 / CurrentTime
+            tls.win, tls.x, tls.y, tls.i, tls.mask = c_ulong(), c_int(), c_int(), c_int(), c_uint()
+            tls.query_args = (byref(tls.win), byref(tls.win), byref(tls.x), byref(tls.y),
+                              byref(tls.i), byref(tls.i), byref(tls.mask))
+            tls.info = XScreenSaverInfo()
+            tls.info_ref = byref(tls.info)
+            tls.keycodes = {}
+        return tls
+
+    def cursor_pos(self):
+        tls = self._scratch()
+        self.XQueryPointer(tls.display, tls.root, *tls.query_args)
+        return tls.x.value, tls.y.value
+
+    def set_cursor_pos(self, x, y):
+        tls = self._scratch()
+        self.XWarpPointer(tls.display, tls.none, tls.root, 0, 0, 0, 0, x, y)
+        self.XFlush(tls.display)
+
+    def send_motions(self, motions):
+        if self.XTestFakeRelativeMotionEvent is None:
+            raise OSError("libXtst is not available")
+        tls = self._scratch()
+        for dx, dy in motions:
+            self.XTestFakeRelativeMotionEvent(tls.display, dx, dy, tls.none)
+        self.XFlush(tls.display)
+
+    def _keycode(self, tls, keysym):
+        keycode = tls.keycodes.get(keysym)
+        if keycode is None:
+            keycode = tls.keycodes[keysym] = self.XKeysymToKeycode(tls.display, keysym)
+        return keycode
+
+    def key_supported(self, keysym):
+        return self.XTestFakeKeyEvent is not None and bool(self._keycode(self._scratch(), keysym))
+
+    def send_key(self, keysym):
+        if self.XTestFakeKeyEvent is None:
+            raise OSError("libXtst is not available")
+        tls = self._scratch()
+        keycode = self._keycode(tls, keysym)
+        if not keycode:
+            raise OSError(f"No keycode for keysym 0x{keysym:X}")
+        self.XTestFakeKeyEvent(tls.display, keycode, 1, tls.none)
+        self.XTestFakeKeyEvent(tls.display, keycode, 0, tls.none)
+        self.XFlush(tls.display)
+
+    def idle_ms(self):
+        if self.XScreenSaverQueryInfo is None:
+            raise OSError("libXss is not available")
+        tls = self._scratch()
+        if not self.XScreenSaverQueryInfo(tls.display, tls.root, tls.info_ref):
+            return 0
+        return tls.info.idle
+
+    def screensaver_timeout(self):
+        timeout, interval, blanking, exposures = (c_int() for _ in range(4))
+        self.XGetScreenSaver(self._scratch().display, byref(timeout), byref(interval), byref(blanking), byref(exposures))
+        return timeout.value
+
+# --- 模块接口 ---
+
+_bindings = None
+_lock = threading.Lock()
+
+def bindings():
+    """返回当前平台的绑定 (首次调用时解析函数)"""
+    global _bindings
+    if _bindings is None:
+        with _lock:
+            if _bindings is None:
+                if sys.platform == "win32":
+                    _bindings = _WinBindings()
+                elif sys.platform.startswith("linux"):
+                    _bindings = _X11Bindings()
+                else:
+                    raise OSError(f"No native bindings for {sys.platform}")
+    return _bindings
+
+def cursor_pos():
+    return bindings().cursor_pos()
+
+def set_cursor_pos(x, y):
+    bindings().set_cursor_pos(x, y)
+
+def send_motions(motions):
+    bindings().send_motions(motions)
+
+def send_key(key):
+    bindings().send_key(key)
+
+def key_supported(key):
+    return bindings().key_supported(key)
+
+def idle_ms():
+    return bindings().idle_ms()
+
+def screensaver_timeout():
+    b = bindings()
+    if not hasattr(b, "screensaver_timeout"):
+        raise OSError(f"screensaver_timeout is not available on {sys.platform}")
+    return b.screensaver_timeout()
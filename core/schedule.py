@@ -0,0 +1,317 @@
+import bisect
+import datetime
+
+SECONDS_PER_DAY = 86400
+
+# 调度状态
+WAITING = "waiting"   # 不在工作时间，等待下一次开始
+ACTIVE = "active"     # 工作时间内
+ENDED = "ended"       # 本次会话已结束 (触发自动关闭)
+
+
+def seconds_of_day(t):
+    """datetime/time -> 当日第几秒 (整数)"""
+    return t.hour * 3600 + t.minute * 60 + t.second
+
+
+class Schedule:
+    """
+    编译后的工作时间表。
+
+    开始/结束时间在构造时一次性转为当日秒数，窗口为半开区间 [start, end + 1)，
+    即结束时间所在的那一秒仍属于工作时间。
+
+    - 单日模式 (start <= end): 超过结束时间即视为会话完成。
+    - 跨天模式 (start > end): 前半段 [start, 24:00) 无条件运行；
+      后半段 [00:00, end] 仅允许延续已开始的会话 (Strict Entry)。
+    """
+
+    def __init__(self, start_sec, end_sec):
+        if not (0 <= start_sec < SECONDS_PER_DAY and 0 <= end_sec < SECONDS_PER_DAY):
+            raise ValueError(f"Invalid schedule: {start_sec} -> {end_sec}")
+        self.start = start_sec
+        self.end = end_sec
+        self.cross_day = start_sec > end_sec
+        # 结束边界 (第一秒不再属于工作时间)
+        self._end_excl = end_sec + 1
+
+    @classmethod
+    def from_hms(cls, start_h, start_m, start_s, end_h, end_m, end_s):
+        return cls(start_h * 3600 + start_m * 60 + start_s,
+                   end_h * 3600 + end_m * 60 + end_s)
+
+    @classmethod
+    def from_config(cls, config):
+        """从配置快照 (core.config_mgr.ConfigSnapshot) 读取开始/结束时间"""
+        return cls(config.start_seconds, config.end_seconds)
+
+    def state(self, t, has_active_session=False):
+        """O(1) 判定 t 时刻的调度状态 (WAITING / ACTIVE / ENDED)"""
+        sod = seconds_of_day(t)
+        if not self.cross_day:
+            if sod >= self._end_excl:
+                return ENDED
+            return ACTIVE if sod >= self.start else WAITING
+
+        if sod >= self.start:
+            return ACTIVE
+        if sod < self._end_excl and has_active_session:
+            return ACTIVE
+        return ENDED if has_active_session else WAITING
+
+    def is_active(self, t, has_active_session=False):
+        return self.state(t, has_active_session) == ACTIVE
+
+    def is_expired(self, t):
+        """启动前检查：单日模式下结束时间已过"""
+        return not self.cross_day and seconds_of_day(t) >= self._end_excl
+
+    def next_transition(self, t, has_active_session=False):
+        """
+        Returns:
+            datetime: 下一次状态变化的时刻 (与 t 同时区)，会话已结束时返回 None
+        """
+        sod = seconds_of_day(t)
+        midnight = t.replace(hour=0, minute=0, second=0, microsecond=0)
+        state = self.state(t, has_active_session)
+
+        if state == ENDED:
+            return None
+        if state == WAITING:
+            # 单日模式的等待一定在 start 之前；跨天模式的等待区间 (含后半段禁入) 均在 start 之前
+            return midnight + datetime.timedelta(seconds=self.start)
+
+        if not self.cross_day or sod < self._end_excl:
+            return midnight + datetime.timedelta(seconds=self._end_excl)
+        # 跨天前半段：会话延续到次日结束时间
+        return midnight + datetime.timedelta(days=1, seconds=self._end_excl)
+
+
+SECONDS_PER_WEEK = 7 * SECONDS_PER_DAY
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+
+def _parse_clock(text):
+    """'HH:MM' / 'HH:MM:SS' -> 当日秒数 (允许 24:00 表示当日结束)"""
+    parts = [int(p) for p in text.strip().split(":")]
+    if len(parts) == 2:
+        parts.append(0)
+    if len(parts) != 3:
+        raise ValueError(f"Invalid time: {text!r}")
+    h, m, s = parts
+    sec = h * 3600 + m * 60 + s
+    if not (0 <= m < 60 and 0 <= s < 60 and 0 <= sec <= SECONDS_PER_DAY):
+        raise ValueError(f"Invalid time: {text!r}")
+    return sec
+
+
+def _parse_days(text):
+    """cron 风格星期字段: '*', 'Mon-Fri', 'Sat,Sun' -> [0..6]"""
+    text = text.strip().lower()
+    if text == "*":
+        return list(range(7))
+    days = []
+    for part in text.split(","):
+        if "-" in part:
+            lo, hi = (WEEKDAYS.index(p.strip()[:3]) for p in part.split("-", 1))
+            days.extend(range(lo, hi + 1) if lo <= hi else list(range(lo, 7)) + list(range(0, hi + 1)))
+        else:
+            days.append(WEEKDAYS.index(part.strip()[:3]))
+    return days
+
+
+def parse_windows(text):
+    """
+    解析工作窗口，条目以 ';' 或换行分隔，'#' 之后为注释:
+        Mon-Fri 09:00-12:00,13:00-18:00; Sat 10:00-14:00; Fri 22:00-02:00
+    窗口为半开区间 [开始, 结束)，结束 <= 开始表示跨过午夜。
+    Returns:
+        list[(int, int)]: 以周一 00:00 为原点的周内秒数区间 (结束可超过一周)
+    """
+    windows = []
+    for entry in text.replace("\n", ";").split(";"):
+        entry = entry.split("#", 1)[0].strip()
+        if not entry:
+            continue
+        try:
+            days_text, ranges_text = entry.split(None, 1)
+            days = _parse_days(days_text)
+        except ValueError:
+            raise ValueError(f"Invalid window: {entry!r}")
+        for rng in ranges_text.split(","):
+            if "-" not in rng:
+                raise ValueError(f"Invalid window: {entry!r}")
+            lo_text, hi_text = rng.split("-", 1)
+            lo, hi = _parse_clock(lo_text), _parse_clock(hi_text)
+            if hi <= lo:
+                hi += SECONDS_PER_DAY
+            for day in days:
+                windows.append((day * SECONDS_PER_DAY + lo, day * SECONDS_PER_DAY + hi))
+    return windows
+
+
+def parse_holidays(text):
+    """
+    解析节假日列表，每行一个日期或日期区间，'#' 之后为注释:
+        2026-01-01
+        2026-12-24..2026-12-26
+    Returns:
+        list[(int, int)]: 合并后的 (首日, 末日) date.toordinal() 闭区间，已排序
+    """
+    ranges = []
+    for line in text.splitlines():
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        first, _, last = line.partition("..")
+        try:
+            lo = datetime.date.fromisoformat(first.strip()).toordinal()
+            hi = datetime.date.fromisoformat(last.strip()).toordinal() if last else lo
+        except ValueError:
+            raise ValueError(f"Invalid holiday: {line!r}")
+        ranges.append((min(lo, hi), max(lo, hi)))
+    return _merge(ranges, gap=1)
+
+
+def _merge(intervals, gap=0):
+    """合并重叠 (或间距不超过 gap) 的区间"""
+    merged = []
+    for lo, hi in sorted(intervals):
+        if merged and lo <= merged[-1][1] + gap:
+            if hi > merged[-1][1]:
+                merged[-1] = (merged[-1][0], hi)
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+class _WeekIndex:
+    """周内有序区间索引：合并后的 [开始, 结束) 周内秒数，以及所有边界的有序数组"""
+
+    def __init__(self, intervals):
+        merged = _merge(intervals)
+        self._starts = [lo for lo, _ in merged]
+        self._ends = [hi for _, hi in merged]
+        self._bounds = sorted(set(self._starts + self._ends))
+
+    def __len__(self):
+        return len(self._starts)
+
+    def contains(self, wsec):
+        i = bisect.bisect_right(self._starts, wsec) - 1
+        return i >= 0 and wsec < self._ends[i]
+
+    def next_boundary(self, wsec):
+        """wsec 之后 (不含) 的下一个区间开始或结束 (可能落在下一周)，没有区间时返回 None"""
+        bounds = self._bounds
+        if not bounds:
+            return None
+        i = bisect.bisect_right(bounds, wsec)
+        return bounds[i] if i < len(bounds) else bounds[0] + SECONDS_PER_WEEK
+
+
+class WeeklyCalendar:
+    """
+    多窗口周历 + 节假日排除，接口与 Schedule 一致。
+
+    节假日规则：开始于节假日的窗口整段不运行 (包括跨过午夜、落在次日的部分)；
+    前一天开始、跨入节假日的窗口照常运行到结束。即每个窗口 (班次) 归属于它开始的那一天。
+
+    每个窗口按午夜拆成"当天开始"与"前一天开始 (跨午夜延续)"两部分，分别合并为有序区间索引，
+    t 时刻处于工作时间 <=> 在当天部分中且当天不是节假日，或在延续部分中且前一天不是节假日。
+    is_active 为两次二分查找 (O(log n))；next_transition 按区间边界与午夜 (节假日只在午夜变化)
+    向前查找第一个状态变化的时刻，整段节假日一次跳过。
+    周历循环往复，没有"会话结束"，因此不会返回 ENDED (不触发自动关闭)。
+    """
+
+    # next_transition 向前查找的最大步数 (防止节假日覆盖所有窗口时死循环)
+    MAX_SEARCH_STEPS = 1000
+
+    def __init__(self, windows, holidays=()):
+        same_day, overnight = [], []
+        for lo, hi in windows:
+            midnight = (lo // SECONDS_PER_DAY + 1) * SECONDS_PER_DAY
+            same_day.append((lo, min(hi, midnight)))
+            if hi > midnight:
+                # 跨过午夜的部分落在次日 (周日的折回到周一)
+                shift = SECONDS_PER_WEEK if midnight >= SECONDS_PER_WEEK else 0
+                overnight.append((midnight - shift, hi - shift))
+        self._windows = len(_merge(windows))
+        self._same_day = _WeekIndex(same_day)
+        self._overnight = _WeekIndex(overnight)
+        self._holiday_starts = [lo for lo, _ in holidays]
+        self._holiday_ends = [hi for _, hi in holidays]
+
+    @classmethod
+    def from_text(cls, windows_text, holidays_text=""):
+        return cls(parse_windows(windows_text), parse_holidays(holidays_text))
+
+    def __len__(self):
+        return self._windows
+
+    # --- 索引查找 ---
+    def _holiday_range(self, ordinal):
+        """返回包含 ordinal 的节假日区间 (首日, 末日)，不在节假日内返回 None"""
+        i = bisect.bisect_right(self._holiday_starts, ordinal) - 1
+        if i >= 0 and ordinal <= self._holiday_ends[i]:
+            return self._holiday_starts[i], self._holiday_ends[i]
+        return None
+
+    @staticmethod
+    def _week_origin(t):
+        return (t - datetime.timedelta(days=t.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    # --- Schedule 接口 ---
+    def state(self, t, has_active_session=False):
+        return ACTIVE if self.is_active(t) else WAITING
+
+    def is_active(self, t, has_active_session=False):
+        wsec = t.weekday() * SECONDS_PER_DAY + seconds_of_day(t)
+        ordinal = t.toordinal()
+        if self._same_day.contains(wsec) and self._holiday_range(ordinal) is None:
+            return True
+        return self._overnight.contains(wsec) and self._holiday_range(ordinal - 1) is None
+
+    def is_expired(self, t):
+        return False
+
+    def next_transition(self, t, has_active_session=False):
+        if not self._windows:
+            return None
+        active = self.is_active(t)
+        candidate = t
+        for _ in range(self.MAX_SEARCH_STEPS):
+            holiday = self._holiday_range(candidate.toordinal())
+            if holiday is not None and holiday[0] < candidate.toordinal():
+                # 当天与前一天都是节假日，任何窗口都不运行：直接跳到节假日之后的次日零点
+                candidate = datetime.datetime.fromordinal(holiday[1] + 1).replace(tzinfo=t.tzinfo)
+            else:
+                wsec = candidate.weekday() * SECONDS_PER_DAY + seconds_of_day(candidate)
+                steps = [(wsec // SECONDS_PER_DAY + 1) * SECONDS_PER_DAY] # 下一个午夜
+                steps.extend(b for b in (self._same_day.next_boundary(wsec),
+                                         self._overnight.next_boundary(wsec)) if b is not None)
+                candidate = self._week_origin(candidate) + datetime.timedelta(seconds=min(steps))
+            if self.is_active(candidate) != active:
+                return candidate
+        return None
+
+
+def build_schedule(config):
+    """
+    根据配置快照 (core.config_mgr.ConfigSnapshot) 构建调度对象：
+    配置了 windows / windows_file 时使用 WeeklyCalendar，否则使用单一开始/结束时间的 Schedule。
+    """
+    windows_text = config.windows
+    windows_path = config.windows_file
+    if windows_path:
+        with open(windows_path, encoding='utf-8') as f:
+            windows_text += "\n" + f.read()
+    if not windows_text.strip():
+        return Schedule.from_config(config)
+
+    holidays_text = ""
+    holidays_path = config.holidays_file
+    if holidays_path:
+        with open(holidays_path, encoding='utf-8') as f:
+            holidays_text = f.read()
+    return WeeklyCalendar.from_text(windows_text, holidays_text)
@@ -1,17 +1,90 @@
+"""
+单实例与本地控制通道：python -m core.single_instance <命令> [--timeout MS]
+
+实例存活由按用户区分的锁文件判断 (见 core.instance_lock)：
+锁可以取得即说明没有运行中的实例，无需尝试连接，也只有此时才清理遗留的套接字文件，
+不会接管运行中实例的套接字。本地套接字名同样包含用户名，不同用户的实例互不干扰。
+
+本地套接字上的消息为帧：4 字节长度 (大端) + UTF-8 JSON。
+    请求: {"command": "status"}
+    响应: {"ok": true, ...} 或 {"ok": false, "error": "..."}
+内置命令 wakeup (激活窗口) / ping；start / stop / status / reload / metrics 由主窗口注册 (见 register)。
+一个连接上可以依次发送多条命令。兼容旧版未分帧的 WAKEUP / METRICS。
+
+退出码: 0 成功，1 实例返回错误或无响应，2 没有运行中的实例。
+"""
+import json
+import os
+import struct
+import sys
+import time
+
 from PySide6.QtNetwork import QLocalServer, QLocalSocket
 from PySide6.QtCore import QObject, Signal
 
+from core.instance_lock import InstanceLock, lock_path, user_key
+
+APP_KEY = "ever_pulse_unique_key"
+TIMEOUT_MS = 1000
+MAX_FRAME = 1 << 20
+_HEADER = struct.Struct(">I")
+# 旧版客户端发送的未分帧消息 -> 命令
+_LEGACY = {b"WAKEUP": "wakeup", b"METRICS": "metrics"}
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_NOT_RUNNING = 2
+# 锁被占用但没有实例响应 (另一进程正在探测锁) 时重新尝试取得锁的次数
+ACQUIRE_ATTEMPTS = 3
+
+
+def encode_frame(message):
+    payload = json.dumps(message, ensure_ascii=False).encode("utf-8")
+    return _HEADER.pack(len(payload)) + payload
+
+
+def decode_frames(buffer):
+    """
+    从缓冲区 (bytearray，原地消费) 取出所有完整的帧 -> 消息列表。
+    长度超过 MAX_FRAME 时抛出 ValueError。
+    """
+    messages = []
+    while len(buffer) >= _HEADER.size:
+        size, = _HEADER.unpack_from(buffer)
+        if size > MAX_FRAME:
+            raise ValueError(f"frame too large ({size} bytes)")
+        if len(buffer) < _HEADER.size + size:
+            break
+        payload = bytes(buffer[_HEADER.size:_HEADER.size + size])
+        del buffer[:_HEADER.size + size]
+        messages.append(json.loads(payload.decode("utf-8")))
+    return messages
+
+
 class SingleInstance(QObject):
     """
     Class to handle single instance application logic using QLocalServer/QLocalSocket.
+    客户端一侧只使用阻塞 API (不需要事件循环)；服务端一侧在事件循环中异步处理请求，不阻塞界面。
     """
     request_activate = Signal()
 
-    def __init__(self, app_key="ever_pulse_unique_key"):
+    def __init__(self, app_key=APP_KEY):
         super().__init__()
-        self._app_key = app_key
+        self._app_key = f"{app_key}-{user_key()}" # 本地套接字名
         self._server = QLocalServer()
-        self._socket = QLocalSocket()
+        self._lock = InstanceLock(lock_path(app_key))
+        self._buffers = {} # 连接 -> 尚未凑成完整帧的数据
+        # 命令 -> () -> 响应字段 (dict 或 None)；抛出异常时响应 ok=false
+        self._handlers = {
+            "wakeup": self._wakeup,
+            "ping": lambda: {"pid": os.getpid()},
+        }
+
+    def register(self, command, handler):
+        self._handlers[command] = handler
+
+    def _wakeup(self):
+        self.request_activate.emit()
 
     def check(self):
         """
@@ -20,44 +93,157 @@ class SingleInstance(QObject):
             True if another instance is running (we should exit).
             False if we are the first instance (we should run).
         """
-        # Try to connect to existing server
-        self._socket.connectToServer(self._app_key)
-        if self._socket.waitForConnected(500):
-            # Connected to existing instance
-            # Send wakeup message
-            self._socket.write(b"WAKEUP")
-            self._socket.waitForBytesWritten(1000)
-            self._socket.disconnectFromServer()
+        if self.notify_running():
             return True
-        
-        # No existing instance found (or connection failed)
-        # We become the server
-        self._start_server()
+        self.start_server()
         return False
 
-    def _start_server(self):
-        # Clean up any leftover server file (especially on Unix)
-        # On Windows, this might effectively be a no-op for pipes if not in use,
-        # but good practice to ensure we can bind.
-        QLocalServer.removeServer(self._app_key)
-        
-        if not self._server.listen(self._app_key):
-             # If listening fails, it's possible a zombie process holds the lock
-             # or permissions issue. We'll proceed as if we are the instance,
-             # but logging this would be good. For now, just proceed with a warning check.
-             # In a production app, we might log this or handle it more gracefully.
-             pass
+    def notify_running(self):
+        """
+        只做客户端一侧：取得实例锁时返回 False (本进程成为实例，锁一直持有到退出)；
+        否则向运行中的实例发送 wakeup 并返回 True。可以在创建 QApplication 之前调用。
+        锁文件不可用 (目录不可写等) 时不做单实例检查，返回 False。
+        """
+        for _ in range(ACQUIRE_ATTEMPTS):
+            try:
+                if self._lock.acquire():
+                    return False
+            except OSError as e:
+                print(f"Single-instance lock unavailable ({e}), continuing without it")
+                return False
+            # 实例存活 (即使暂时无响应也不再启动第二个)；
+            # send 返回 None 说明锁只是被其他进程的探测短暂占用，重新尝试取得
+            if self.send("wakeup") is not None:
+                return True
+        return True
+
+    def send(self, command, timeout_ms=TIMEOUT_MS):
+        """
+        向运行中的实例发送命令，返回响应字典；没有运行中的实例时返回 None，
+        实例存活但在 timeout_ms 内没有响应时返回 {"ok": False, "error": ...}。
+        """
+        try:
+            if not self._lock.held and not self._lock.probe():
+                return None # 没有实例在运行
+        except OSError:
+            pass # 无法检查锁文件：直接尝试连接
+        socket = QLocalSocket()
+        deadline = time.monotonic() + timeout_ms / 1000
+        # 实例刚启动时锁已取得但可能还没开始监听：短暂重试，而不是一次阻塞等待
+        while True:
+            socket.connectToServer(self._app_key)
+            if socket.state() != QLocalSocket.UnconnectedState and socket.waitForConnected(timeout_ms):
+                break
+            if time.monotonic() >= deadline:
+                return {"ok": False, "error": "instance is not responding"}
+            time.sleep(0.02)
+        try:
+            socket.write(encode_frame({"command": command}))
+            socket.waitForBytesWritten(timeout_ms)
+            deadline = time.monotonic() + timeout_ms / 1000
+            buffer = bytearray()
+            while True:
+                remaining = int((deadline - time.monotonic()) * 1000)
+                if remaining <= 0 or not socket.waitForReadyRead(remaining):
+                    return {"ok": False, "error": "instance is not responding"}
+                buffer += socket.readAll().data()
+                messages = decode_frames(buffer)
+                if messages:
+                    if not isinstance(messages[0], dict):
+                        return {"ok": False, "error": "malformed response"}
+                    return messages[0]
+        except ValueError as e:
+            return {"ok": False, "error": str(e)}
+        finally:
+            socket.disconnectFromServer()
 
+    def start_server(self):
+        """
+        成为服务端；须在创建 QApplication 之后调用 (监听依赖事件循环)。
+        实例锁被另一实例持有时不清理套接字，返回 False。
+        """
+        try:
+            held = self._lock.acquire()
+        except OSError:
+            held = None # 锁文件不可用：不清理可能属于其他实例的套接字，直接尝试监听
+        if held is False:
+            return False
+        if held:
+            # 持有锁说明遗留的套接字文件 (上次崩溃等) 不属于任何存活的实例，可以安全清理
+            QLocalServer.removeServer(self._app_key)
         self._server.newConnection.connect(self._handle_new_connection)
+        return self._server.listen(self._app_key)
+
+    def close(self):
+        self._server.close()
+        self._lock.release()
 
     def _handle_new_connection(self):
-        socket = self._server.nextPendingConnection()
-        if socket:
-            socket.readyRead.connect(lambda: self._read_socket(socket))
-    
+        while self._server.hasPendingConnections():
+            socket = self._server.nextPendingConnection()
+            self._buffers[socket] = bytearray()
+            socket.readyRead.connect(lambda s=socket: self._read_socket(s))
+            socket.disconnected.connect(lambda s=socket: self._drop(s))
+
+    def _drop(self, socket):
+        self._buffers.pop(socket, None)
+        socket.deleteLater()
+
     def _read_socket(self, socket):
-        data = socket.readAll()
-        if data == b"WAKEUP":
-            self.request_activate.emit()
-            # We don't need to keep the connection open
-            socket.disconnectFromServer()
+        buffer = self._buffers.get(socket)
+        if buffer is None:
+            return
+        buffer += socket.readAll().data()
+        legacy = _LEGACY.get(bytes(buffer))
+        if legacy is not None:
+            buffer.clear()
+            response = self._dispatch(legacy)
+            if legacy == "metrics":
+                socket.write(response.get("text", "").encode("utf-8"))
+            socket.disconnectFromServer() # 写缓冲区清空后才真正断开
+            return
+        try:
+            messages = decode_frames(buffer)
+        except ValueError:
+            buffer.clear()
+            socket.abort()
+            return
+        for message in messages:
+            command = message.get("command") if isinstance(message, dict) else None
+            socket.write(encode_frame(self._dispatch(command)))
+
+    def _dispatch(self, command):
+        handler = self._handlers.get(command)
+        if handler is None:
+            return {"ok": False, "error": f"unknown command: {command}"}
+        try:
+            result = handler()
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+        return {"ok": True, **(result or {})}
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m core.single_instance",
+                                     description="Send a command to the running Ever Pulse instance.")
+    parser.add_argument("command", help="start / stop / status / reload / metrics / wakeup / ping")
+    parser.add_argument("--timeout", type=int, default=TIMEOUT_MS, help="milliseconds to wait for a response")
+    args = parser.parse_args(argv)
+
+    response = SingleInstance().send(args.command, args.timeout)
+    if response is None:
+        print("Ever Pulse is not running.", file=sys.stderr)
+        return EXIT_NOT_RUNNING
+    if not response.get("ok"):
+        print(f"Error: {response.get('error')}", file=sys.stderr)
+        return EXIT_ERROR
+    if args.command == "metrics":
+        sys.stdout.write(str(response.get("text", "")))
+    else:
+        print(json.dumps(response, ensure_ascii=False, indent=2))
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+import datetime
+import math
+import time
+
+from core.metrics import Histogram, LATENCY_BUCKETS
+
+_LOCAL_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def local_wall_seconds(dt=None):
+    """本地挂钟时间 (naive datetime) 折算的秒数，夏令时切换时会跳变 1 小时"""
+    return ((dt or datetime.datetime.now()) - _LOCAL_EPOCH).total_seconds()
+
+
+class TickScheduler:
+    """
+    基于 time.monotonic() 的无漂移节拍器。
+
+    节拍目标为 anchor + k * interval (单调时钟)，不随每次执行耗时累积误差。
+    每次唤醒时比较"本地挂钟 - 单调时钟"的偏移量，偏移变化超过 jump_threshold
+    即视为时钟跳变 (NTP 校时、手动改时间、夏令时、休眠唤醒)，此时按挂钟重新对齐节拍网格。
+    每个节拍实际触发时刻相对目标的迟到量记录在 lateness 直方图中。
+    """
+
+    # 长时间等待的最大单次睡眠：保证休眠/跳变在该时长内被发现
+    MAX_SLEEP_SECONDS = 60.0
+
+    def __init__(self, interval, jump_threshold=2.0):
+        self.interval = float(interval)
+        self.jump_threshold = jump_threshold
+        self.lateness = Histogram(LATENCY_BUCKETS)
+        self.jumps = 0
+        self.missed_ticks = 0
+        self._offset = self._measure_offset()
+        self._target = None       # 下一节拍的单调时间，None 表示立即到期
+        self._anchor_wall = None  # 节拍网格原点 (本地挂钟秒)，用于跳变后重新对齐
+
+    @staticmethod
+    def _measure_offset():
+        return local_wall_seconds() - time.monotonic()
+
+    # --- 时间换算 ---
+    def to_monotonic(self, dt):
+        """本地 datetime -> 单调时间"""
+        return local_wall_seconds(dt) - self._offset
+
+    @property
+    def next_deadline(self):
+        return time.monotonic() if self._target is None else self._target
+
+    # --- 节拍网格 ---
+    def anchor(self, dt=None):
+        """以 dt (本地时间，默认现在) 为原点建立节拍网格，下一节拍即为 dt"""
+        if dt is None:
+            self._target = time.monotonic()
+            self._anchor_wall = self._target + self._offset
+        else:
+            self._anchor_wall = local_wall_seconds(dt)
+            self._target = self._anchor_wall - self._offset
+
+    def delay(self, seconds):
+        """将下一节拍设为 seconds 秒之后 (JIT 模式按空闲超时动态计算)"""
+        self._target = time.monotonic() + seconds
+        self._anchor_wall = self._target + self._offset
+
+    def set_interval(self, interval):
+        """更改间隔：下一节拍改为 上一节拍 + 新间隔 (已过去则立即到期)，之后按新间隔推进"""
+        interval = float(interval)
+        if self._target is not None:
+            self._target += interval - self.interval
+            self._anchor_wall = self._target + self._offset
+        self.interval = interval
+
+    def reset(self):
+        """离开工作时间时清除网格，下次进入时立即到期"""
+        self._target = None
+        self._anchor_wall = None
+
+    def due(self):
+        return self._target is None or time.monotonic() >= self._target
+
+    def fire(self):
+        """
+        消费一个到期节拍：记录迟到量并推进到下一个网格点。
+        若错过了多个节拍 (例如系统休眠)，直接跳到未来最近的网格点。
+        Returns:
+            float: 本节拍的迟到秒数
+        """
+        now = time.monotonic()
+        if self._target is None:
+            self.anchor()
+        late = max(0.0, now - self._target)
+        self.lateness.observe(late)
+
+        self._target += self.interval
+        if self._target <= now:
+            skipped = math.floor((now - self._target) / self.interval) + 1
+            self.missed_ticks += skipped
+            self._target += skipped * self.interval
+        return late
+
+    # --- 等待 ---
+    def clamp(self, deadline):
+        """限制单次睡眠不超过 MAX_SLEEP_SECONDS，唤醒后调用 check_jump()"""
+        return min(deadline, time.monotonic() + self.MAX_SLEEP_SECONDS)
+
+    def check_jump(self):
+        """每次唤醒后调用；检测到挂钟跳变时重新对齐节拍网格并返回 True"""
+        offset = self._measure_offset()
+        jumped = abs(offset - self._offset) > self.jump_threshold
+        # 小幅偏移 (NTP 平滑校时) 也同步，避免挂钟边界换算累积误差
+        self._offset = offset
+        if not jumped:
+            return False
+        self.jumps += 1
+        if self._anchor_wall is not None and self._target is not None:
+            # 按新的挂钟重新对齐：目标 = 网格上挂钟时间不早于现在的下一个点
+            wall_now = time.monotonic() + offset
+            k = max(0, math.ceil((wall_now - self._anchor_wall) / self.interval))
+            self._target = self._anchor_wall + k * self.interval - offset
+        return True
@@ -0,0 +1,199 @@
+"""
+平滑光标轨迹：预计算 + 非阻塞回放。
+
+- Trajectory: 预分配的 array 缓冲区，一次遍历算出整条路径的逐步相对位移
+  (缓动直线或二次贝塞尔曲线)，重复计算不再分配内存。
+- PathLibrary: 录制路径库，所有路径紧凑地存放在同一个 array('h') 中。
+- TrajectoryPlayer: 按绝对截止时间逐步注入，等待通过引擎的 waiter 完成，不阻塞线程、不累积漂移。
+"""
+import time
+from array import array
+
+EASINGS = {
+    "linear": lambda t: t,
+    "ease": lambda t: t * t * (3.0 - 2.0 * t),        # smoothstep
+    "ease_out": lambda t: 1.0 - (1.0 - t) ** 3,
+}
+
+# 与旧版 set_mouse_position 一致：每秒 100 步
+STEPS_PER_SECOND = 100
+
+
+class Trajectory:
+    """逐步相对位移 (dx[i], dy[i])，i < length"""
+    __slots__ = ("dx", "dy", "length")
+
+    def __init__(self, capacity=256):
+        self.dx = array("i", bytes(4 * capacity))
+        self.dy = array("i", bytes(4 * capacity))
+        self.length = 0
+
+    @property
+    def capacity(self):
+        return len(self.dx)
+
+    def _reserve(self, n):
+        if n > len(self.dx):
+            zeros = array("i", bytes(4 * (n - len(self.dx))))
+            self.dx.extend(zeros)
+            self.dy.extend(zeros)
+
+    def line(self, x, y, steps, easing="ease", bend=0.0):
+        """
+        相对位移 (x, y) 分 steps 步完成。
+        bend 为二次贝塞尔控制点的垂直偏移 (占位移长度的比例)，0 为直线。
+        """
+        steps = max(1, int(steps))
+        self._reserve(steps)
+        ease = EASINGS[easing]
+        # 控制点：中点沿法线方向偏移
+        cx, cy = x / 2.0 - y * bend, y / 2.0 + x * bend
+        dx, dy = self.dx, self.dy
+        px = py = 0
+        for i in range(steps):
+            t = ease((i + 1) / steps)
+            u2t = 2.0 * (1.0 - t) * t
+            t2 = t * t
+            nx = round(u2t * cx + t2 * x)
+            ny = round(u2t * cy + t2 * y)
+            dx[i] = nx - px
+            dy[i] = ny - py
+            px, py = nx, ny
+        self.length = steps
+        return self
+
+    def total(self):
+        """整条路径的总位移"""
+        n = self.length
+        return sum(self.dx[:n]), sum(self.dy[:n])
+
+    def bounds(self):
+        """途经各点 (含起点) 相对起点的包围盒 (x_min, y_min, x_max, y_max)"""
+        x = y = x_min = y_min = x_max = y_max = 0
+        dx, dy = self.dx, self.dy
+        for i in range(self.length):
+            x += dx[i]
+            y += dy[i]
+            if x < x_min: x_min = x
+            elif x > x_max: x_max = x
+            if y < y_min: y_min = y
+            elif y > y_max: y_max = y
+        return x_min, y_min, x_max, y_max
+
+    def orient(self, sign, swap):
+        """就地变换整条路径：swap 交换 x / y 轴，sign 为 -1 时反向 (见 DisplayIndex.safe_orientation)"""
+        n = self.length
+        dx, dy = self.dx, self.dy
+        if swap:
+            dx[:n], dy[:n] = dy[:n], dx[:n]
+        if sign < 0:
+            for i in range(n):
+                dx[i] = -dx[i]
+                dy[i] = -dy[i]
+        return self
+
+
+class PathLibrary:
+    """
+    录制路径库：所有路径的 (dx, dy) 交替存放在一个 array('h') 中，
+    offsets[i] ~ offsets[i + 1] 为第 i 条路径的区间 (单位：步)。
+    文件格式: uint32 路径数, uint32 offsets[路径数 + 1], int16 data[...] (本机字节序)。
+    """
+
+    def __init__(self):
+        self._data = array("h")
+        self._offsets = array("I", [0])
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def add(self, deltas):
+        """追加一条路径: 可迭代的 (dx, dy)"""
+        for dx, dy in deltas:
+            self._data.append(dx)
+            self._data.append(dy)
+        self._offsets.append(len(self._data) // 2)
+
+    def add_points(self, points):
+        """由录制的绝对坐标采样 [(x, y), ...] 追加一条路径"""
+        it = iter(points)
+        try:
+            px, py = next(it)
+        except StopIteration:
+            return
+        deltas = []
+        for x, y in it:
+            deltas.append((x - px, y - py))
+            px, py = x, y
+        self.add(deltas)
+
+    def load_into(self, index, trajectory):
+        """把第 index 条路径复制到预分配的 trajectory 中"""
+        lo, hi = self._offsets[index], self._offsets[index + 1]
+        n = hi - lo
+        trajectory._reserve(n)
+        trajectory.dx[:n] = array("i", self._data[2 * lo:2 * hi:2])
+        trajectory.dy[:n] = array("i", self._data[2 * lo + 1:2 * hi:2])
+        trajectory.length = n
+        return trajectory
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            array("I", [len(self)]).tofile(f)
+            self._offsets.tofile(f)
+            self._data.tofile(f)
+
+    @classmethod
+    def load(cls, path):
+        lib = cls()
+        with open(path, "rb") as f:
+            count = array("I")
+            count.fromfile(f, 1)
+            lib._offsets = array("I")
+            lib._offsets.fromfile(f, count[0] + 1)
+            lib._data = array("h")
+            lib._data.fromfile(f, 2 * lib._offsets[-1])
+        return lib
+
+
+class TrajectoryPlayer:
+    """
+    非阻塞回放：第 i 步在 start + i * (duration / length) 注入，等待由 waiter 完成。
+    offset 记录尚未归位的累计位移，回放被取消时调用方可据此一次性复位。
+    """
+
+    def __init__(self, backend, waiter):
+        self.backend = backend
+        self.waiter = waiter
+        self.offset_x = 0
+        self.offset_y = 0
+
+    async def play(self, trajectory, duration, reverse=False):
+        """
+        Returns:
+            True if completed, False if cancelled midway.
+        """
+        n = trajectory.length
+        if n == 0:
+            return True
+        dxs, dys = trajectory.dx, trajectory.dy
+        sign = -1 if reverse else 1
+        step = duration / n
+        start = time.monotonic()
+        for i in range(n):
+            j = n - 1 - i if reverse else i
+            dx = sign * dxs[j]
+            dy = sign * dys[j]
+            if dx or dy:
+                self.backend.move_relative(dx, dy)
+                self.offset_x += dx
+                self.offset_y += dy
+            if i + 1 < n and not await self.waiter.wait_until(start + (i + 1) * step):
+                return False
+        return True
+
+    def restore(self):
+        """把尚未归位的累计位移在一次调用中移回"""
+        if self.offset_x or self.offset_y:
+            self.backend.move_relative(-self.offset_x, -self.offset_y)
+        self.offset_x = self.offset_y = 0
@@ -0,0 +1,98 @@
+import asyncio
+import time
+
+
+class DeadlineWaiter:
+    """
+    基于绝对截止时间 (time.monotonic) 的可中断等待，运行在 asyncio 事件循环上。
+    每次等待只唤醒一次 (单个 call_later 定时器)；cancel() / wake() 可从任意线程立即唤醒。
+
+    引擎只通过该接口等待，因此也可以替换为其他事件循环的实现 (见 ui.worker.QtDeadlineWaiter):
+        async wait_until(deadline) -> bool: 到期或被 wake() 唤醒返回 True，被取消返回 False
+        async wait_for(seconds) -> bool
+        cancel() / wake() / cancelled / wakeups / wakeups_per_hour()
+        watch(fd, callback) / unwatch(fd): 文件描述符可读时在事件循环中回调 (推送式空闲检测使用)
+    """
+
+    def __init__(self):
+        self._cancelled = False
+        self._pending_wake = False
+        self._loop = None
+        self._future = None
+        self._created_at = time.monotonic()
+        self.wakeups = 0
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    def cancel(self):
+        self._cancelled = True
+        self.wake()
+
+    def wake(self):
+        """线程安全：让当前 (或下一次) 等待立即返回，调用方重新评估状态"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            self._pending_wake = True
+            return
+        try:
+            loop.call_soon_threadsafe(self._resolve)
+        except RuntimeError:
+            # 事件循环已关闭
+            self._pending_wake = True
+
+    def watch(self, fd, callback):
+        """在运行中的事件循环上监听 fd 可读 (epoll/select)"""
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(fd, callback)
+
+    def unwatch(self, fd):
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.remove_reader(fd)
+
+    def _resolve(self):
+        if self._future is not None and not self._future.done():
+            self._future.set_result(True)
+        else:
+            self._pending_wake = True
+
+    @staticmethod
+    def _expire(future):
+        if not future.done():
+            future.set_result(False)
+
+    async def wait_until(self, deadline):
+        """
+        Sleep until the monotonic ``deadline`` (seconds).
+        Returns:
+            True if the deadline was reached (or wake() was called), False if cancelled.
+        """
+        self._loop = asyncio.get_running_loop()
+        while not self._cancelled:
+            if self._pending_wake:
+                self._pending_wake = False
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return True
+            self._future = self._loop.create_future()
+            handle = self._loop.call_later(remaining, self._expire, self._future)
+            try:
+                woken = await self._future
+            finally:
+                handle.cancel()
+                self._future = None
+            self.wakeups += 1
+            if woken:
+                return not self._cancelled
+        return False
+
+    async def wait_for(self, seconds):
+        return await self.wait_until(time.monotonic() + seconds)
+
+    def wakeups_per_hour(self):
+        elapsed = time.monotonic() - self._created_at
+        if elapsed <= 0:
+            return 0.0
+        return self.wakeups * 3600.0 / elapsed
@@ -1,12 +1,12 @@
 import sys
-import traceback
-import datetime
-from PySide6.QtWidgets import QApplication
-from ui.main_window import MainWindow
-from core.single_instance import SingleInstance
+
+# 启动顺序：先用实例锁 + QtNetwork 完成单实例握手，第二个实例发送 wakeup 后立即退出；
+# QtWidgets 与主窗口 (主题、控件、日志视图) 只在确定由本进程运行时才导入
 
 # Global Exception Handler
 def exception_hook(exctype, value, tb):
+    import traceback
+    import datetime
     error_msg = "".join(traceback.format_exception(exctype, value, tb))
     print(error_msg) # Print to console
     
@@ -20,21 +20,29 @@ def exception_hook(exctype, value, tb):
 sys.excepthook = exception_hook
 
 def main():
-    app = QApplication(sys.argv)
-    
+    from core.single_instance import SingleInstance
+
     # 确保应用程序唯一实例
     single_instance = SingleInstance()
-    if single_instance.check():
+    if single_instance.notify_running():
         print("Another instance is already running. Exiting...")
         sys.exit(0)
+
+    from PySide6.QtWidgets import QApplication
+    app = QApplication(sys.argv)
+    single_instance.start_server()
     
     # 设置应用级别属性
     app.setStyle("Fusion") 
     
+    from ui.main_window import MainWindow
     window = MainWindow()
     
     # 连接唤醒信号以激活窗口
     single_instance.request_activate.connect(lambda: (window.showNormal(), window.activateWindow(), window.raise_()))
+    # 本地套接字上的控制命令 (start / stop / status / reload / metrics)，见 core.single_instance
+    for command, handler in window.control_handlers().items():
+        single_instance.register(command, handler)
 
     window.show()
     
@@ -1,12 +1,22 @@
 # -*- mode: python ; coding: utf-8 -*-
 
+import sys
+
+sys.path.insert(0, SPECPATH)
+from tools.compile_i18n import build
+
+# 界面文本编译为 assets/language.cat 后打包 (运行时只加载当前语言)；键覆盖检查不通过时中止打包
+_i18n_problems = build()
+if _i18n_problems:
+    raise SystemExit("language.ini: " + "; ".join(_i18n_problems))
+
 block_cipher = None
 
 a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
-    datas=[('assets/ever-pulse.ico', 'assets'), ('assets/language.ini', 'assets')],
+    datas=[('assets/ever-pulse.ico', 'assets'), ('assets/language.cat', 'assets')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
@@ -0,0 +1,56 @@
+"""无界面入口 (core.cli) 在独立进程中实际运行一个节拍，期间不得导入任何 PySide6 模块"""
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 运行到第一次移动后停止；start_second 设为当前秒，首次移动无需对齐等待
+PROBE = r"""
+import asyncio, datetime, json, sys
+from core import cli
+from core.config_mgr import ConfigManager
+from core.events import Code
+
+config_mgr = ConfigManager(sys.argv[1])
+config_mgr.set("start_second", datetime.datetime.now().second)
+runner = cli.HeadlessRunner(config_mgr, quiet=True)
+events = []
+
+def on_event(event):
+    events.append(event.code.name)
+    if event.code == Code.MOVED:
+        runner.stop()
+
+runner._emit = on_event
+exit_code = asyncio.run(asyncio.wait_for(runner.run(), 90))
+print(json.dumps({
+    "exit_code": exit_code,
+    "events": events,
+    "qt": sorted(m for m in sys.modules if m.split(".")[0] == "PySide6"),
+}))
+"""
+
+SETTINGS = {
+    "idle_backend": "fake", "input_backend": "null", "display_backend": "none", "action": "jiggle",
+    "start_hour": "0", "start_minute": "0", "end_hour": "23", "end_minute": "59", "end_second": "59",
+    "interval": "1", "activity_threshold": "0", "journal_enabled": "False",
+}
+
+
+def test_headless_tick_never_imports_pyside6(tmp_path):
+    config_dir = tmp_path / "config"
+    config_dir.mkdir()
+    (config_dir / "config.ini").write_text(
+        "[Settings]\n" + "".join(f"{k} = {v}\n" for k, v in SETTINGS.items()), encoding="utf-8")
+
+    out = subprocess.run([sys.executable, "-c", PROBE, str(tmp_path)], cwd=ROOT,
+                         capture_output=True, text=True, timeout=120)
+    # 导入或运行失败 (包括导入 PySide6 失败) 都使测试失败
+    assert out.returncode == 0, out.stderr
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+
+    assert result["exit_code"] == 0, result["events"]
+    assert "MOVED" in result["events"]
+    assert result["qt"] == []
@@ -0,0 +1,70 @@
+from core.config_mgr import ConfigManager
+
+
+def test_reload_unchanged_file_is_ignored(tmp_path):
+    config_mgr = ConfigManager(str(tmp_path))
+    config_mgr.save()
+    assert config_mgr.reload() is None
+
+
+def test_failed_reload_keeps_settings_and_does_not_overwrite_the_file(tmp_path):
+    config_mgr = ConfigManager(str(tmp_path))
+    config_mgr.set("interval", 30)
+    config_mgr.save()
+
+    half_edited = b"[Settings]\ninterval = 45\nthis line has no separator\n"
+    with open(config_mgr.config_path, "wb") as f:
+        f.write(half_edited)
+
+    status_key, error = config_mgr.reload()
+    assert status_key == "status_config_failed" and error
+    assert config_mgr.get("interval", int) == 30
+
+    # 内存中的设置没有变化：不得用它覆盖用户尚未改完的文件
+    assert config_mgr.save() is False
+    with open(config_mgr.config_path, "rb") as f:
+        assert f.read() == half_edited
+
+
+def test_reload_applies_valid_edit(tmp_path):
+    config_mgr = ConfigManager(str(tmp_path))
+    config_mgr.save()
+    with open(config_mgr.config_path, encoding="utf-8") as f:
+        text = f.read()
+    with open(config_mgr.config_path, "w", encoding="utf-8") as f:
+        f.write(text.replace("interval = 60", "interval = 45"))
+    assert config_mgr.reload() == ("status_config_loaded", None)
+    assert config_mgr.get("interval", int) == 45
+
+
+def test_reload_keeps_unsaved_changes(tmp_path):
+    config_mgr = ConfigManager(str(tmp_path))
+    config_mgr.save()
+    # 界面修改尚在延迟保存的等待中，文件同时被外部修改
+    config_mgr.set("pixels", 3)
+    with open(config_mgr.config_path, encoding="utf-8") as f:
+        text = f.read()
+    with open(config_mgr.config_path, "w", encoding="utf-8") as f:
+        f.write(text.replace("interval = 60", "interval = 45"))
+
+    assert config_mgr.reload() == ("status_config_loaded", None)
+    assert config_mgr.get("interval", int) == 45
+    assert config_mgr.get("pixels", int) == 3
+
+    # 延迟保存到期：两处修改都写入文件
+    assert config_mgr.save() is True
+    reread = ConfigManager(str(tmp_path))
+    assert reread.get("interval", int) == 45
+    assert reread.get("pixels", int) == 3
+
+
+def test_saved_changes_do_not_override_later_edits(tmp_path):
+    config_mgr = ConfigManager(str(tmp_path))
+    config_mgr.set("pixels", 3)
+    config_mgr.save()
+    with open(config_mgr.config_path, encoding="utf-8") as f:
+        text = f.read()
+    with open(config_mgr.config_path, "w", encoding="utf-8") as f:
+        f.write(text.replace("pixels = 3", "pixels = 7"))
+    config_mgr.reload()
+    assert config_mgr.get("pixels", int) == 7
@@ -0,0 +1,47 @@
+import pytest
+
+from core.config_mgr import ConfigManager
+
+
+@pytest.fixture
+def config_mgr(tmp_path):
+    return ConfigManager(str(tmp_path))
+
+
+def test_defaults_parse(config_mgr):
+    snapshot = config_mgr.snapshot()
+    assert snapshot.mode == "interval"
+    assert snapshot.direction == "Left"
+    assert snapshot.motion_library is None
+
+
+@pytest.mark.parametrize("key, value", [
+    ("direction", "up"),
+    ("mode", "JIT"),
+    ("motion", "wobble"),
+    ("action", "shake"),
+    ("idle_backend", "x12"),
+    ("input_backend", "xtest2"),
+    ("display_backend", "off"),
+])
+def test_unknown_choice_is_rejected(config_mgr, key, value):
+    config_mgr.set(key, value)
+    with pytest.raises(ValueError, match=f"^{key}: invalid value"):
+        config_mgr.snapshot()
+
+
+@pytest.mark.parametrize("key", ["motion_duration", "idle_timeout", "jit_margin"])
+@pytest.mark.parametrize("value", ["nan", "inf", "-inf"])
+def test_non_finite_float_is_rejected(config_mgr, key, value):
+    config_mgr.set(key, value)
+    with pytest.raises(ValueError, match=f"^{key}: "):
+        config_mgr.snapshot()
+
+
+@pytest.mark.parametrize("key, value", [
+    ("direction", "上"), ("mode", "jit"), ("motion", "ease_out"), ("motion", "recorded"),
+    ("action", "auto"), ("idle_backend", "fake"), ("input_backend", "null"), ("display_backend", "none"),
+])
+def test_known_choice_is_accepted(config_mgr, key, value):
+    config_mgr.set(key, value)
+    assert getattr(config_mgr.snapshot(), key) == value
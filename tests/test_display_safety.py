@@ -0,0 +1,57 @@
+import pytest
+
+from core.mouse_engine import DisplayIndex, FakeDisplay
+from core.trajectory import Trajectory
+
+
+def points(trajectory):
+    x = y = 0
+    out = []
+    for i in range(trajectory.length):
+        x += trajectory.dx[i]
+        y += trajectory.dy[i]
+        out.append((x, y))
+    return out
+
+
+def index_at(pointer, rect=(0, 0, 1920, 1080)):
+    return DisplayIndex(FakeDisplay((rect,), pointer=pointer))
+
+
+def test_bounds_cover_every_point():
+    trajectory = Trajectory().line(100, 0, 20, easing="ease", bend=0.25)
+    xs, ys = zip(*points(trajectory))
+    assert trajectory.bounds() == (min(0, *xs), min(0, *ys), max(0, *xs), max(0, *ys))
+    assert trajectory.bounds()[3] > 0 # 曲线向一侧偏离直线
+
+
+@pytest.mark.parametrize("sign, swap", [(1, False), (-1, False), (1, True), (-1, True)])
+def test_orient(sign, swap):
+    trajectory = Trajectory().line(30, 10, 8, bend=0.25)
+    before = points(trajectory)
+    after = points(trajectory.orient(sign, swap))
+    for (x, y), (ox, oy) in zip(before, after):
+        assert (ox, oy) == ((sign * y, sign * x) if swap else (sign * x, sign * y))
+
+
+def test_curve_near_edge_is_flipped_although_endpoint_fits():
+    trajectory = Trajectory().line(100, 0, 20, easing="ease", bend=0.25)
+    bulge = trajectory.bounds()[3]
+    # 光标距下边缘不足曲线的侧向偏移：终点 (100, 0) 在屏幕内，但中间点会越出
+    index = index_at((500, 1080 - bulge))
+    assert index.safe_offset(100, 0) == (100, 0) # 只检查终点时不会发现
+    sign, swap = index.safe_orientation(trajectory.bounds())
+    assert (sign, swap) != (1, False)
+    x, y = 500, 1080 - bulge
+    assert all(0 <= x + px < 1920 and 0 <= y + py < 1080 for px, py in points(trajectory.orient(sign, swap)))
+
+
+def test_recorded_path_that_fits_nowhere():
+    trajectory = Trajectory()
+    trajectory.dx[0], trajectory.dy[0], trajectory.dx[1], trajectory.dy[1] = 3000, 0, -3000, 0
+    trajectory.length = 2
+    assert index_at((960, 540)).safe_orientation(trajectory.bounds()) is None
+
+
+def test_unknown_pointer_keeps_direction():
+    assert index_at((5000, 5000)).safe_orientation((0, 0, 100, 100)) == (1, False)
@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from core import idle_detector, keepalive, mouse_engine
+from core.config_mgr import ConfigManager, ConfigSnapshot
+from core.engine import AutomationEngine
+from core.events import Code
+from core.mouse_engine import DisplayIndex, FakeDisplay
+
+
+class Backend(mouse_engine.NullInputBackend):
+    def __init__(self, nudge=True, key=True):
+        super().__init__()
+        self.supports_nudge = nudge
+        self.supports_key = key
+
+
+def test_monitors_are_queried_only_after_display_changes(monkeypatch):
+    display = FakeDisplay(((0, 0, 1920, 1080),), pointer=(100, 100))
+    index = DisplayIndex(display)
+    for _ in range(50):
+        index.safe_offset(5, 0)
+    assert display.queries == 1
+
+    display.set_monitors(((0, 0, 1920, 1080), (1920, 0, 3840, 1080))) # 显示变更事件
+    index.safe_offset(5, 0)
+    index.safe_offset(5, 0)
+    assert display.queries == 2
+
+    monkeypatch.setattr(mouse_engine, "_display_indexes", {"fake": index})
+    mouse_engine.invalidate_display_geometry() # 界面层收到 Qt 的屏幕变更信号
+    index.safe_offset(5, 0)
+    assert display.queries == 3 and index.refreshes == 3
+
+
+@pytest.fixture
+def make_engine(tmp_path):
+    config = ConfigManager(str(tmp_path)).snapshot()
+
+    def make(rect, pointer, backend, motion=None):
+        engine = AutomationEngine(config, idle_detector.FakeIdleBackend(), backend)
+        engine.action = keepalive.create_action("jiggle", backend)
+        engine.display = DisplayIndex(FakeDisplay((rect,), pointer=pointer))
+        engine._motion = None
+        if motion:
+            values = {key: getattr(config, key) for key in config.__slots__ if key != "config_dir"}
+            values.update(motion=motion, motion_duration=0.2)
+            engine._motion = AutomationEngine._build_motion(
+                ConfigSnapshot(config.config_dir, **values), engine.action, 5, 0)
+        engine.statuses = []
+        engine.on_status = engine.statuses.append
+        return engine
+    return make
+
+
+def move(engine, dx=5, dy=0):
+    return asyncio.run(engine._move(dx, dy))
+
+
+def test_jiggle_near_edge_turns_around(make_engine):
+    backend = Backend()
+    engine = make_engine((0, 0, 1920, 1080), (1918, 500), backend)
+    assert move(engine)
+    assert [entry for _, entry in backend.events] == [((-5, 0), (5, 0))]
+
+
+def test_narrow_monitor_falls_back_to_one_pixel(make_engine):
+    backend = Backend()
+    engine = make_engine((0, 0, 3, 3), (1, 1), backend)
+    assert move(engine)
+    assert [entry for _, entry in backend.events] == [((1, 0), (-1, 0))]
+    assert engine.metrics.jiggles_blocked == 0
+
+
+@pytest.mark.parametrize("nudge, key, expected", [(True, True, "nudge"), (False, True, "key"), (False, False, None)])
+@pytest.mark.parametrize("motion", [None, "linear"])
+def test_blocked_jiggle_is_replaced_or_reported(make_engine, nudge, key, expected, motion):
+    backend = Backend(nudge, key)
+    engine = make_engine((0, 0, 1, 1), (0, 0), backend, motion)
+    assert move(engine) is (expected is not None)
+    assert engine.metrics.jiggles_blocked == 1
+    blocked, = [e for e in engine.statuses if e.code == Code.JIGGLE_BLOCKED]
+    assert blocked.a == expected
+    sent = {"nudge": [((0, 0),)], "key": ["F15"], None: []}[expected]
+    assert [entry for _, entry in backend.events] == sent # 没有零位移的 jiggle
@@ -0,0 +1,91 @@
+import asyncio
+import struct
+
+import pytest
+
+from core import idle_detector, mouse_engine
+from core.config_mgr import ConfigManager, ConfigSnapshot
+from core.engine import AutomationEngine
+from core.events import Code
+
+
+def replace(snapshot, **changes):
+    """绕过 parse() 的校验构造快照，模拟引擎一侧才能发现的问题"""
+    values = {key: getattr(snapshot, key) for key in snapshot.__slots__ if key != "config_dir"}
+    values.update(changes)
+    return ConfigSnapshot(snapshot.config_dir, **values)
+
+
+@pytest.fixture
+def config_mgr(tmp_path):
+    config_mgr = ConfigManager(str(tmp_path))
+    for key, value in dict(start_hour=0, start_minute=0, start_second=0, end_hour=23, end_minute=59,
+                           end_second=59, interval=1, activity_threshold=0, display_backend="none",
+                           idle_backend="fake", input_backend="null").items():
+        config_mgr.set(key, value)
+    return config_mgr
+
+
+def run_with_reloads(config, *snapshots, step=0.05):
+    """运行引擎，每隔 step 秒依次发布 snapshots，最后停止；返回 (引擎, 状态事件, 错误事件)"""
+    engine = AutomationEngine(config, idle_detector.FakeIdleBackend(idle=100.0),
+                              mouse_engine.create_backend("null"))
+    statuses, errors = [], []
+    engine.on_status = statuses.append
+    engine.on_error = errors.append
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        for i, snapshot in enumerate(snapshots, 1):
+            loop.call_later(i * step, engine.apply_config, snapshot)
+        loop.call_later((len(snapshots) + 1) * step, engine.stop)
+        await asyncio.wait_for(engine.run(), 5)
+
+    asyncio.run(main())
+    return engine, statuses, errors
+
+
+def codes(events, code):
+    return [e for e in events if e.code == code]
+
+
+def test_unknown_motion_is_rejected_and_engine_keeps_running(config_mgr):
+    config = config_mgr.snapshot()
+    bad = replace(config, motion="wobble", motion_duration=0.2)
+    good = replace(config, interval=2)
+    engine, statuses, errors = run_with_reloads(config, bad, good)
+
+    assert not errors
+    rejected = codes(statuses, Code.CONFIG_REJECTED)
+    assert len(rejected) == 1 and "wobble" in rejected[0].a
+    # 被拒绝之后发布的有效快照照常应用，差异相对于最后一次成功应用的设置
+    reloaded = codes(statuses, Code.CONFIG_RELOADED)
+    assert [e.a for e in reloaded] == ["interval"]
+    assert engine._motion is None
+    assert engine.ticker.interval == 2
+
+
+def test_truncated_motion_library_is_rejected(config_mgr, tmp_path):
+    library = tmp_path / "config" / "paths.bin"
+    library.write_bytes(struct.pack("I", 5)) # 声明 5 条路径，其余内容缺失
+    config = config_mgr.snapshot()
+    config_mgr.set("motion", "recorded")
+    config_mgr.set("motion_duration", "0.2")
+    config_mgr.set("motion_library", "paths.bin")
+    bad = config_mgr.snapshot()
+    engine, statuses, errors = run_with_reloads(config, bad)
+
+    assert not errors
+    assert len(codes(statuses, Code.CONFIG_REJECTED)) == 1
+    assert not codes(statuses, Code.CONFIG_RELOADED)
+    assert engine._motion is None
+
+
+def test_missing_motion_library_is_rejected(config_mgr):
+    config = config_mgr.snapshot()
+    bad = replace(config, motion="recorded", motion_duration=0.2,
+                  motion_library=config.config_dir + "/missing.bin")
+    _, statuses, errors = run_with_reloads(config, bad)
+
+    assert not errors
+    assert len(codes(statuses, Code.CONFIG_REJECTED)) == 1
@@ -0,0 +1,63 @@
+import os
+import shutil
+
+import pytest
+
+from core.i18n import I18n, compile_catalog, parse_source
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE = os.path.join(ROOT, "assets", "language.ini")
+
+
+@pytest.fixture
+def assets(tmp_path):
+    shutil.copy(SOURCE, tmp_path / "language.ini")
+    return tmp_path
+
+
+def compile_newer(assets):
+    """编译目录并让它比源文件新"""
+    catalog = str(assets / "language.cat")
+    compile_catalog(parse_source(str(assets / "language.ini")), catalog)
+    ini_mtime = os.path.getmtime(assets / "language.ini")
+    os.utime(catalog, (ini_mtime + 10, ini_mtime + 10))
+    return catalog
+
+
+def test_missing_catalog_is_not_written(assets):
+    i18n = I18n(str(assets), "English")
+    assert i18n.get("start") == "Start"
+    assert sorted(os.listdir(assets)) == ["language.ini"]
+
+
+def test_stale_catalog_is_not_rewritten(assets):
+    catalog = compile_newer(assets)
+    os.utime(catalog, (0, 0))
+    i18n = I18n(str(assets), "English")
+    assert i18n.get("start") == "Start"
+    assert os.path.getmtime(catalog) == 0
+
+
+def test_compiled_catalog_is_used_without_source(assets):
+    compile_newer(assets)
+    os.remove(assets / "language.ini")
+    i18n = I18n(str(assets), "English")
+    assert i18n.get("start") == "Start"
+    assert i18n.format("log_moved", "12:00:00") == "Moved at 12:00:00"
+
+
+@pytest.mark.parametrize("damage", ["garbage", "truncated_header", "truncated_block"])
+def test_unusable_catalog_falls_back_to_source(assets, damage):
+    catalog = compile_newer(assets)
+    with open(catalog, "rb") as f:
+        data = f.read()
+    data = {"garbage": b"\x00" * 64, "truncated_header": data[:20], "truncated_block": data[:-10]}[damage]
+    with open(catalog, "wb") as f:
+        f.write(data)
+    ini_mtime = os.path.getmtime(assets / "language.ini")
+    os.utime(catalog, (ini_mtime + 10, ini_mtime + 10))
+
+    i18n = I18n(str(assets), "English")
+    assert i18n.get("start") == "Start"
+    assert i18n.set_language("中文")
+    assert i18n.get("start") != "start"
@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from core import instance_lock
+from core.instance_lock import InstanceLock, lock_path
+
+# 子进程持有锁直到 stdin 关闭
+HOLDER = r"""
+import sys
+from core.instance_lock import InstanceLock
+lock = InstanceLock(sys.argv[1])
+print("held" if lock.acquire() else "busy", flush=True)
+sys.stdin.read()
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def holder(tmp_path):
+    path = str(tmp_path / "app.lock")
+    proc = subprocess.Popen([sys.executable, "-c", HOLDER, path], cwd=ROOT,
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    assert proc.stdout.readline().strip() == "held"
+    yield path
+    proc.stdin.close()
+    proc.wait(5)
+
+
+def test_contended_lock_is_not_acquired(holder):
+    lock = InstanceLock(holder)
+    assert lock.probe()
+    assert not lock.acquire()
+    assert not lock.held
+
+
+def test_probe_does_not_take_the_lock(tmp_path):
+    path = str(tmp_path / "app.lock")
+    assert not InstanceLock(path).probe()
+    assert not os.path.exists(path) # 探测不创建锁文件
+
+    first = InstanceLock(path)
+    assert first.acquire()
+    first.release()
+    assert not InstanceLock(path).probe()
+    # 探测结束后锁可以被正常取得
+    second = InstanceLock(path)
+    assert second.acquire()
+    second.release()
+
+
+def test_unusable_lock_file_raises(tmp_path):
+    # 锁文件无法创建不是"实例在运行"
+    lock = InstanceLock(str(tmp_path / "missing" / "app.lock"))
+    with pytest.raises(OSError):
+        lock.acquire()
+
+
+def test_lock_path_is_per_user(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    monkeypatch.setattr(instance_lock, "user_key", lambda: "alice")
+    assert lock_path("app") == str(tmp_path / "app-alice.lock")
+    monkeypatch.setattr(instance_lock, "user_key", lambda: "bob")
+    assert lock_path("app") == str(tmp_path / "app-bob.lock")
@@ -0,0 +1,100 @@
+import gzip
+import time
+
+import pytest
+
+from core.config_mgr import ConfigManager
+from core.journal import Journal
+
+
+def flushed(journal, text, timeout=5.0):
+    """写入一条并等待写入线程把它作为单独一批写出"""
+    before = journal.written + journal.errors
+    journal.write(text)
+    deadline = time.monotonic() + timeout
+    while journal.written + journal.errors == before:
+        assert time.monotonic() < deadline, "journal writer did not flush"
+        time.sleep(0.005)
+
+
+def lines(path, opener=open):
+    with opener(path, "rt", encoding="utf-8") as f:
+        return [line.split(" ", 1)[1] for line in f.read().splitlines()]
+
+
+def test_batches_are_written_on_flush(tmp_path):
+    path = tmp_path / "activity.log"
+    journal = Journal(str(path), flush_interval=60)
+    for i in range(3):
+        journal.write(f"line {i}")
+    time.sleep(0.05)
+    assert not path.exists() # 批量写入：间隔未到不写盘
+    journal.close()
+    assert lines(path) == ["line 0", "line 1", "line 2"]
+    assert journal.written == 3
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_rotation_renumbers_backups(tmp_path, compress):
+    path = tmp_path / "activity.log"
+    journal = Journal(str(path), max_bytes=50, backups=2, compress=compress, flush_interval=0.005)
+    for i in range(4):
+        flushed(journal, f"line {i}") # 每行约 30 字节：从第二行起每批都会轮转
+    journal.close()
+    suffix = ".gz" if compress else ""
+    opener = gzip.open if compress else open
+    assert lines(path) == ["line 3"]
+    assert lines(f"{path}.1{suffix}", opener) == ["line 2"]
+    assert lines(f"{path}.2{suffix}", opener) == ["line 1"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(
+        ["activity.log", f"activity.log.1{suffix}", f"activity.log.2{suffix}"])
+
+
+def test_no_backups_discards_old_content(tmp_path):
+    path = tmp_path / "activity.log"
+    journal = Journal(str(path), max_bytes=50, backups=0, flush_interval=0.005)
+    for i in range(3):
+        flushed(journal, f"line {i}")
+    journal.close()
+    assert [p.name for p in tmp_path.iterdir()] == ["activity.log"]
+    assert lines(path) == ["line 2"]
+
+
+def test_overflow_drops_oldest(tmp_path):
+    path = tmp_path / "activity.log"
+    journal = Journal(str(path), flush_interval=60, max_pending=2)
+    for i in range(5):
+        journal.write(f"line {i}")
+    journal.close()
+    assert journal.dropped == 3
+    assert lines(path) == ["line 3", "line 4"]
+
+
+def test_write_failures_are_counted(tmp_path):
+    journal = Journal(str(tmp_path / "missing" / "activity.log"), flush_interval=0.005)
+    flushed(journal, "line")
+    journal.close()
+    assert journal.errors >= 1 and journal.written == 0
+
+
+def set_journal(tmp_path, **values):
+    mgr = ConfigManager(str(tmp_path))
+    for key, value in values.items():
+        mgr.config["Settings"][key] = value
+    return mgr.snapshot()
+
+
+@pytest.mark.parametrize("enabled", ["true", "yes", "1", "on", "True"])
+def test_from_config_accepts_every_boolean_spelling(tmp_path, enabled):
+    journal = Journal.from_config(set_journal(tmp_path, journal_enabled=enabled, journal_compress="yes",
+                                              journal_max_kb="2", journal_backups="3"))
+    try:
+        assert journal is not None
+        assert journal.compress is True
+        assert (journal.max_bytes, journal.backups) == (2048, 3)
+    finally:
+        journal.close()
+
+
+def test_from_config_disabled(tmp_path):
+    assert Journal.from_config(set_journal(tmp_path, journal_enabled="off")) is None
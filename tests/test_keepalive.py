@@ -0,0 +1,102 @@
+import os
+import time
+
+import pytest
+
+from core import keepalive, mouse_engine
+
+
+class Backend(mouse_engine.NullInputBackend):
+    def __init__(self, nudge=True, key=True):
+        super().__init__()
+        self.supports_nudge = nudge
+        self.supports_key = key
+
+
+def injected_events(backend):
+    """null 后端记录的输入事件数 (按键记为按下 + 释放)"""
+    return sum(2 if entry == "F15" else len(entry) for _, entry in backend.events)
+
+
+@pytest.mark.parametrize("name", ["nudge", "key", "jiggle"])
+def test_cost_matches_injected_events(name):
+    backend = Backend()
+    action = keepalive.create_action(name, backend)
+    action.perform(1, 0)
+    assert injected_events(backend) == action.COST
+    assert action.calls == 1
+
+
+@pytest.mark.parametrize("nudge, key, expected", [
+    (True, True, "nudge"),
+    (False, True, "key"),
+    (False, False, "jiggle"),
+])
+def test_auto_order(nudge, key, expected):
+    assert keepalive.create_action("auto", Backend(nudge, key)).name == expected
+
+
+def test_auto_skips_actions_that_do_not_reset_idle(monkeypatch):
+    # 休眠抑制的 COST 为 0，但不重置空闲计时，auto 不选择
+    monkeypatch.setattr(keepalive.LogindInhibitAction, "available", staticmethod(lambda backend: True))
+    assert keepalive.create_action("auto", Backend(False, False)).name == "jiggle"
+
+
+# 代替 systemd-inhibit：记录总线地址与参数，然后一直运行到被终止
+STUB_INHIBIT = """#!/bin/sh
+echo "$DBUS_SYSTEM_BUS_ADDRESS $*" >> "$STUB_LOG"
+exec sleep 60
+"""
+
+
+@pytest.fixture
+def stub_inhibit(tmp_path, monkeypatch):
+    if not keepalive.sys.platform.startswith("linux"):
+        pytest.skip("systemd-inhibit only exists on Linux")
+    stub = tmp_path / "systemd-inhibit"
+    stub.write_text(STUB_INHIBIT)
+    stub.chmod(0o755)
+    log = tmp_path / "inhibit.log"
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ.get('PATH', '')}")
+    monkeypatch.setenv("STUB_LOG", str(log))
+    monkeypatch.delenv("DBUS_SYSTEM_BUS_ADDRESS", raising=False)
+    return log
+
+
+def wait_for_lines(log, count, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if log.exists() and len(log.read_text().splitlines()) >= count:
+            return log.read_text().splitlines()
+        time.sleep(0.01)
+    raise AssertionError(f"stub ran fewer than {count} times")
+
+
+def test_logind_inhibit_against_stand_in_bus(stub_inhibit):
+    assert keepalive.LogindInhibitAction.available(None)
+    action = keepalive.create_action("logind", None, bus_address="unix:path=/tmp/stand-in-bus")
+    try:
+        first = action._proc
+        line, = wait_for_lines(stub_inhibit, 1)
+        assert line.startswith("unix:path=/tmp/stand-in-bus --what=idle:sleep")
+        action.perform(0, 0)
+        assert action._proc is first and action.calls == 2 # 子进程存活：只检查状态
+
+        first.kill() # 如 logind 重启后抑制锁被释放
+        first.wait()
+        action.perform(0, 0)
+        assert action._proc is not first
+        assert len(wait_for_lines(stub_inhibit, 2)) == 2
+    finally:
+        proc = action._proc
+        action.close()
+    assert action._proc is None and proc.poll() is not None
+
+
+def test_logind_inhibit_command_override(stub_inhibit):
+    action = keepalive.create_action("logind", None, command=["systemd-inhibit", "--what=sleep"])
+    try:
+        line, = wait_for_lines(stub_inhibit, 1)
+        assert line == " --what=sleep" # 未指定 bus_address 时沿用系统总线
+    finally:
+        action.close()
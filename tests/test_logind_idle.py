@@ -0,0 +1,45 @@
+import threading
+import time
+
+from core.idle_detector import LogindIdleBackend
+
+
+class SlowLogind(LogindIdleBackend):
+    """loginctl 每次查询都很慢 (如 logind 无响应直到超时)"""
+
+    def __init__(self, props, delay):
+        super().__init__(session="test", poll_interval=0.01)
+        self.props = props
+        self.delay = delay
+        self.answered = threading.Event()
+
+    def _properties(self, *names):
+        time.sleep(self.delay)
+        self.answered.set()
+        return self.props
+
+
+def test_idle_duration_does_not_wait_for_loginctl():
+    since = time.monotonic() - 30
+    backend = SlowLogind({"IdleHint": "yes", "IdleSinceHintMonotonic": str(int(since * 1e6))}, delay=0.5)
+    try:
+        start = time.monotonic()
+        assert backend.idle_duration() == 0.0 # 首次查询完成前视为活跃
+        assert time.monotonic() - start < 0.1
+        assert backend.answered.wait(5)
+        deadline = time.monotonic() + 5
+        while backend.idle_duration() == 0.0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert 29 < backend.idle_duration() < 40
+    finally:
+        backend.close()
+
+
+def test_active_session_reports_zero():
+    backend = SlowLogind({"IdleHint": "no"}, delay=0)
+    try:
+        backend.idle_duration()
+        assert backend.answered.wait(5)
+        assert backend.idle_duration() == 0.0
+    finally:
+        backend.close()
@@ -0,0 +1,63 @@
+"""X11 后端经由 core.native 调用 (不各自加载本地库)；用记录调用的假绑定代替 _X11Bindings"""
+import pytest
+
+from core import idle_detector, mouse_engine, native
+
+
+class FakeBindings:
+    XTestFakeRelativeMotionEvent = XScreenSaverQueryInfo = object()
+
+    def __init__(self, keys=(native.XK_F15,)):
+        self.keys = keys
+        self.calls = []
+
+    def cursor_pos(self):
+        self.calls.append("cursor_pos")
+        return 10, 20
+
+    def send_motions(self, motions):
+        self.calls.append(("send_motions", tuple(motions)))
+
+    def key_supported(self, key):
+        return key in self.keys
+
+    def send_key(self, key):
+        self.calls.append(("send_key", key))
+
+    def idle_ms(self):
+        return 1500
+
+    def screensaver_timeout(self):
+        return 600
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    bindings = FakeBindings()
+    monkeypatch.setattr(native, "_bindings", bindings)
+    return bindings
+
+
+def test_xtest_backend_uses_native(fake):
+    backend = mouse_engine.XTestInputBackend()
+    backend.jiggle(3, 0)
+    backend.tap_key()
+    assert fake.calls == [("send_motions", ((3, 0), (-3, 0))), ("send_key", native.XK_F15)]
+    assert backend.supports_key and backend.calls == 2
+
+
+def test_xtest_backend_without_f15(monkeypatch):
+    monkeypatch.setattr(native, "_bindings", FakeBindings(keys=()))
+    assert not mouse_engine.XTestInputBackend().supports_key
+
+
+def test_x11_idle_backend_uses_native(fake):
+    backend = idle_detector.X11IdleBackend()
+    assert backend.idle_duration() == 1.5
+    assert backend.idle_timeout() == 600.0
+
+
+def test_xrandr_pointer_uses_native(fake):
+    display = object.__new__(mouse_engine.XrandrDisplay) # 不打开 Xrandr 连接，只检查 pointer
+    assert display.pointer() == (10, 20)
+    assert fake.calls == ["cursor_pos"]
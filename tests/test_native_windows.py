@@ -0,0 +1,53 @@
+"""_WinBindings.send_motions 的绝对坐标换算 (用记录调用的假函数代替 user32，可在任意平台运行)"""
+import threading
+
+import pytest
+
+from core import native
+
+VIRTUAL_DESK = {native.SM_XVIRTUALSCREEN: -1920, native.SM_YVIRTUALSCREEN: 0,
+                native.SM_CXVIRTUALSCREEN: 3840, native.SM_CYVIRTUALSCREEN: 1080}
+
+
+def pixel(n, origin, size):
+    """系统把绝对坐标映射回像素的方式"""
+    return origin + n * size // 65536
+
+
+@pytest.fixture
+def win():
+    bindings = object.__new__(native._WinBindings)
+    bindings._tls = threading.local()
+    bindings.cursor = (100, 200)
+    bindings.sent = []
+
+    def get_cursor_pos(ref):
+        ref._obj.x, ref._obj.y = bindings.cursor
+
+    def send_input(n, records, size):
+        bindings.sent.append([(r.mi.dwFlags, r.mi.dx, r.mi.dy) for r in records[:n]])
+        return n
+
+    bindings.GetCursorPos = get_cursor_pos
+    bindings.GetSystemMetrics = VIRTUAL_DESK.get
+    bindings.SendInput = send_input
+    return bindings
+
+
+def test_motions_are_sent_as_absolute_positions(win):
+    win.send_motions(((5, -3), (-5, 3)))
+    flags = native.MOUSEEVENTF_MOVE | native.MOUSEEVENTF_ABSOLUTE | native.MOUSEEVENTF_VIRTUALDESK
+    (out, back), = win.sent
+    assert out[0] == back[0] == flags
+    assert (pixel(out[1], -1920, 3840), pixel(out[2], 0, 1080)) == (105, 197)
+    assert (pixel(back[1], -1920, 3840), pixel(back[2], 0, 1080)) == (100, 200) # 准确回到起点
+
+
+@pytest.mark.parametrize("v", [-1920, -1, 0, 1, 1234, 1919])
+def test_normalize_round_trips(v):
+    assert pixel(native._normalize(v, -1920, 3840), -1920, 3840) == v
+
+
+def test_normalize_clamps_outside_the_desktop():
+    assert native._normalize(-5000, -1920, 3840) == 0
+    assert native._normalize(5000, -1920, 3840) == 65535
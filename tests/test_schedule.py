@@ -0,0 +1,138 @@
+import datetime
+
+import pytest
+
+from core.schedule import SECONDS_PER_DAY, Schedule, WeeklyCalendar
+
+
+def at(text):
+    return datetime.datetime.fromisoformat(text)
+
+
+# 2026-01-05 为周一
+def test_split_windows_leave_lunch_gap():
+    calendar = WeeklyCalendar.from_text("Mon-Fri 09:00-12:00,13:00-18:00")
+    assert len(calendar) == 10
+    assert calendar.is_active(at("2026-01-05 09:00:00"))
+    assert calendar.is_active(at("2026-01-05 11:59:59"))
+    assert not calendar.is_active(at("2026-01-05 12:00:00"))
+    assert not calendar.is_active(at("2026-01-05 12:59:59"))
+    assert calendar.is_active(at("2026-01-05 13:00:00"))
+    assert not calendar.is_active(at("2026-01-10 10:00:00")) # 周六
+    assert calendar.next_transition(at("2026-01-05 10:00:00")) == at("2026-01-05 12:00:00")
+    assert calendar.next_transition(at("2026-01-05 12:30:00")) == at("2026-01-05 13:00:00")
+    # 周五下班之后下一次开始是下周一
+    assert calendar.next_transition(at("2026-01-09 18:00:00")) == at("2026-01-12 09:00:00")
+
+
+def test_cross_midnight_window():
+    calendar = WeeklyCalendar.from_text("Mon 22:00-02:00")
+    assert not calendar.is_active(at("2026-01-05 21:59:59"))
+    assert calendar.is_active(at("2026-01-05 22:00:00"))
+    assert calendar.is_active(at("2026-01-06 01:59:59"))
+    assert not calendar.is_active(at("2026-01-06 02:00:00"))
+    # 午夜不是状态变化
+    assert calendar.next_transition(at("2026-01-05 23:00:00")) == at("2026-01-06 02:00:00")
+    assert calendar.next_transition(at("2026-01-06 03:00:00")) == at("2026-01-12 22:00:00")
+
+
+def test_sunday_window_wraps_into_monday():
+    calendar = WeeklyCalendar.from_text("Sun 22:00-02:00")
+    assert calendar.is_active(at("2026-01-04 23:00:00")) # 周日
+    assert calendar.is_active(at("2026-01-05 01:00:00")) # 周一
+    assert not calendar.is_active(at("2026-01-05 02:00:00"))
+    assert calendar.next_transition(at("2026-01-04 23:00:00")) == at("2026-01-05 02:00:00")
+    assert calendar.next_transition(at("2026-01-05 02:00:00")) == at("2026-01-11 22:00:00")
+
+
+def test_holiday_excludes_windows_starting_that_day():
+    calendar = WeeklyCalendar.from_text("Mon 22:00-02:00", "2026-01-05")
+    assert not calendar.is_active(at("2026-01-05 23:00:00"))
+    # 节假日开始的窗口跨过午夜的部分同样不运行
+    assert not calendar.is_active(at("2026-01-06 00:00:00"))
+    assert not calendar.is_active(at("2026-01-06 01:00:00"))
+    assert calendar.next_transition(at("2026-01-05 20:00:00")) == at("2026-01-12 22:00:00")
+
+
+def test_window_started_before_holiday_runs_to_its_end():
+    calendar = WeeklyCalendar.from_text("Sun 22:00-02:00", "2026-01-05")
+    assert calendar.is_active(at("2026-01-04 23:00:00"))
+    assert calendar.is_active(at("2026-01-05 01:00:00"))
+    assert calendar.next_transition(at("2026-01-04 23:00:00")) == at("2026-01-05 02:00:00")
+
+
+def test_holiday_range():
+    calendar = WeeklyCalendar.from_text("Mon-Fri 09:00-18:00", "2026-12-24..2026-12-26")
+    assert calendar.is_active(at("2026-12-23 10:00:00"))
+    for day in ("2026-12-24", "2026-12-25"):
+        assert not calendar.is_active(at(f"{day} 10:00:00"))
+    assert calendar.next_transition(at("2026-12-23 18:00:00")) == at("2026-12-28 09:00:00")
+
+
+def test_next_transition_skips_consecutive_holidays():
+    # 连续的节假日 (含周末) 合并为一段，一次跳过
+    calendar = WeeklyCalendar.from_text("Mon-Sun 08:00-20:00", "2026-02-01..2026-03-31\n2026-04-01")
+    assert calendar.next_transition(at("2026-01-31 20:00:00")) == at("2026-04-02 08:00:00")
+    assert calendar.next_transition(at("2026-01-31 12:00:00")) == at("2026-01-31 20:00:00")
+
+
+def test_next_transition_over_long_holiday_and_without_windows():
+    calendar = WeeklyCalendar.from_text("Mon-Sun 08:00-20:00", "2026-01-01..2099-12-31")
+    assert not calendar.is_active(at("2026-01-05 12:00:00"))
+    assert calendar.next_transition(at("2026-01-05 12:00:00")) == at("2100-01-01 08:00:00")
+    assert WeeklyCalendar([]).next_transition(at("2026-01-05 12:00:00")) is None
+
+
+def test_calendar_never_expires():
+    calendar = WeeklyCalendar.from_text("Mon 09:00-10:00")
+    assert not calendar.is_expired(at("2026-01-05 11:00:00"))
+    assert calendar.state(at("2026-01-05 09:30:00")) == "active"
+    assert calendar.state(at("2026-01-05 11:00:00")) == "waiting"
+
+
+@pytest.mark.parametrize("text, state", [
+    ("2026-01-05 21:59:59", "waiting"),
+    ("2026-01-05 22:00:00", "active"),
+    ("2026-01-05 23:59:59", "active"),
+])
+def test_cross_day_schedule_first_half(text, state):
+    schedule = Schedule.from_hms(22, 0, 0, 6, 0, 0)
+    assert schedule.cross_day
+    assert schedule.state(at(text)) == state
+
+
+def test_cross_day_schedule_second_half_needs_active_session():
+    schedule = Schedule.from_hms(22, 0, 0, 6, 0, 0)
+    t = at("2026-01-06 03:00:00")
+    # Strict Entry: 后半段不开始新会话
+    assert schedule.state(t) == "waiting"
+    assert schedule.next_transition(t) == at("2026-01-06 22:00:00")
+    assert schedule.state(t, has_active_session=True) == "active"
+    # 结束时间所在的那一秒仍属于工作时间
+    assert schedule.state(at("2026-01-06 06:00:00"), has_active_session=True) == "active"
+    assert schedule.state(at("2026-01-06 06:00:01"), has_active_session=True) == "ended"
+    assert schedule.next_transition(at("2026-01-06 06:00:01"), has_active_session=True) is None
+
+
+def test_cross_day_schedule_next_transition():
+    schedule = Schedule.from_hms(22, 0, 0, 6, 0, 0)
+    # 前半段的会话延续到次日结束时间的下一秒
+    assert schedule.next_transition(at("2026-01-05 23:00:00")) == at("2026-01-06 06:00:01")
+    assert schedule.next_transition(at("2026-01-06 05:00:00"), has_active_session=True) == at("2026-01-06 06:00:01")
+    assert schedule.next_transition(at("2026-01-05 12:00:00")) == at("2026-01-05 22:00:00")
+
+
+def test_same_day_schedule_end_second_is_inclusive():
+    schedule = Schedule.from_hms(9, 0, 0, 18, 0, 0)
+    assert schedule.state(at("2026-01-05 08:59:59")) == "waiting"
+    assert schedule.state(at("2026-01-05 18:00:00")) == "active"
+    assert schedule.state(at("2026-01-05 18:00:01")) == "ended"
+    assert not schedule.is_expired(at("2026-01-05 18:00:00"))
+    assert schedule.is_expired(at("2026-01-05 18:00:01"))
+    assert schedule.next_transition(at("2026-01-05 08:00:00")) == at("2026-01-05 09:00:00")
+    assert schedule.next_transition(at("2026-01-05 12:00:00")) == at("2026-01-05 18:00:01")
+
+
+def test_schedule_rejects_out_of_range_seconds():
+    with pytest.raises(ValueError):
+        Schedule(0, SECONDS_PER_DAY)
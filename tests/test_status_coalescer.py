@@ -0,0 +1,96 @@
+import time
+
+import pytest
+
+QtCore = pytest.importorskip("PySide6.QtCore")
+
+from core.events import Code, StatusEvent
+from ui.status_coalescer import StatusCoalescer
+
+
+class FakeModel:
+    """只记录调用的日志模型 (接口同 ui.log_view.LogModel)"""
+
+    def __init__(self):
+        self.rows = []
+        self.touched = 0
+        self.suspended = False
+
+    def last_item(self):
+        return self.rows[-1] if self.rows else None
+
+    def append(self, kind, event):
+        self.rows.append(event)
+
+    def touch_last(self):
+        self.touched += 1
+
+    def set_suspended(self, suspended):
+        self.suspended = suspended
+
+    def delivered(self):
+        return sum(row.count for row in self.rows)
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        QtCore.QCoreApplication.processEvents(QtCore.QEventLoop.AllEvents, 10)
+    return predicate()
+
+
+def events():
+    return [StatusEvent(Code.SKIPPED, 1), StatusEvent(Code.SKIPPED, 2), StatusEvent(Code.SKIPPED, 3),
+            StatusEvent(Code.MOVED, 4), StatusEvent(Code.SKIPPED, 5)]
+
+
+def test_repeated_skips_merge_into_one_row(app):
+    model = FakeModel()
+    coalescer = StatusCoalescer(model)
+    for event in events():
+        coalescer.push(event)
+    assert not model.rows # 可见时等待定时提交
+    coalescer.flush()
+
+    assert [(row.code, row.count, row.a) for row in model.rows] == [
+        (Code.SKIPPED, 3, 3), (Code.MOVED, 1, 4), (Code.SKIPPED, 1, 5)]
+    assert model.delivered() == coalescer.received == 5
+    # 下一批的第一个事件与模型最后一行合并：原地更新而不新增
+    coalescer.push(StatusEvent(Code.SKIPPED, 6))
+    coalescer.flush()
+    assert len(model.rows) == 3 and model.rows[-1].count == 2
+    assert model.touched == 1
+    assert model.delivered() == coalescer.received == 6
+
+
+def test_timer_flush_delivers_each_event_once(app):
+    model = FakeModel()
+    coalescer = StatusCoalescer(model)
+    for event in events():
+        coalescer.push(event)
+    assert wait_until(lambda: model.rows)
+    assert model.delivered() == 5
+    # 定时器已经提交了全部事件：再次提交没有任何重复
+    coalescer.flush()
+    assert model.delivered() == 5 and len(model.rows) == 3
+
+
+def test_hidden_window_delivers_each_event_once(app):
+    model = FakeModel()
+    coalescer = StatusCoalescer(model)
+    coalescer.push(StatusEvent(Code.MOVED, 0)) # 隐藏前尚未提交的事件
+    coalescer.set_visible(False)
+    assert model.suspended and model.delivered() == 1
+    # 隐藏时每个事件立即写入 (挂起的) 模型，不启动定时器
+    for i, event in enumerate(events(), 2):
+        coalescer.push(event)
+        assert model.delivered() == i
+    coalescer.set_visible(True)
+    assert not model.suspended
+    wait_until(lambda: False, timeout=0.3) # 让可能残留的定时器到期
+    assert model.delivered() == coalescer.received == 6
@@ -0,0 +1,92 @@
+import pytest
+
+from core import ticker
+from core.ticker import TickScheduler
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.offset = 0.0 # 本地挂钟 - 单调时钟
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ticker, "time", clock)
+    monkeypatch.setattr(TickScheduler, "_measure_offset", staticmethod(lambda: clock.offset))
+    return clock
+
+
+def test_fire_advances_on_grid(clock):
+    scheduler = TickScheduler(10)
+    scheduler.anchor()
+    assert scheduler.due()
+    clock.now = 1000.5
+    assert scheduler.fire() == pytest.approx(0.5)
+    # 迟到不累积：下一节拍仍在网格上
+    assert scheduler.next_deadline == 1010
+    assert not scheduler.due()
+    assert scheduler.missed_ticks == 0
+
+
+def test_fire_skips_missed_ticks(clock):
+    scheduler = TickScheduler(10)
+    scheduler.anchor()
+    scheduler.fire()
+    clock.now = 1045 # 例如系统休眠：1010 / 1020 / 1030 / 1040 已过去
+    assert scheduler.fire() == pytest.approx(35)
+    assert scheduler.missed_ticks == 3
+    assert scheduler.next_deadline == 1050
+    assert scheduler.lateness.count == 2
+
+
+def test_set_interval_rebases_next_deadline(clock):
+    scheduler = TickScheduler(10)
+    scheduler.anchor()
+    scheduler.fire()
+    scheduler.set_interval(30)
+    assert scheduler.next_deadline == 1030
+    clock.now = 1030
+    scheduler.fire()
+    assert scheduler.next_deadline == 1060
+    # 新的下一节拍已经过去：立即到期
+    clock.now = 1050
+    scheduler.set_interval(5)
+    assert scheduler.next_deadline == 1035
+    assert scheduler.due()
+
+
+def test_set_interval_without_grid_stays_due(clock):
+    scheduler = TickScheduler(10)
+    scheduler.set_interval(30)
+    assert scheduler.interval == 30
+    assert scheduler.due()
+    assert scheduler.next_deadline == clock.now
+
+
+def test_check_jump_realigns_to_wall_clock_grid(clock):
+    scheduler = TickScheduler(10)
+    scheduler.anchor() # 挂钟网格原点 1000
+    scheduler.fire()
+    clock.now = 1003
+    clock.offset = 3605 # 挂钟向前跳了约一小时
+    assert scheduler.check_jump()
+    assert scheduler.jumps == 1
+    # 挂钟现在为 4608，网格上的下一个点是 4610，即单调时间 1005
+    assert scheduler.next_deadline == pytest.approx(1005)
+
+
+def test_check_jump_ignores_small_drift(clock):
+    scheduler = TickScheduler(10)
+    scheduler.anchor()
+    scheduler.fire()
+    clock.offset = 1.0
+    assert not scheduler.check_jump()
+    assert scheduler.jumps == 0
+    assert scheduler.next_deadline == 1010
+    # 小幅偏移同步到换算中
+    assert scheduler.to_monotonic(ticker._LOCAL_EPOCH) == -1.0
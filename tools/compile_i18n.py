@@ -0,0 +1,66 @@
+"""
+把 assets/language.ini 编译为 assets/language.cat (格式见 core/i18n.py)。
+
+编译前做键覆盖检查：各语言的键集合一致、同一条目的占位符数量一致、代码中引用的键都已定义。
+有问题时列出并以退出码 1 结束，不写出目录文件。main.spec 在打包前自动执行。
+
+用法: python tools/compile_i18n.py [--check]
+"""
+import argparse
+import os
+import re
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from core.i18n import check_coverage, compile_catalog, parse_source
+
+SOURCE = os.path.join(ROOT, "assets", "language.ini")
+CATALOG = os.path.join(ROOT, "assets", "language.cat")
+SCAN_DIRS = ("core", "ui")
+SCAN_FILES = ("main.py",)
+
+# 代码中引用文本键的写法：_("键") / i.get("键") / i.format("键", ...) / StatusEvent(Code.MESSAGE, "键") / status_key = "键"
+_REFERENCES = re.compile(
+    r"""(?:\b_\(|\bi(?:18n)?\.(?:get|format)\(|Code\.MESSAGE,\s*|status_key\s*=\s*)(["'])(\w+)\1""")
+
+
+def referenced_keys():
+    paths = [os.path.join(ROOT, name) for name in SCAN_FILES]
+    for directory in SCAN_DIRS:
+        for dirpath, _, filenames in os.walk(os.path.join(ROOT, directory)):
+            paths.extend(os.path.join(dirpath, name) for name in filenames if name.endswith(".py"))
+    keys = set()
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            keys.update(key for _, key in _REFERENCES.findall(f.read()))
+    return keys
+
+
+def build(source=SOURCE, catalog=CATALOG, write=True):
+    """检查并编译；返回问题列表 (为空表示成功)"""
+    languages = parse_source(source)
+    problems = check_coverage(languages, referenced_keys())
+    if not problems and write:
+        compile_catalog(languages, catalog)
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--check", action="store_true", help="only check key coverage, do not write the catalog")
+    args = parser.parse_args()
+    problems = build(write=not args.check)
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    if problems:
+        return 1
+    if not args.check:
+        print(f"wrote {os.path.relpath(CATALOG, ROOT)} ({os.path.getsize(CATALOG)} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+from PySide6.QtCore import QObject, QTimer, Signal
+
+class ConfigSaver(QObject):
+    """
+    把一串 ConfigManager.set() 合并为一次延迟写入 (SAVE_DELAY_MS 内没有新的修改时保存)。
+    写入本身由 ConfigManager.save() 完成：内容未变时跳过，否则经临时文件 + fsync + 原子改名。
+    """
+    SAVE_DELAY_MS = 1000
+    failed = Signal(str) # 保存失败的错误信息
+
+    def __init__(self, config_mgr, parent=None):
+        super().__init__(parent)
+        self.config_mgr = config_mgr
+        self.writes = 0 # 实际写入文件的次数
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.SAVE_DELAY_MS)
+        self._timer.timeout.connect(self.flush)
+        config_mgr.on_change = self.schedule
+
+    def schedule(self):
+        self._timer.start()
+
+    def flush(self):
+        """立即写入尚未保存的修改 (如退出时)；失败时发出 failed 并返回 False"""
+        self._timer.stop()
+        try:
+            if self.config_mgr.save():
+                self.writes += 1
+        except OSError as e:
+            self.failed.emit(str(e))
+            return False
+        return True
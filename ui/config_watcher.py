@@ -0,0 +1,37 @@
+import os
+
+from PySide6.QtCore import QObject, QTimer, QFileSystemWatcher, Signal
+
+class ConfigWatcher(QObject):
+    """
+    监视 config/config.ini 的外部修改 (QFileSystemWatcher，Linux 上即 inotify，不额外占用线程)。
+    一串连续的文件事件 (编辑器保存、部署工具逐行写入) 在 DEBOUNCE_MS 内合并为一次重新读取；
+    内容没有实际变化 (包括本程序自己的保存) 时不发出信号。
+    同时监视所在目录：编辑器以"写临时文件再改名"方式保存时原文件的监视会失效，需重新加入。
+    """
+    DEBOUNCE_MS = 300
+    reloaded = Signal(str, object) # load_config() 的 (状态键, 错误信息或 None)
+
+    def __init__(self, config_mgr, parent=None):
+        super().__init__(parent)
+        self.config_mgr = config_mgr
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.addPath(config_mgr.config_dir)
+        self._watch_file()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.DEBOUNCE_MS)
+        self._timer.timeout.connect(self._reload)
+        self._watcher.fileChanged.connect(self._timer.start)
+        self._watcher.directoryChanged.connect(self._timer.start)
+
+    def _watch_file(self):
+        path = self.config_mgr.config_path
+        if path not in self._watcher.files() and os.path.exists(path):
+            self._watcher.addPath(path)
+
+    def _reload(self):
+        self._watch_file()
+        result = self.config_mgr.reload()
+        if result is not None:
+            self.reloaded.emit(*result)
@@ -0,0 +1,160 @@
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex
+from PySide6.QtWidgets import QListView, QAbstractItemView
+import datetime
+
+from core.log_buffer import LogBuffer, LOG_ALL, DEFAULT_CAPACITY
+
+class LogModel(QAbstractListModel):
+    """
+    core.log_buffer.LogBuffer 之上的列表模型。
+    - 追加 O(1)：只通知新增 (及被覆盖的最旧) 一行，视图仅重绘可见行
+    - 过滤：mask 为 LOG_ALL 时第 row 行即 seq = _first + row，否则映射到匹配 seq 的列表 (_rows[_head:])
+    - 文本在 data() 中按需翻译 (translate)，只有可见行会被格式化
+    - 挂起 (set_suspended) 时只写缓冲区、不发出任何模型信号，恢复时一次性重置
+    """
+    KindRole = Qt.UserRole + 1
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, translate=None, parent=None):
+        super().__init__(parent)
+        self.buffer = LogBuffer(capacity)
+        self.translate = translate
+        self.mask = LOG_ALL
+        self._first = 0 # 不过滤时第 0 行的 seq
+        self._rows = None # 过滤时匹配的 seq 列表；None 表示不过滤
+        self._head = 0
+        self._suspended = False
+
+    # --- Qt 接口 ---
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        if self._rows is None:
+            return self.buffer.total - self._first
+        return len(self._rows) - self._head
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        seq = self._seq(index.row())
+        if role == Qt.DisplayRole:
+            ts, kind, text = self.buffer.get(seq)
+            if self.translate:
+                text = self.translate(text)
+            return f"[{datetime.datetime.fromtimestamp(ts).strftime('%H:%M:%S')}] {text}"
+        if role == self.KindRole:
+            return self.buffer.kind(seq)
+        return None
+
+    def _seq(self, row):
+        if self._rows is None:
+            return self._first + row
+        return self._rows[self._head + row]
+
+    # --- 写入 / 过滤 ---
+    def append(self, kind, text):
+        buf = self.buffer
+        notify = not self._suspended
+        if buf.full:
+            # 即将覆盖最旧的一条：它在可见行中时先移除第 0 行
+            oldest = buf.first_seq
+            if self._rows is None or (self._head < len(self._rows) and self._rows[self._head] == oldest):
+                if notify: self.beginRemoveRows(QModelIndex(), 0, 0)
+                if self._rows is None:
+                    self._first = oldest + 1
+                else:
+                    self._pop_front()
+                if notify: self.endRemoveRows()
+        if self._rows is not None and not kind & self.mask:
+            buf.append(kind, text)
+            return
+        row = self.rowCount()
+        if notify: self.beginInsertRows(QModelIndex(), row, row)
+        seq = buf.append(kind, text)
+        if self._rows is not None:
+            self._rows.append(seq)
+        if notify: self.endInsertRows()
+
+    def last_item(self):
+        """缓冲区中最新的一条 (不受过滤影响)，为空时返回 None"""
+        buf = self.buffer
+        return buf.get(buf.total - 1)[2] if buf.total else None
+
+    def touch_last(self):
+        """最新一条被原地修改 (如合并计数)：更新时间戳并只重绘该行"""
+        buf = self.buffer
+        seq = buf.total - 1
+        buf.touch(seq)
+        if self._suspended:
+            return
+        if self._rows is None:
+            row = seq - self._first
+        elif len(self._rows) > self._head and self._rows[-1] == seq:
+            row = len(self._rows) - 1 - self._head
+        else:
+            return
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole])
+
+    def set_suspended(self, suspended):
+        """窗口不可见时挂起：追加不产生视图工作；恢复时重置一次模型"""
+        if suspended == self._suspended:
+            return
+        if not suspended:
+            self.beginResetModel()
+            self._suspended = False
+            self.endResetModel()
+        else:
+            self._suspended = True
+
+    def _pop_front(self):
+        self._head += 1
+        # 摊还 O(1)：已弹出的前缀过长时一次性压缩
+        if self._head > 1024 and self._head * 2 > len(self._rows):
+            del self._rows[:self._head]
+            self._head = 0
+
+    def set_filter(self, mask):
+        """按类型掩码过滤 (LOG_MOVE | LOG_SKIP ...)，只重置模型，不重建视图"""
+        if mask == self.mask:
+            return
+        self.beginResetModel()
+        self.mask = mask
+        self._first = self.buffer.first_seq
+        self._rows = None if mask == LOG_ALL else self.buffer.matching(mask)
+        self._head = 0
+        self.endResetModel()
+
+    def refresh(self):
+        """重新翻译所有行 (如切换语言后)"""
+        n = self.rowCount()
+        if n:
+            self.dataChanged.emit(self.index(0), self.index(n - 1), [Qt.DisplayRole])
+
+class LogView(QListView):
+    """只渲染可见行的日志视图；停留在底部时自动跟随新条目"""
+
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.setObjectName("LogView")
+        self.setModel(model)
+        self.setUniformItemSizes(True) # 行高一致：滚动与布局不再逐行测量
+        self.setWordWrap(False)
+        self.setTextElideMode(Qt.ElideRight)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setFocusPolicy(Qt.NoFocus)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        model.rowsAboutToBeInserted.connect(self._remember_bottom)
+        model.rowsInserted.connect(self._follow)
+        # 过滤 / 暂停切换会重置模型：同样在重置前记录是否停留在底部
+        model.modelAboutToBeReset.connect(self._remember_bottom)
+        model.modelReset.connect(self._follow)
+        self._at_bottom = True
+
+    def _remember_bottom(self, *args):
+        vsb = self.verticalScrollBar()
+        self._at_bottom = vsb.value() >= vsb.maximum()
+
+    def _follow(self, *args):
+        if self._at_bottom:
+            self.scrollToBottom()
@@ -1,20 +1,35 @@
 import sys
 import os
-import datetime
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                                QLabel, QLineEdit, QSpinBox, QComboBox, 
-                               QFrame, QCheckBox, QPushButton, QScrollArea,
+                               QFrame, QCheckBox, QPushButton,
                                QGraphicsDropShadowEffect, QApplication, QListView)
-from PySide6.QtCore import Qt, QSize, QTimer
+from PySide6.QtCore import Qt, QSize, QTimer, QEvent
 from PySide6.QtGui import QIcon
 
 from core.config_mgr import ConfigManager, resource_path
+from core.log_buffer import LOG_ALL, LOG_MOVE, LOG_SKIP, LOG_ERROR
+from core.events import Code, StatusEvent, localize
+from core.journal import Journal
+from core.metrics import EngineMetrics, format_prometheus
 from core.i18n import I18n
 from ui.themes import get_stylesheet, THEMES
 from ui.widgets import GreenPillButton, CrystalCard, SunMoonToggle, parse_color
-from ui.worker import AutomationWorker
+from ui.log_view import LogModel, LogView
+from ui.status_coalescer import StatusCoalescer
+from ui.config_watcher import ConfigWatcher
+from ui.config_saver import ConfigSaver
 from ui.window_effect import window_effect
 
+# 首次绘制前只导入界面本身所需的模块；引擎 (ui.worker -> core.engine / 本地库绑定) 在首次启动时导入，
+# 指标端点 (QtNetwork) 仅在配置了 metrics_port 时导入
+
+def invalidate_display_geometry():
+    """core.mouse_engine 尚未导入时没有几何缓存，无需加载它"""
+    mouse_engine = sys.modules.get("core.mouse_engine")
+    if mouse_engine is not None:
+        mouse_engine.invalidate_display_geometry()
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -33,7 +48,9 @@ class MainWindow(QMainWindow):
             asset_root = sys._MEIPASS 
 
         self.config_mgr = ConfigManager(config_root)
-        self.i18n = I18n(os.path.join(asset_root, "assets"))
+        # 设置修改合并为一次延迟的原子写入，内容未变时不写盘
+        self.config_saver = ConfigSaver(self.config_mgr, self)
+        self.i18n = I18n(os.path.join(asset_root, "assets"), self.config_mgr.get("language"))
         
         self.setWindowTitle("Ever Pulse")
         self.resize(500, 780) 
@@ -42,28 +59,40 @@ class MainWindow(QMainWindow):
         self.setWindowIcon(QIcon(icon_path))
 
         self.worker = None
+        try:
+            self.journal = Journal.from_config(self.config_mgr.snapshot()) # config/activity.log，由后台线程写入
+        except ValueError:
+            self.journal = None # 配置无效：启动自动化时报告
+        self.metrics = EngineMetrics() # 跨多次启动累计
+        self.metrics_server = None
         self.current_theme_name = self.config_mgr.get("theme") or "Light"
 
         self.init_ui()
         self.load_settings_to_ui()
         self.retranslateUi()
         self.apply_theme(self.current_theme_name, force=True) 
+        self._watch_screens()
+        self._start_metrics_server()
+        self.config_saver.failed.connect(self._on_save_failed)
+        # 外部修改 config.ini 时重新加载，运行中的引擎只应用变化的字段 (不重新启动)
+        self.config_watcher = ConfigWatcher(self.config_mgr, self)
+        self.config_watcher.reloaded.connect(self._on_config_reloaded)
         
-        # Log config status
-        status_key, err = self.config_mgr.load_config()
-        if status_key == "status_config_failed":
-             msg = self.i18n.get(status_key).format(err)
-        else:
-             msg = self.i18n.get(status_key)
-        
-        # We can't log yet because log_message appends to widget, but widget is ready.
-        # But log_message calls _translate_log which might not expect these keys if we don't update it?
-        # Actually _translate_log is only called if we pass a raw string.
-        # If we pass localized string directly, we should bypass _translate_log logic or make log_message smart?
-        # Check log_message: it calls _translate_log unconditionallly.
-        # But _translate_log returns original msg if no match.
-        # So we can pass the translated message directly.
-        self.log_message(msg) 
+        # Log config status (构造 ConfigManager 时已读取，不再重复读取文件)
+        status_key, err = self.config_mgr.load_status, self.config_mgr.load_error
+        self.log_message(StatusEvent(Code.MESSAGE, status_key, err if status_key == "status_config_failed" else None))
+
+    def _watch_screens(self):
+        # 显示器增减 / 分辨率变化时使移动所用的显示器几何缓存失效
+        app = QApplication.instance()
+        for screen in app.screens():
+            screen.geometryChanged.connect(lambda _: invalidate_display_geometry())
+        app.screenAdded.connect(self._on_screen_added)
+        app.screenRemoved.connect(lambda _: invalidate_display_geometry())
+
+    def _on_screen_added(self, screen):
+        screen.geometryChanged.connect(lambda _: invalidate_display_geometry())
+        invalidate_display_geometry()
 
     def init_ui(self):
         self.central_widget = QWidget()
@@ -144,19 +173,24 @@ class MainWindow(QMainWindow):
         log_card_layout = QVBoxLayout(self.log_card)
         log_card_layout.setContentsMargins(25, 20, 25, 20)
         
+        log_header = QHBoxLayout()
         self.lbl_log_title = QLabel("Activity Log")
         self.lbl_log_title.setObjectName("Subtitle")
-        log_card_layout.addWidget(self.lbl_log_title)
+        # 按类型过滤：只重置模型，视图不重建
+        self.combo_log_filter = QComboBox(); self.combo_log_filter.setView(QListView()); self.combo_log_filter.setFixedWidth(100)
+        self.combo_log_filter.currentIndexChanged.connect(self.change_log_filter)
+        log_header.addWidget(self.lbl_log_title); log_header.addStretch(); log_header.addWidget(self.combo_log_filter)
+        log_card_layout.addLayout(log_header)
         
-        self.log_area = QScrollArea()
-        self.log_area.setWidgetResizable(True)
-        self.log_area.setFixedHeight(120) 
-        self.log_content = QLabel("Ready.")
-        self.log_content.setAlignment(Qt.AlignTop | Qt.AlignLeft)
-        self.log_content.setWordWrap(True)
-        self.log_area.setWidget(self.log_content)
+        # 环形缓冲区 + 虚拟化列表：追加 O(1)，只绘制可见行，文本按需翻译
+        self.log_model = LogModel(translate=self._render_log, parent=self)
+        self.log_view = LogView(self.log_model)
+        self.log_view.setFixedHeight(120) 
+        # 引擎状态经合并 / 限速后写入日志；窗口不可见时不产生界面工作
+        self.status_coalescer = StatusCoalescer(self.log_model, self)
+        self.log_message(StatusEvent(Code.READY))
         
-        log_card_layout.addWidget(self.log_area)
+        log_card_layout.addWidget(self.log_view)
         self.main_layout.addWidget(self.log_card)
         
     def create_sb(self, mi, ma, w=55):
@@ -171,23 +205,25 @@ class MainWindow(QMainWindow):
         self.lbl_dir.setText(_("direction")); self.lbl_pix.setText(_("pixels"))
         self.start_btn.setText(_("stop") if self.worker and self.worker.isRunning() else _("start"))
         self.lbl_log_title.setText(_("log_title"))
-        # Refresh current log line if it's a fixed state
-        current_log = self.log_content.text().split('\n')[-1]
-        if "Ready" in current_log or "就绪" in current_log:
-             self.log_content.setText(_("log_ready"))
+        # 日志文本按需翻译，切换语言后重绘即可
+        self.log_model.refresh()
         
         self.combo_dir.blockSignals(True); self.combo_dir.clear(); self.combo_dir.addItems([_("up"), _("down"), _("left"), _("right")]); self.combo_dir.blockSignals(False)
+        idx = max(self.combo_log_filter.currentIndex(), 0)
+        self.combo_log_filter.blockSignals(True); self.combo_log_filter.clear()
+        self.combo_log_filter.addItems([_("log_filter_all"), _("log_filter_moves"), _("log_filter_skips"), _("log_filter_errors")])
+        self.combo_log_filter.setCurrentIndex(idx); self.combo_log_filter.blockSignals(False)
         
     def change_language(self, text):
         if self.i18n.set_language(text): 
             self.retranslateUi()
             self.config_mgr.set("language", text)
-            self.log_message(f"Language changed to {text}")
+            self.log_message(StatusEvent(Code.LANGUAGE_CHANGED, text))
 
     def toggle_theme(self):
         new_theme = "Dark" if self.theme_toggle.isChecked() else "Light"
         self.apply_theme(new_theme)
-        self.log_message(f"Theme changed to {new_theme}")
+        self.log_message(StatusEvent(Code.THEME_CHANGED, new_theme))
 
     def apply_theme(self, theme_name, force=False):
         if not force and self.current_theme_name == theme_name: return
@@ -201,7 +237,7 @@ class MainWindow(QMainWindow):
         self.theme_toggle.set_theme_state(theme_name)
         
         t = THEMES[theme_name]
-        self.log_content.setStyleSheet(f"color: {t['text_primary']}; padding: 8px;")
+        self.log_view.setStyleSheet(f"QListView#LogView {{ background: transparent; border: none; color: {t['text_primary']}; padding: 8px; }}")
 
         # Apply Title Bar Color (Windows DWM)
         try:
@@ -209,7 +245,7 @@ class MainWindow(QMainWindow):
         except Exception as e:
             print(f"DWM Error: {e}")
 
-    def load_settings_to_ui(self):
+    def load_settings_to_ui(self, restore_position=True):
         c = self.config_mgr
         self.start_h.setValue(c.get('start_hour', int)); self.start_m.setValue(c.get('start_minute', int)); self.start_s.setValue(c.get('start_second', int))
         self.end_h.setValue(c.get('end_hour', int)); self.end_m.setValue(c.get('end_minute', int)); self.end_s.setValue(c.get('end_second', int))
@@ -221,6 +257,9 @@ class MainWindow(QMainWindow):
         except: pass
         self.pixel_spin.setValue(c.get('pixels', int))
         
+        if not restore_position:
+            return
+
         # Restore window position
         x = c.get('window_x', int)
         y = c.get('window_y', int)
@@ -242,119 +281,178 @@ class MainWindow(QMainWindow):
         c.set("window_x", self.pos().x())
         c.set("window_y", self.pos().y())
 
+    def _on_save_failed(self, error):
+        print(f"Error saving config: {error}")
+        self.log_message(StatusEvent(Code.MESSAGE, "error_save_failed", error))
+
+    def _on_config_reloaded(self, status_key, err):
+        if status_key == "status_config_failed":
+            self.log_message(StatusEvent(Code.MESSAGE, status_key, err))
+            return
+        try:
+            config = self.config_mgr.snapshot()
+        except ValueError as e:
+            self.log_message(StatusEvent(Code.CONFIG_ERROR, str(e)))
+            return
+        self.load_settings_to_ui(restore_position=False)
+        theme = self.config_mgr.get("theme")
+        if theme in THEMES:
+            self.apply_theme(theme)
+        self.auto_close_enabled = config.auto_close_enabled
+        self.auto_close_delay_seconds = config.auto_close_delay_seconds
+        if self.worker and self.worker.isRunning():
+            # 引擎在下一次唤醒时应用变化的字段，并报告更新了哪些设置
+            self.worker.engine.apply_config(config)
+        else:
+            self.log_message(StatusEvent(Code.MESSAGE, "log_config_file_reloaded"))
+
     def toggle_automation(self):
         if self.worker and self.worker.isRunning(): self.stop_automation()
         else: self.start_automation()
 
     def start_automation(self):
-        self.save_ui_to_config()
-        try:
-             self.config_mgr.save()
-        except Exception as e:
-             self.log_message(self.i18n.get("error_save_failed").format(str(e)))
+        self.save_ui_to_config() # 有变化时由 config_saver 延迟写入
              
-        self.worker = AutomationWorker(self.config_mgr)
-        self.worker.status_updated.connect(self.log_message)
+        # 一次性解析并校验，引擎只持有该只读快照，不再访问界面线程修改的 ConfigManager
+        try:
+            config = self.config_mgr.snapshot()
+        except ValueError as e:
+            self.log_message(StatusEvent(Code.CONFIG_ERROR, str(e)))
+            return
+
+        from ui.worker import AutomationWorker
+        self.worker = AutomationWorker(config, metrics=self.metrics)
+        if self.journal:
+            self.worker.status_updated.connect(self.journal.record)
+        self.worker.status_updated.connect(self.status_coalescer.push)
         self.worker.error_occurred.connect(self.log_error)
         self.worker.request_auto_close.connect(self.start_auto_shutdown_sequence)
         
         # Load auto-close config
-        self.auto_close_enabled = self.config_mgr.get("auto_close_enabled") == "True"
-        try:
-             self.auto_close_delay_seconds = int(self.config_mgr.get("auto_close_delay_seconds"))
-        except:
-             self.auto_close_delay_seconds = 10
+        self.auto_close_enabled = config.auto_close_enabled
+        self.auto_close_delay_seconds = config.auto_close_delay_seconds
 
         # Pre-flight Check: Prevent starting if time is already expired (Single Day Mode)
         # This ensures that if the worker later hits end_time, it's a natural completion (triggering auto-close),
         # not an immediate startup error.
-        try:
-             s_h = int(self.config_mgr.get("start_hour"))
-             s_m = int(self.config_mgr.get("start_minute"))
-             s_s = int(self.config_mgr.get("start_second"))
-             e_h = int(self.config_mgr.get("end_hour"))
-             e_m = int(self.config_mgr.get("end_minute"))
-             e_s = int(self.config_mgr.get("end_second"))
-             
-             now = datetime.datetime.now().time()
-             start_t = datetime.time(s_h, s_m, s_s)
-             end_t = datetime.time(e_h, e_m, e_s)
-             
-             # Single Day Mode: Start <= End
-             if start_t <= end_t:
-                 if now > end_t:
-                     self.log_message("status_work_period_ended")
-                     return
-        except:
-             pass # Ignore check on error, let worker handle validation
+        if self.worker.engine.is_expired():
+             self.log_message(StatusEvent(Code.WORK_PERIOD_ENDED))
+             return
 
-        self.worker.start(); self.retranslateUi(); self.log_message("Started.")
+        self.worker.start(); self.retranslateUi(); self.log_message(StatusEvent(Code.STARTED))
 
     def stop_automation(self):
         if self.worker: self.worker.stop(); self.worker = None
-        self.retranslateUi(); self.log_message("Stopped.")
+        self.retranslateUi(); self.log_message(StatusEvent(Code.STOPPED))
 
-    def log_message(self, msg):
+    def log_message(self, event):
         # Localization Hook
-        if msg == "status_work_period_ended":
+        if event.code == Code.WORK_PERIOD_ENDED:
             self.stop_automation()
 
-        ts = datetime.datetime.now().strftime("[%H:%M:%S]")
-        translated_msg = self._translate_log(msg)
-        
-        txt = self.log_content.text()
-        if len(txt) > 2000: txt = txt[-1000:] 
-        self.log_content.setText(txt + f"\n{ts} {translated_msg}")
-        vsb = self.log_area.verticalScrollBar(); vsb.setValue(vsb.maximum())
+        if self.journal:
+            self.journal.record(event)
+        # 事件原样入队，显示时再经 _render_log 按当前语言渲染；
+        # 界面自身的事件立即提交，并保持与尚未提交的引擎状态的先后顺序
+        self.status_coalescer.push(event)
+        self.status_coalescer.flush()
+
+    def _start_metrics_server(self):
+        """metrics_port > 0 时在 127.0.0.1 上提供 Prometheus 指标"""
+        port = self.config_mgr.get("metrics_port", int)
+        if not port:
+            return
+        from core.metrics_server import MetricsServer
+        self.metrics_server = MetricsServer(self.metrics_text, self)
+        try:
+            self.metrics_server.listen(port)
+        except OSError as e:
+            self.metrics_server = None
+            self.log_message(StatusEvent(Code.ERROR, str(e)))
+
+    def metrics_text(self):
+        """引擎指标 + 日志合并 / 日志文件计数，Prometheus 文本格式"""
+        c, j = self.status_coalescer, self.journal
+        samples = self.metrics.samples() + (
+            ("status_received_total", "counter", "Status events received by the UI", c.received),
+            ("status_flushed_total", "counter", "Status rows written to the log view", c.flushed),
+        )
+        if j:
+            samples += (
+                ("journal_written_total", "counter", "Lines written to the activity journal", j.written),
+                ("journal_dropped_total", "counter", "Journal lines dropped because the writer fell behind", j.dropped),
+            )
+        return format_prometheus(samples)
+
+    def control_handlers(self):
+        """单实例本地套接字上的命令 (见 core.single_instance)：命令 -> () -> 响应字段"""
+        return {
+            "start": self._control_start,
+            "stop": self._control_stop,
+            "status": self.control_status,
+            "reload": self._control_reload,
+            "metrics": lambda: {"text": self.metrics_text()},
+        }
+
+    def control_status(self):
+        running = bool(self.worker and self.worker.isRunning())
+        return {
+            "pid": os.getpid(),
+            "running": running,
+            "mode": self.config_mgr.get("mode"),
+            "language": self.i18n.current_language,
+            "moves": self.metrics.moves,
+            "skips": self.metrics.skips,
+            "errors": self.metrics.errors,
+            "config": self.config_mgr.config_path,
+        }
+
+    def _control_start(self):
+        if not (self.worker and self.worker.isRunning()):
+            self.start_automation()
+        status = self.control_status()
+        if not status["running"]:
+            # 配置无效或已过结束时间；原因已写入日志
+            raise RuntimeError("automation did not start (see the activity log)")
+        return status
+
+    def _control_stop(self):
+        if self.worker and self.worker.isRunning():
+            self.stop_automation()
+        return self.control_status()
+
+    def _control_reload(self):
+        """立即重新读取 config.ini (不等待文件监视)；文件内容未变时 changed 为 false"""
+        result = self.config_mgr.reload()
+        if result is None:
+            return {"changed": False}
+        status_key, err = result
+        self._on_config_reloaded(status_key, err)
+        if status_key == "status_config_failed":
+            raise ValueError(err)
+        return {"changed": True}
 
-    def _translate_log(self, msg):
-        _ = self.i18n.get
-        if msg == "Started.": return _("log_started")
-        if msg == "Stopped.": return _("log_stopped")
-        if msg == "Ready.": return _("log_ready")
-        if msg == "status_work_period_ended": return _("status_work_period_ended")
-        if msg.startswith("status_aligning_first_move:"):
-            # format: status_aligning_first_move:wait_s:target_s
-            try:
-                parts = msg.split(":")
-                wait_s = parts[1]
-                target_s = int(parts[2])
-                return _("status_aligning_first_move").format(wait_s, target_s)
-            except:
-                return msg
-                
-        if "Moved at" in msg: return _("log_moved").format(msg.split(" at ")[-1])
-        if "Outside working hours" in msg: return _("log_waiting")
-        if "Theme changed to" in msg: return _("log_theme_changed").format(msg.split(" to ")[-1])
-        if "Language changed to" in msg: return _("log_lang_changed").format(msg.split(" to ")[-1])
-        if "User active" in msg: 
-            # Parse "User active (idle 0.0s), skipping..."
-            try:
-                parts = msg.split("idle ")[1].split("s)")[0]
-                return _("status_skipped").format(parts)
-            except:
-                return msg
-        return msg
-
-    def log_error(self, msg): 
-        if msg.startswith("Config Error: "):
-            content = msg.split(": ", 1)[1]
-            translated = self.i18n.get("log_config_error").format(content)
-            self.log_message(translated)
-        else:
-            prefix = self.i18n.get("log_error_prefix")
-            self.log_message(f"{prefix}{msg}")
+    def change_log_filter(self, index):
+        masks = (LOG_ALL, LOG_MOVE, LOG_SKIP, LOG_ERROR)
+        if 0 <= index < len(masks):
+            self.log_model.set_filter(masks[index])
+
+    def _render_log(self, event):
+        return localize(event, self.i18n)
+
+    def log_error(self, event): 
+        self.log_message(event)
         self.stop_automation()
 
     def start_auto_shutdown_sequence(self):
         """Initiates the countdown for auto-closing the app."""
         if not self.auto_close_enabled:
-             self.log_message("Auto-close requested but disabled in config.")
+             self.log_message(StatusEvent(Code.MESSAGE, "log_auto_close_disabled"))
              self.stop_automation()
              return
 
         delay = self.auto_close_delay_seconds
-        self.log_message(self.i18n.get("auto_close_message").format(delay))
+        self.log_message(StatusEvent(Code.MESSAGE, "auto_close_message", delay))
         
         self.start_btn.setEnabled(False) # Prevent re-clicking start
         self.start_btn.setText(f"Closing in {delay}s")
@@ -379,18 +477,32 @@ class MainWindow(QMainWindow):
     def stop_automation(self):
         if hasattr(self, 'shutdown_timer') and self.shutdown_timer.isActive():
             self.shutdown_timer.stop()
-            self.log_message("Auto-close cancelled.")
+            self.log_message(StatusEvent(Code.MESSAGE, "log_auto_close_cancelled"))
             self.start_btn.setEnabled(True)
         
         if self.worker: self.worker.stop(); self.worker = None
-        self.retranslateUi(); self.log_message(self.i18n.get("log_stopped"))
+        self.retranslateUi(); self.log_message(StatusEvent(Code.STOPPED))
+
+    def showEvent(self, ev):
+        super().showEvent(ev)
+        self.status_coalescer.set_visible(not self.isMinimized())
+
+    def hideEvent(self, ev):
+        super().hideEvent(ev)
+        self.status_coalescer.set_visible(False)
+
+    def changeEvent(self, ev):
+        super().changeEvent(ev)
+        if ev.type() == QEvent.WindowStateChange:
+            self.status_coalescer.set_visible(self.isVisible() and not self.isMinimized())
 
     def closeEvent(self, ev): 
         if hasattr(self, 'shutdown_timer') and self.shutdown_timer.isActive():
             self.shutdown_timer.stop()
         self.stop_automation(); self.save_ui_to_config()
-        try:
-            self.config_mgr.save()
-        except Exception as e:
-            print(f"Error saving config on exit: {e}") # Can't log to UI closing
+        self.config_saver.flush() # 失败时经 _on_save_failed 报告 (日志文件中仍会保留)
+        if self.metrics_server:
+            self.metrics_server.close()
+        if self.journal:
+            self.journal.close()
         super().closeEvent(ev)
@@ -0,0 +1,61 @@
+from PySide6.QtCore import QObject, QTimer
+
+from core.events import Code
+
+class StatusCoalescer(QObject):
+    """
+    AutomationWorker 与日志模型 (ui.log_view.LogModel) 之间的合并 / 限速层。
+    - 连续的同类状态 (COALESCE_CODES) 合并为一条并计数 ("×42")，原地更新已有的行而不新增
+    - 可见时最多每 FLUSH_INTERVAL_MS 向模型提交一批
+    - 窗口隐藏 / 最小化时挂起模型：事件只写入环形缓冲区，不产生视图工作，重新显示时一次性同步
+    """
+    FLUSH_INTERVAL_MS = 100 # 10 Hz
+    COALESCE_CODES = frozenset({Code.SKIPPED})
+
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self.received = 0 # 收到的事件数
+        self.flushed = 0 # 实际写入模型 (新增或合并) 的次数
+        self._pending = []
+        self._visible = True
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.flush)
+
+    def push(self, event):
+        self.received += 1
+        pending = self._pending
+        if not (pending and self._merge(pending[-1], event)):
+            pending.append(event)
+        if not self._visible:
+            self.flush()
+        elif not self._timer.isActive():
+            self._timer.start(self.FLUSH_INTERVAL_MS)
+
+    def flush(self):
+        self._timer.stop()
+        model = self.model
+        for event in self._pending:
+            if not self._merge(model.last_item(), event):
+                model.append(event.kind, event)
+            else:
+                model.touch_last()
+            self.flushed += 1
+        self._pending.clear()
+
+    def _merge(self, last, event):
+        """event 与 last 为同一可合并状态时累加到 last (载荷取最新) 并返回 True"""
+        if (last is None or getattr(last, "code", None) != event.code
+                or event.code not in self.COALESCE_CODES):
+            return False
+        last.count += event.count
+        last.a, last.b = event.a, event.b
+        return True
+
+    def set_visible(self, visible):
+        if visible == self._visible:
+            return
+        self._visible = visible
+        self.flush()
+        self.model.set_suspended(not visible)
@@ -4,7 +4,14 @@ from ctypes import wintypes
 
 class WindowEffect:
     def __init__(self):
-        self.dwmapi = ctypes.windll.dwmapi
+        self._dwmapi = None
+
+    @property
+    def dwmapi(self):
+        # 首次设置标题栏颜色时才加载 dwmapi (导入本模块不加载任何 DLL，非 Windows 平台也可导入)
+        if self._dwmapi is None:
+            self._dwmapi = ctypes.windll.dwmapi
+        return self._dwmapi
         
     def set_title_bar_color(self, hwnd, color_hex):
         """
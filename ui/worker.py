@@ -1,170 +1,167 @@
-from PySide6.QtCore import QThread, Signal, QObject
+from PySide6.QtCore import QObject, QTimer, QSocketNotifier, Signal, Qt
+import math
 import time
-import datetime
-from core.mouse_engine import move_relative, set_mouse_position
-from core.idle_detector import get_idle_duration
+from core.engine import AutomationEngine
+from core.events import Code, StatusEvent
 
-class AutomationWorker(QThread):
-    status_updated = Signal(str) # 发送状态文本
-    error_occurred = Signal(str) # 发送错误信息
+class _Sleep:
+    """协程 await 时交给 AutomationWorker 的截止时间"""
+    __slots__ = ("deadline",)
+
+    def __init__(self, deadline):
+        self.deadline = deadline
+
+    def __await__(self):
+        woken = yield self
+        return woken
+
+class QtDeadlineWaiter:
+    """
+    core.waiter.DeadlineWaiter 的 Qt 版本：等待不占用线程，
+    而是由 AutomationWorker 的单次 QTimer 在截止时间恢复引擎协程。
+    wake() / cancel() 可在任意线程调用 (engine.apply_config / stop)：经 AutomationWorker 的信号
+    转到 worker 所在的线程，其他线程发出时为排队连接，不会在调用方线程中操作 QTimer。
+    """
+
+    def __init__(self, worker):
+        self._worker = worker
+        self._cancelled = False
+        self._created_at = time.monotonic()
+        self._notifiers = {}
+        self.wakeups = 0
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    def cancel(self):
+        self._cancelled = True
+        self._worker.wake_requested.emit()
+
+    def wake(self):
+        self._worker.wake_requested.emit()
+
+    def watch(self, fd, callback):
+        """fd 可读时在 Qt 事件循环中回调 (QSocketNotifier)"""
+        notifier = QSocketNotifier(fd, QSocketNotifier.Read, self._worker)
+        notifier.activated.connect(lambda *_: callback())
+        self._notifiers[fd] = notifier
+
+    def unwatch(self, fd):
+        notifier = self._notifiers.pop(fd, None)
+        if notifier is not None:
+            notifier.setEnabled(False)
+            notifier.deleteLater()
+
+    async def wait_until(self, deadline):
+        while not self._cancelled:
+            if deadline - time.monotonic() <= 0:
+                return True
+            woken = await _Sleep(deadline)
+            self.wakeups += 1
+            if woken:
+                return not self._cancelled
+        return False
+
+    async def wait_for(self, seconds):
+        return await self.wait_until(time.monotonic() + seconds)
+
+    def wakeups_per_hour(self):
+        elapsed = time.monotonic() - self._created_at
+        if elapsed <= 0:
+            return 0.0
+        return self.wakeups * 3600.0 / elapsed
+
+class AutomationWorker(QObject):
+    """
+    在 Qt 事件循环中运行 core.engine.AutomationEngine 的适配器 (不额外占用线程)。
+    config 为只读配置快照 (core.config_mgr.ConfigSnapshot)。
+    引擎回调转换为 Qt 信号；stop() 立即恢复并结束协程，不会阻塞 UI。
+    引擎的每一步都在 worker 所在的 (界面) 线程中执行，因此后端调用不能阻塞：
+    需要子进程或网络的后端在自己的后台线程中查询 (例如 idle_detector.LogindIdleBackend)。
+    """
+    status_updated = Signal(object) # 发送状态事件 (core.events.StatusEvent)
+    error_occurred = Signal(object) # 发送错误事件 (StatusEvent)
     request_auto_close = Signal() # 请求自动关闭应用
     finished = Signal()
+    wake_requested = Signal() # 恢复等待中的协程 (QtDeadlineWaiter.wake / cancel，可从任意线程发出)
 
-    def __init__(self, config):
+    def __init__(self, config, idle_backend=None, input_backend=None, metrics=None):
         super().__init__()
-        self.config = config
-        self.running = True
-        self.is_paused = False
-        
+        self.engine = AutomationEngine(config, idle_backend, input_backend,
+                                       waiter=QtDeadlineWaiter(self), metrics=metrics)
+        self.engine.on_status = self.status_updated.emit
+        self.engine.on_error = self.error_occurred.emit
+        self.engine.on_auto_close = self.request_auto_close.emit
+
+        self._coro = None
+        self._started = False
+        self._stepping = False
+        self._pending_wake = False
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(lambda: self._step(False))
+        # 自动连接：在 worker 线程中发出时直接调用，其他线程中发出时排队到 worker 线程
+        self.wake_requested.connect(self._interrupt)
+
+    @property
+    def ticker(self):
+        return self.engine.ticker
+
+    @property
+    def metrics(self):
+        """累计指标 (core.metrics.EngineMetrics)"""
+        return self.engine.metrics
+
+    def start(self):
+        # 协程在下一轮事件循环中开始，调用方可以先完成自己的日志/界面更新
+        self._coro = self.engine.run()
+        self._started = False
+        self._timer.start(0)
+
+    def isRunning(self):
+        return self._coro is not None
+
     def stop(self):
-        self.running = False
-        self.wait()
-
-    def run(self):
-        # 读取配置
-        try:
-            start_h = int(self.config.get('start_hour'))
-            start_m = int(self.config.get('start_minute'))
-            start_s = int(self.config.get('start_second'))
-            end_h = int(self.config.get('end_hour'))
-            end_m = int(self.config.get('end_minute'))
-            end_s = int(self.config.get('end_second'))
-            interval = int(self.config.get('interval'))
-            direction = self.config.get('direction')
-            pixels = int(self.config.get('pixels'))
-            threshold = int(self.config.get('activity_threshold'))
-        except Exception as e:
-            self.error_occurred.emit(f"Config Error: {e}")
-            return
+        self.engine.stop()
+
+    def wakeups_per_hour(self):
+        """等待原语每小时的唤醒次数 (指标)"""
+        return self.engine.wakeups_per_hour()
 
-        direction_map = {
-            "上": (0, -1), "Up": (0, -1),
-            "下": (0, 1),  "Down": (0, 1),
-            "左": (-1, 0), "Left": (-1, 0),
-            "右": (1, 0),  "Right": (1, 0)
-        }
-        dx, dy = direction_map.get(direction, (-1, 0))
-        dx *= pixels
-        dy *= pixels
-
-        first_move = True
-
-        # 状态标记：本次会话是否已经开始工作过
-        has_active_session = False
-
-        while self.running:
-            now_dt = datetime.datetime.now()
-            current_time = now_dt.time()
-            start_time = datetime.time(start_h, start_m, start_s)
-            end_time = datetime.time(end_h, end_m, end_s)
-
-            should_run = False
-            
-            # --- 核心判定逻辑 (V6 Asymmetric) ---
-            if start_time <= end_time:
-                # [单日模式 Single Day]
-                if current_time > end_time:
-                    # 严格判定：超过结束时间 -> 视为会话完成
-                    # 发送特殊状态字符串，UI层需识别并翻译
-                    self.status_updated.emit("Scheduled end reached.")
-                    self.request_auto_close.emit()
-                    break # 退出循环，触发自动关闭
-                
-                elif current_time < start_time:
-                    should_run = False # Wait
-                else:
-                    should_run = True  # Run
-            
-            else:
-                # [跨天模式 Cross Day]
-                # 始终保持循环 Loop (除非被外部停止)
-                after_start = current_time >= start_time
-                before_end = current_time <= end_time
-                
-                if after_start:
-                    should_run = True # 前半段：无条件运行 (20:00~23:59)
-                elif before_end:
-                    # 后半段 (00:00~05:00): 仅允许延续，禁止新准入 (Strict Entry)
-                    should_run = has_active_session
-                else:
-                    should_run = False # Gap: Waiting
-            
-            # --- 执行逻辑 ---
-            if should_run:
-                has_active_session = True 
-                
-                idle_time = get_idle_duration()
-                
-                if idle_time < threshold:
-                    self.status_updated.emit(f"User active (idle {idle_time:.1f}s), skipping...")
-                else:
-                    if first_move:
-                         # Align to start_second logic
-                         # This logic aligns the FIRST active move to the :start_s second mark if possible
-                         current_s = now_dt.second
-                         target_s = start_s
-                         
-                         wait_s = 0
-                         if current_s < target_s:
-                             wait_s = target_s - current_s
-                         elif current_s > target_s:
-                             wait_s = (60 - current_s) + target_s
-                             
-                         if wait_s > 0:
-                             # Formatted string will be handled by UI via format()
-                             # "status_aligning_first_move" expects: "Waiting {}s to align... {:02d}"
-                             # We pass a special string that UI can parse? 
-                             # No, existing UI logic parses "Moved at" etc.
-                             # But `status_aligning_first_move` has placeholders.
-                             # Let's send a formatted string that UI logic can either display raw or I need to handle it in UI.
-                             # The easiest way is to format it here if we assume the KEY is used for lookup but formatting is done here?
-                             # Wait, the `log_message` in MainWindow uses `_translate_log`.
-                             # If I send "AligningFirstMove|10|00", I can parse it.
-                             # But let's stick to the protocol.
-                             # "status_aligning_first_move" in language.ini: "Waiting {}s ... {:02d}"
-                             # If `_translate_log` doesn't support format args for this key, I need to update UI.
-                             # Let's update UI to handle "Aligning: 10, 00" or similar protocol?
-                             # Or just send format params?
-                             # Let's emit a special signal? No status_updated is str.
-                             
-                             # Let's use a protocol prefix: "status_aligning_first_move:10:00"
-                             self.status_updated.emit(f"status_aligning_first_move:{wait_s}:{target_s}")
-                             
-                             for _ in range(wait_s):
-                                 if not self.running: break
-                                 time.sleep(1)
-                             
-                             if not self.running: break
-                             
-                             # Re-check time after wait (in case we drifted into forbidden zone?)
-                             # But simplistic is fine.
-                             pass
-
-                    # Jiggle
-                    move_relative(dx, dy)
-                    time.sleep(0.1)
-                    move_relative(-dx, -dy)
-                    
-                    self.status_updated.emit(f"Moved at {now_dt.strftime('%H:%M:%S')}")
-
-                # Interval Wait
-                for _ in range(interval * 10): 
-                    if not self.running: break
-                    time.sleep(0.1) 
-                    
-                first_move = False
-
-            else:
-                # Not Running
-                if has_active_session:
-                    # 刚才还在跑，现在断了 -> 说明是自然结束 (Cross Day End)
-                    # 单日模式已在上方 break，所以这里一定是跨天模式的自然结束 (05:01)
-                    self.status_updated.emit("Scheduled end reached.")
-                    self.request_auto_close.emit()
-                    break # 退出循环，触发自动关闭
-                else:
-                    # Waiting
-                    self.status_updated.emit("Waiting - Outside working hours")
-                    time.sleep(1)
-        
-        self.finished.emit()
+    def _interrupt(self):
+        if self._stepping:
+            # 协程正在执行 (例如在信号回调中调用了 stop)：在它下一次等待时立即恢复
+            self._pending_wake = True
+        elif self._coro is not None and self._timer.isActive():
+            self._timer.stop()
+            self._step(True)
+
+    def _step(self, value):
+        while self._coro is not None:
+            if not self._started:
+                value = None # 新协程只能 send(None)
+                self._started = True
+            self._stepping = True
+            try:
+                sleep = self._coro.send(value)
+            except StopIteration:
+                self._coro = None
+                self.finished.emit()
+                return
+            except Exception as e:
+                self._coro = None
+                self.engine.metrics.errors += 1
+                self.error_occurred.emit(StatusEvent(Code.ERROR, str(e)))
+                self.finished.emit()
+                return
+            finally:
+                self._stepping = False
+
+            if self._pending_wake:
+                self._pending_wake = False
+                value = True
+                continue
+            self._timer.start(max(0, math.ceil((sleep.deadline - time.monotonic()) * 1000)))
+            return